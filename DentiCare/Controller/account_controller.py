@@ -1,4 +1,5 @@
-from PyQt6.QtWidgets import QMessageBox, QHeaderView, QTableWidgetItem
+from PyQt6.QtWidgets import QMessageBox, QHeaderView
+from DentiCare.Controller.table_model import Column, RecordTableModel, selectedRecord
 from DentiCare.Model.account_model import AccountModel
 from DentiCare.Model.staff_model import StaffModel
 
@@ -15,6 +16,19 @@ class AccountTabController:
         self.account_model = AccountModel()
         self.current_form = None  # Track current dialog
 
+        # Cells are formatted on demand by the model, only for visible rows
+        stretch = QHeaderView.ResizeMode.Stretch
+        self.table_model = RecordTableModel([
+            Column('Staff ID', 'StaffID'),
+            Column('Staff Name', self._formatFullName, stretch),
+            Column('Username', 'Username', stretch),
+            Column('Password', 'Password', stretch),
+            Column('Role', 'Role', stretch),
+            Column('Added At', lambda a: self._formatDateTime(a.get('created_at')), stretch),
+            Column('Updated At', lambda a: self._formatDateTime(a.get('updated_at')), stretch),
+        ], self.view)
+        self.table_model.attachTo(self.view.getAccountTable())
+
     def _formatDateTime(self, datetime_obj):
         """Format datetime to 12-hour format with AM/PM"""
         if not datetime_obj:
@@ -307,43 +321,19 @@ class AccountTabController:
 
 
     def loadAccountTable(self):
-        #load table with data
+        #load table with data, query runs in a background worker
+        self.view.query_executor.submit(
+            'accounts',
+            self.account_model.getAllAccounts,
+            on_result=self._populateAccountTable,
+            on_error=lambda e: QMessageBox.critical(self.view, "Load Error",
+                                                    f"Error loading account table: {str(e)}")
+        )
+
+    def _populateAccountTable(self, account_list):
+        #show account rows from the model in the table
         try:
-            # Get data from Model
-            account_list = self.account_model.getAllAccounts()
-
-            # Get table widget from View
-            table = self.view.getAccountTable()
-
-            # Configure table headers
-            header = table.horizontalHeader()
-            header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)  # StaffID
-            header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)  # Full Name
-            header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)  # Username
-            header.setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)  # Password
-            header.setSectionResizeMode(4, QHeaderView.ResizeMode.Stretch)  # Role
-            header.setSectionResizeMode(5, QHeaderView.ResizeMode.Stretch) # Added At
-            header.setSectionResizeMode(6, QHeaderView.ResizeMode.Stretch)# Updated At
-
-            # Populate table
-            table.setRowCount(len(account_list))
-
-            for row, account in enumerate(account_list):
-                # Format data for display
-                full_name = self._formatFullName(account)
-
-                # Set table items
-                table.setItem(row, 0, QTableWidgetItem(str(account['StaffID'])))
-                table.setItem(row, 1, QTableWidgetItem(full_name))
-                table.setItem(row, 2, QTableWidgetItem(account['Username']))
-                table.setItem(row, 3, QTableWidgetItem(account['Password']))
-                table.setItem(row, 4, QTableWidgetItem(account['Role']))
-
-                created_at_str = self._formatDateTime(account.get('created_at'))
-                updated_at_str = self._formatDateTime(account.get('updated_at'))
-
-                table.setItem(row, 5, QTableWidgetItem(created_at_str))
-                table.setItem(row, 6, QTableWidgetItem(updated_at_str))
+            self.table_model.setRows(account_list)
 
         except Exception as e:
             QMessageBox.critical(self.view, "Load Error",
@@ -353,15 +343,14 @@ class AccountTabController:
 
     def _getSelectedStaffID(self):
         #get selected staff by selected row
-        table = self.view.getAccountTable()
-        row = table.currentRow()
+        account = selectedRecord(self.view.getAccountTable())
 
-        if row < 0:
+        if account is None:
             QMessageBox.warning(self.view, "Selection Error",
                                 "Please select an account from the table first")
             return None
 
-        staff_id = table.item(row, 0).text() #get id by selected row 1st column
+        staff_id = str(account['StaffID']) #get id of the selected row
         return staff_id
 
     def _formatFullName(self, data):
@@ -12,53 +12,47 @@ class DashboardTabController:
         self.graph_loaded = False  # Track if graph is already loaded
 
     def loadDashboardData(self):
-        try:
-            totalPatients = self.dashboard_model.getTotalPatients()
-            totalStaff = self.dashboard_model.getTotalStaff()
-            totalRevenue = self.dashboard_model.getTotalRevenue()
-
-            self.view.totalpatientField.setText(str(totalPatients))
-            self.view.totalstaffField.setText(str(totalStaff))
-            self.view.totalrevenueField.setText(f"₱{totalRevenue:,.2f}")
-
-            print("Dashboard data loaded successfully")
-
-            # Load graph
-            self.loadMonthlySalesGraph()
-
-        except Exception as e:
-            print(f"Error in loadDashboardData: {e}")
-            import traceback
-            traceback.print_exc()
+        """Fetch dashboard figures in a background worker, then fill the tab"""
+        self.view.query_executor.submit(
+            'dashboard',
+            self._fetchDashboardData,
+            on_result=self._showDashboardData,
+            on_error=lambda e: print(f"Error in loadDashboardData: {e}")
+        )
 
     def switchToDashboard(self):
+        self.view.switchToTab(0)
+        self.loadDashboardData()
+
+    def _fetchDashboardData(self):
+        """Worker thread: run the dashboard queries (no widgets here)"""
+        return {
+            'total_patients': self.dashboard_model.getTotalPatients(),
+            'total_staff': self.dashboard_model.getTotalStaff(),
+            'total_revenue': self.dashboard_model.getTotalRevenue(),
+            'monthly_sales': self.dashboard_model.getMonthlySalesData(),
+        }
+
+    def _showDashboardData(self, data):
         try:
-            self.view.switchToTab(0)
-
-            # Update text fields
-            totalPatients = self.dashboard_model.getTotalPatients()
-            totalStaff = self.dashboard_model.getTotalStaff()
-            totalRevenue = self.dashboard_model.getTotalRevenue()
+            self.view.totalpatientField.setText(str(data['total_patients']))
+            self.view.totalstaffField.setText(str(data['total_staff']))
+            self.view.totalrevenueField.setText(f"₱{data['total_revenue']:,.2f}")
 
-            self.view.totalpatientField.setText(str(totalPatients))
-            self.view.totalstaffField.setText(str(totalStaff))
-            self.view.totalrevenueField.setText(f"₱{totalRevenue:,.2f}")
+            print("Dashboard data loaded successfully")
 
             # FIXED: Always reload the graph to prevent zoom issues
-            self.loadMonthlySalesGraph()
+            self.loadMonthlySalesGraph(data['monthly_sales'])
 
         except Exception as e:
-            print(f"Error in switchToDashboard: {e}")
+            print(f"Error in loadDashboardData: {e}")
             import traceback
             traceback.print_exc()
 
-    def loadMonthlySalesGraph(self):
+    def loadMonthlySalesGraph(self, df):
         """Create and display monthly sales graph in graphFrame using pandas only"""
         try:
             print("Starting to load graph...")
-
-            # Get data from model as DataFrame
-            df = self.dashboard_model.getMonthlySalesData()
             print(f"Retrieved data: {len(df)} rows")
 
             # IMPROVED: Better cleanup of previous canvas
@@ -1,7 +1,8 @@
 from PyQt6.QtCore import QDate
-from PyQt6.QtWidgets import QMessageBox, QTableWidgetItem, QHeaderView, QDialog
+from PyQt6.QtWidgets import QMessageBox, QHeaderView, QDialog
 from PyQt6.uic import loadUi
 
+from DentiCare.Controller.table_model import Column, RecordTableModel, selectedRecord
 from DentiCare.Model.patient_model import PatientModel
 
 
@@ -13,6 +14,27 @@ class PatientTabController:
         self.patient_model = PatientModel()
         self.current_form = None
 
+        # Cells are formatted on demand by the model, only for visible rows
+        stretch = QHeaderView.ResizeMode.Stretch
+        self.patient_table_model = RecordTableModel([
+            Column('Patient ID', 'PatientID'),
+            Column('Patient Name', self._formatFullName, stretch),
+            Column('Sex', 'Sex'),
+            Column('Birthday', lambda p: p['Birthday'].strftime('%Y-%m-%d') if p['Birthday'] else '', stretch),
+            Column('Contact Number', 'ContactNumber', stretch),
+            Column('Added At', lambda p: self._formatDateTime(p.get('created_at')), stretch),
+            Column('Updated At', lambda p: self._formatDateTime(p.get('updated_at')), stretch),
+        ], self.view)
+        self.patient_table_model.attachTo(self.view.patientTable)
+
+        # High-water mark for refreshPatientTable: latest updated_at shown
+        self.patients_since = None
+        self.patients_listing = False  # False while search results are shown
+
+    def _formatFullName(self, patient):
+        """Format full name for display"""
+        return f"{patient['PatientLname']}, {patient['PatientFname']} {patient['PatientMname'] or ''}".strip()
+
     def _formatDateTime(self, datetime_obj):
         """Format datetime to 12-hour format with AM/PM"""
         if not datetime_obj:
@@ -50,62 +72,77 @@ class PatientTabController:
 
             QMessageBox.information(self.current_form, "Success", "Patient added successfully")
             self.current_form.close()
-            self.loadPatientTable()
+            self.refreshPatientTable()
 
         except Exception as e:
             QMessageBox.critical(self.current_form, "Database Error",
                                  f"Error adding patient: {e}")
 
     def loadPatientTable(self):
-        """Load patient data into the table"""
-        try:
-            patientList = self.patient_model.getAllPatient()
+        """Load patient data into the table (query runs in a background worker)"""
+        self.view.query_executor.submit(
+            'patients',
+            self.patient_model.getAllPatient,
+            on_result=self._onPatientsLoaded,
+            on_error=lambda e: QMessageBox.critical(self.view, "Error", f"Failed to load patients: {e}")
+        )
 
-            table = self.view.patientTable
-            header = table.horizontalHeader()
+    def refreshPatientTable(self):
+        """Fetch only patients added or edited since the last load (plus a small overlap) and merge them in"""
+        if not self.patients_listing or self.patients_since is None:
+            self.loadPatientTable()
+            return
 
-            # Set column resize modes
-            header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)  # PatientID
-            header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)  # Patient FullName
-            header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)  # Sex
-            header.setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)  # Birthday
-            header.setSectionResizeMode(4, QHeaderView.ResizeMode.Stretch)  # ContactNum
-            header.setSectionResizeMode(5, QHeaderView.ResizeMode.Stretch)  # Added At
-            header.setSectionResizeMode(6, QHeaderView.ResizeMode.Stretch)  # Updated At
+        self.view.query_executor.submit(
+            'patients',
+            self.patient_model.getPatientsChangedSince,
+            self.patients_since,
+            on_result=self._mergeChangedPatients,
+            on_error=lambda e: QMessageBox.critical(self.view, "Error", f"Failed to load patients: {e}")
+        )
 
-            table.setRowCount(len(patientList))
+    def _onPatientsLoaded(self, patientList):
+        self.patients_listing = True
+        self.patients_since = None
+        self._advancePatientsSince(patientList)
+        self._populatePatientTable(patientList)
 
-            # Populate table
-            for row, patient in enumerate(patientList):
-                fullName = f"{patient['PatientLname']}, {patient['PatientFname']} {patient['PatientMname'] or ''}".strip()
-                birthday_str = patient['Birthday'].strftime('%Y-%m-%d') if patient['Birthday'] else ''
+    def _mergeChangedPatients(self, patientList):
+        try:
+            self._advancePatientsSince(patientList)
+            self.patient_table_model.mergeRows(
+                patientList,
+                key=lambda p: p['PatientID'],  # rows from the overlap window replace their old copy
+                sort_key=lambda p: p['PatientID'],
+                reverse=True  # same order as getAllPatient
+            )
 
-                table.setItem(row, 0, QTableWidgetItem(str(patient['PatientID'])))
-                table.setItem(row, 1, QTableWidgetItem(fullName))
-                table.setItem(row, 2, QTableWidgetItem(patient['Sex']))
-                table.setItem(row, 3, QTableWidgetItem(birthday_str))
-                table.setItem(row, 4, QTableWidgetItem(patient['ContactNumber']))
+        except Exception as e:
+            QMessageBox.critical(self.view, "Error", f"Failed to load patients: {e}")
 
-                created_at_str = self._formatDateTime(patient.get('created_at'))
-                updated_at_str = self._formatDateTime(patient.get('updated_at'))
+    def _advancePatientsSince(self, patientList):
+        stamps = [p['updated_at'] for p in patientList if p.get('updated_at')]
+        if stamps:
+            self.patients_since = max([self.patients_since, *stamps] if self.patients_since else stamps)
 
-                table.setItem(row, 5, QTableWidgetItem(created_at_str))
-                table.setItem(row, 6, QTableWidgetItem(updated_at_str))
+    def _populatePatientTable(self, patientList):
+        """Show rows from the model in the patient table"""
+        try:
+            self.patient_table_model.setRows(patientList)
 
         except Exception as e:
             QMessageBox.critical(self.view, "Error", f"Failed to load patients: {e}")
 
     def getSelectedPatient(self):
         """Get the selected patient ID from table"""
-        table = self.view.patientTable
-        row = table.currentRow()
+        patient = selectedRecord(self.view.patientTable)
 
-        if row < 0:
+        if patient is None:
             QMessageBox.warning(self.view, "Selection Error",
                                 "Please select a patient from the table first.")
             return None
 
-        patientID = table.item(row, 0).text()  # PatientID in first column
+        patientID = str(patient['PatientID'])
         return patientID
 
     def showPatientUpdateForm(self):
@@ -163,7 +200,7 @@ class PatientTabController:
             self.patient_model.updatePatient(patientID, *patientInfo)
 
             QMessageBox.information(self.view, "Success", "Patient updated successfully")
-            self.loadPatientTable()
+            self.refreshPatientTable()
             self.current_form.close()
 
         except Exception as e:
@@ -262,59 +299,35 @@ class PatientTabController:
             self.loadPatientTable()
             return
 
-        try:
-            patients = self.patient_model.searchPatientByName(search_name)
-
-            # Check if patients were found
-            if not patients:
-                QMessageBox.information(
-                    self.view,
-                    "No Patients Found",
-                    f"No patients found matching: '{search_name}'"
-                )
-                # Clear the table
-                self.view.patientTable.setRowCount(0)
-                return
+        # Same key as loadPatientTable so a pending full load can't overwrite the results
+        self.patients_listing = False
+        self.view.query_executor.submit(
+            'patients',
+            self.patient_model.searchPatientByName,
+            search_name,
+            on_result=lambda patients: self._showSearchResults(search_name, patients),
+            on_error=lambda e: QMessageBox.critical(self.view, "Error", f"Failed to search patients: {e}")
+        )
 
-            # Patients found - show success message
+    def _showSearchResults(self, search_name, patients):
+        """Show patient search results in the table"""
+        # Check if patients were found
+        if not patients:
             QMessageBox.information(
                 self.view,
-                "Patients Found",
-                f"Found {len(patients)} patient(s) matching: '{search_name}'"
+                "No Patients Found",
+                f"No patients found matching: '{search_name}'"
             )
+            # Clear the table
+            self.patient_table_model.clear()
+            return
 
-            # Update table with search results
-            table = self.view.patientTable
-            header = table.horizontalHeader()
-
-            # ✅ Set column resize modes for ALL 7 columns
-            header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)  # PatientID
-            header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)  # Patient FullName
-            header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)  # Sex
-            header.setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)  # Birthday
-            header.setSectionResizeMode(4, QHeaderView.ResizeMode.Stretch)  # ContactNum
-            header.setSectionResizeMode(5, QHeaderView.ResizeMode.Stretch)  # Added At
-            header.setSectionResizeMode(6, QHeaderView.ResizeMode.Stretch)  # Updated At
-
-            table.setRowCount(len(patients))
-
-            # ✅ Populate table with search results INCLUDING timestamps
-            for row, patient in enumerate(patients):
-                fullName = f"{patient['PatientLname']}, {patient['PatientFname']} {patient['PatientMname'] or ''}".strip()
-                birthday_str = patient['Birthday'].strftime('%Y-%m-%d') if patient['Birthday'] else ''
-
-                table.setItem(row, 0, QTableWidgetItem(str(patient['PatientID'])))
-                table.setItem(row, 1, QTableWidgetItem(fullName))
-                table.setItem(row, 2, QTableWidgetItem(patient['Sex']))
-                table.setItem(row, 3, QTableWidgetItem(birthday_str))
-                table.setItem(row, 4, QTableWidgetItem(patient['ContactNumber']))
-
-                # ✅ Add timestamp columns
-                created_at_str = self._formatDateTime(patient.get('created_at'))
-                updated_at_str = self._formatDateTime(patient.get('updated_at'))
-
-                table.setItem(row, 5, QTableWidgetItem(created_at_str))
-                table.setItem(row, 6, QTableWidgetItem(updated_at_str))
+        # Patients found - show success message
+        QMessageBox.information(
+            self.view,
+            "Patients Found",
+            f"Found {len(patients)} patient(s) matching: '{search_name}'"
+        )
 
-        except Exception as e:
-            QMessageBox.critical(self.view, "Error", f"Failed to search patients: {e}")
\ No newline at end of file
+        # Update table with search results
+        self._populatePatientTable(patients)
@@ -0,0 +1,279 @@
+"""
+ReportLab styles and fixed elements shared by the receipt and report PDFs.
+
+getSampleStyleSheet(), the ParagraphStyles/TableStyles and the paragraphs
+that never change (clinic header, VAT footer) are built once per process by
+templates(). Each render then only builds its variable content.
+"""
+
+import copy
+import functools
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import Paragraph, TableStyle
+
+CLINIC_COLOR = colors.HexColor('#1A1054')
+
+
+class Templates:
+    """Everything the PDFs reuse between renders; build through templates()"""
+
+    def __init__(self):
+        styles = getSampleStyleSheet()
+
+        # Receipt
+        self.receipt_title = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=CLINIC_COLOR,
+            spaceAfter=30,
+            alignment=TA_CENTER
+        )
+        self.receipt_heading = ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=14,
+            textColor=CLINIC_COLOR,
+            spaceAfter=12
+        )
+        self.receipt_notes = ParagraphStyle(
+            'NotesStyle',
+            parent=styles['Normal'],
+            fontSize=10,
+            leading=14,
+            leftIndent=20,
+            rightIndent=20,
+            spaceAfter=10
+        )
+        self.vat_info = ParagraphStyle(
+            'VATInfo',
+            parent=styles['Normal'],
+            fontSize=8,
+            textColor=colors.grey,
+            alignment=TA_CENTER,
+            spaceAfter=10
+        )
+        self.receipt_footer = ParagraphStyle(
+            'Footer',
+            parent=styles['Normal'],
+            fontSize=10,
+            textColor=colors.grey,
+            alignment=TA_CENTER
+        )
+
+        self.receipt_info_table = TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 11),
+            ('TEXTCOLOR', (0, 0), (0, -1), CLINIC_COLOR),
+            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ])
+        self.receipt_service_table = TableStyle([
+            # Header row
+            ('BACKGROUND', (0, 0), (-1, 0), CLINIC_COLOR),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+
+            # Data rows
+            ('FONTNAME', (0, 1), (-1, -4), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -4), 9),
+            ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
+            ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+            ('GRID', (0, 0), (-1, -4), 1, colors.grey),
+            ('BOTTOMPADDING', (0, 1), (-1, -4), 6),
+            ('TOPPADDING', (0, 1), (-1, -4), 6),
+
+            # Summary rows (Subtotal, VAT, TOTAL)
+            ('FONTNAME', (0, -3), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, -3), (-1, -2), 10),
+            ('FONTSIZE', (0, -1), (-1, -1), 12),
+            ('LINEABOVE', (0, -3), (-1, -3), 1, colors.grey),
+            ('LINEABOVE', (0, -1), (-1, -1), 2, CLINIC_COLOR),
+            ('BOTTOMPADDING', (0, -3), (-1, -1), 6),
+            ('TOPPADDING', (0, -3), (-1, -1), 6),
+        ])
+
+        # Reports (monthly report and records export)
+        self.report_title = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=20,
+            textColor=CLINIC_COLOR,
+            spaceAfter=20,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        )
+        self.report_heading = ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=14,
+            textColor=CLINIC_COLOR,
+            spaceAfter=12,
+            fontName='Helvetica-Bold'
+        )
+        self.export_notes = ParagraphStyle(
+            'NotesStyle',
+            parent=styles['Normal'],
+            fontSize=9,
+            leading=12,
+            leftIndent=10,
+            textColor=colors.HexColor('#333333'),
+            spaceAfter=8
+        )
+        self.export_footer = ParagraphStyle(
+            'Footer',
+            parent=styles['Normal'],
+            fontSize=8,
+            textColor=colors.grey,
+            alignment=TA_CENTER
+        )
+
+        self.monthly_summary_table = TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 11),
+            ('TEXTCOLOR', (0, 0), (0, -1), CLINIC_COLOR),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ])
+        self.monthly_service_table = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), CLINIC_COLOR),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 11),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 10),
+            ('ALIGN', (1, 1), (-1, -1), 'CENTER'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+            ('TOPPADDING', (0, 1), (-1, -1), 6),
+        ])
+        self.monthly_transaction_table = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), CLINIC_COLOR),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 8),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 7),
+            ('ALIGN', (0, 1), (0, -1), 'CENTER'),  # ID
+            ('ALIGN', (5, 1), (5, -1), 'CENTER'),  # Qty
+            ('ALIGN', (6, 1), (6, -1), 'RIGHT'),  # Amount
+            ('ALIGN', (7, 1), (7, -1), 'CENTER'),  # Date
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
+            ('TOPPADDING', (0, 1), (-1, -1), 4),
+        ])
+
+        self.export_patient_info_table = TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('TEXTCOLOR', (0, 0), (0, -1), CLINIC_COLOR),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ])
+        self.export_transaction_info_table = TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ])
+        self.export_service_table = TableStyle([
+            # Header
+            ('BACKGROUND', (0, 0), (-1, 0), CLINIC_COLOR),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 8),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+
+            # Data rows
+            ('FONTNAME', (0, 1), (-1, -4), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -4), 7),
+            ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
+            ('GRID', (0, 0), (-1, -4), 0.5, colors.grey),
+            ('BOTTOMPADDING', (0, 1), (-1, -4), 4),
+            ('TOPPADDING', (0, 1), (-1, -4), 4),
+
+            # Summary rows
+            ('FONTNAME', (0, -3), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, -3), (-1, -2), 8),
+            ('FONTSIZE', (0, -1), (-1, -1), 9),
+            ('LINEABOVE', (0, -3), (-1, -3), 1, colors.grey),
+            ('LINEABOVE', (0, -1), (-1, -1), 1, CLINIC_COLOR),
+            ('BOTTOMPADDING', (0, -3), (-1, -1), 4),
+            ('TOPPADDING', (0, -3), (-1, -1), 4),
+        ])
+        self.export_summary_table = TableStyle([
+            ('FONTNAME', (0, 0), (-1, -2), 'Helvetica'),
+            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -2), 11),
+            ('FONTSIZE', (0, -1), (-1, -1), 12),
+            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('LINEABOVE', (0, -1), (-1, -1), 2, CLINIC_COLOR),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+            ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ])
+
+        # Fixed paragraphs, parsed once
+        self._receipt_clinic_title = Paragraph("<b>DENTICARE CLINIC</b>", self.receipt_title)
+        self._receipt_heading = Paragraph("<b>PAYMENT RECEIPT</b>", self.receipt_heading)
+        self._receipt_services_heading = Paragraph("<b>SERVICES</b>", self.receipt_heading)
+        self._receipt_notes_heading = Paragraph("<b>NOTES</b>", self.receipt_heading)
+        self._receipt_vat_info = Paragraph(
+            "<b>VAT-Registered Business</b><br/>"
+            "TIN: [Your TIN Here]<br/>"
+            "VAT rate of 12% is already included in the final price",
+            self.vat_info
+        )
+        self._receipt_thanks = Paragraph(
+            "Thank you for choosing DentiCare Clinic!<br/>For concerns, please contact us.",
+            self.receipt_footer
+        )
+        self._report_clinic_title = Paragraph("<b>DENTICARE CLINIC</b>", self.report_title)
+
+    # Paragraph layout state (wrap/split results) is stored on the instance,
+    # so every document gets its own shallow copy of the parsed paragraph
+
+    def receiptClinicTitle(self):
+        return copy.copy(self._receipt_clinic_title)
+
+    def receiptHeading(self):
+        return copy.copy(self._receipt_heading)
+
+    def receiptServicesHeading(self):
+        return copy.copy(self._receipt_services_heading)
+
+    def receiptNotesHeading(self):
+        return copy.copy(self._receipt_notes_heading)
+
+    def receiptVATInfo(self):
+        return copy.copy(self._receipt_vat_info)
+
+    def receiptThanks(self):
+        return copy.copy(self._receipt_thanks)
+
+    def reportClinicTitle(self):
+        return copy.copy(self._report_clinic_title)
+
+
+@functools.lru_cache(maxsize=None)
+def templates():
+    """The process-wide Templates, built on first use"""
+    return Templates()
@@ -0,0 +1,119 @@
+import traceback
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+
+class _WorkerSignals(QObject):
+    # key, generation, result / exception
+    finished = pyqtSignal(str, int, object)
+    failed = pyqtSignal(str, int, object)
+
+
+class _QueryWorker(QRunnable):
+    """Runs one model call on a pool thread"""
+
+    def __init__(self, key, generation, func, args, kwargs):
+        super().__init__()
+        self.key = key
+        self.generation = generation
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = _WorkerSignals()
+        self.cancelled = False
+        self.setAutoDelete(False)
+
+    def run(self):
+        if self.cancelled:
+            # Still report back so the executor can release this worker
+            self.signals.finished.emit(self.key, self.generation, None)
+            return
+        try:
+            result = self.func(*self.args, **self.kwargs)
+        except Exception as e:
+            print(f"ERROR in background query '{self.key}': {e}")
+            traceback.print_exc()
+            self.signals.failed.emit(self.key, self.generation, e)
+        else:
+            self.signals.finished.emit(self.key, self.generation, result)
+
+
+class QueryExecutor(QObject):
+    """
+    Runs model methods off the GUI thread and hands results back on it.
+
+    Every request has a key (for example 'patients' or 'records'). Submitting a
+    new request with the same key supersedes the old one: if it has not started
+    yet it is removed from the queue, and if it is already running its result
+    is dropped. cancelAll() does the same for every key (used on tab switches).
+    """
+
+    def __init__(self, parent=None, max_threads=4):
+        super().__init__(parent)
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        self._generation = {}  # key -> latest generation
+        self._pending = {}     # (key, generation) -> (on_result, on_error)
+        self._workers = {}     # (key, generation) -> worker, kept alive until it reports back
+
+    def submit(self, key, func, *args, on_result=None, on_error=None, **kwargs):
+        """Run func(*args, **kwargs) in a worker; callbacks run on the GUI thread"""
+        self.cancel(key)
+        generation = self._generation.get(key, 0) + 1
+        self._generation[key] = generation
+
+        worker = _QueryWorker(key, generation, func, args, kwargs)
+        worker.signals.finished.connect(self._onFinished)
+        worker.signals.failed.connect(self._onFailed)
+        self._pending[(key, generation)] = (on_result, on_error)
+        self._workers[(key, generation)] = worker
+
+        self.pool.start(worker)
+        return generation
+
+    def cancel(self, key):
+        """Drop any outstanding request for key"""
+        generation = self._generation.get(key)
+        if generation is None:
+            return
+        self._generation[key] = generation + 1
+
+        self._pending.pop((key, generation), None)
+        worker = self._workers.get((key, generation))
+        if worker is not None:
+            worker.cancelled = True
+            if self.pool.tryTake(worker):
+                # Never started, nothing will report back
+                del self._workers[(key, generation)]
+
+    def cancelAll(self):
+        for key in list(self._generation):
+            self.cancel(key)
+
+    def isBusy(self, key):
+        return (key, self._generation.get(key)) in self._pending
+
+    def _take(self, key, generation):
+        self._workers.pop((key, generation), None)
+        entry = self._pending.pop((key, generation), None)
+        if entry is None or self._generation.get(key) != generation:
+            return None  # superseded or cancelled
+        return entry
+
+    @pyqtSlot(str, int, object)
+    def _onFinished(self, key, generation, result):
+        entry = self._take(key, generation)
+        if entry is not None and entry[0] is not None:
+            entry[0](result)
+
+    @pyqtSlot(str, int, object)
+    def _onFailed(self, key, generation, error):
+        entry = self._take(key, generation)
+        if entry is not None and entry[1] is not None:
+            entry[1](error)
+
+    def shutdown(self, wait_ms=3000):
+        """Drop pending work and wait briefly for running workers"""
+        self.cancelAll()
+        self.pool.clear()
+        self.pool.waitForDone(wait_ms)
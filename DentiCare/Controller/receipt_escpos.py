@@ -0,0 +1,113 @@
+"""
+Plain-text receipts for 80mm ESC/POS thermal printers.
+
+Same content as the PDF receipt (services, VAT breakdown, totals, notes),
+laid out in fixed-width columns and wrapped in the few ESC/POS commands every
+such printer understands. Pure string formatting, so it renders in
+microseconds; the PDF can still be written in the background for the archive.
+"""
+
+import textwrap
+
+COLUMNS = 48  # Font A characters per line on 80mm paper
+
+# ESC/POS commands
+INIT = b'\x1b@'
+ALIGN_LEFT = b'\x1ba\x00'
+ALIGN_CENTER = b'\x1ba\x01'
+BOLD_ON = b'\x1bE\x01'
+BOLD_OFF = b'\x1bE\x00'
+DOUBLE_SIZE = b'\x1d!\x11'
+DOUBLE_HEIGHT = b'\x1d!\x01'
+NORMAL_SIZE = b'\x1d!\x00'
+FEED_AND_CUT = b'\x1bd\x04\x1dV\x00'
+
+ENCODING = 'cp437'  # printer default code page; no peso sign, amounts use "PHP"
+
+
+def _money(amount):
+    return f"{amount:,.2f}"
+
+
+def _columns(left, right, width=COLUMNS):
+    """left text and right-aligned right text on one line, left truncated if needed"""
+    room = width - len(right) - 1
+    if len(left) > room:
+        left = left[:room - 3] + '...' if room > 3 else left[:room]
+    return f"{left:<{room}} {right}"
+
+
+def formatReceiptLines(transaction_id, patient_name, staff_name, total_amount,
+                       transaction_date, service_details, notes=None, width=COLUMNS):
+    """The receipt body as (style, text) pairs; style is None, 'bold' or 'total'"""
+    rule = '-' * width
+    lines = [
+        (None, f"Transaction ID: {transaction_id}"),
+        (None, f"Date: {transaction_date.strftime('%B %d, %Y')}"),
+        (None, f"Patient: {patient_name}"),
+        (None, f"Processed by: {staff_name}"),
+        (None, rule),
+        ('bold', _columns("Service           Qty", "Amount", width)),
+        (None, rule),
+    ]
+
+    total_base = 0
+    total_vat = 0
+    for detail in service_details:
+        base_price = detail.get('base_price', 0)
+        vat_amount = detail.get('vat_amount', 0)
+        price = detail['price']
+        quantity = detail['quantity']
+
+        total_base += base_price * quantity
+        total_vat += vat_amount * quantity
+
+        name = detail['service_name'][:17]
+        lines.append((None, _columns(f"{name:<17} {quantity:>3}", _money(price * quantity), width)))
+        if vat_amount > 0:
+            lines.append((None, f"  @{_money(price)} (base {_money(base_price)} + VAT {_money(vat_amount)})"[:width]))
+        else:
+            lines.append((None, f"  @{_money(price)} (no VAT)"))
+
+    lines += [
+        (None, rule),
+        (None, _columns("Subtotal", _money(total_base), width)),
+        (None, _columns("VAT (12%)", _money(total_vat), width)),
+        ('total', _columns("TOTAL", f"PHP {_money(total_amount)}", width)),
+        (None, rule),
+    ]
+
+    if notes:
+        lines.append(('bold', "Notes:"))
+        for paragraph in notes.split('\n'):
+            lines += [(None, line) for line in (textwrap.wrap(paragraph, width) or [''])]
+        lines.append((None, rule))
+
+    return lines
+
+
+def buildEscPosReceipt(transaction_id, patient_name, staff_name, total_amount,
+                       transaction_date, service_details, notes=None, width=COLUMNS):
+    """The full ticket as bytes ready for the printer: header, body, footer and paper cut"""
+    out = [INIT, ALIGN_CENTER, DOUBLE_SIZE, BOLD_ON, b"DENTICARE CLINIC\n", NORMAL_SIZE,
+           b"PAYMENT RECEIPT\n", BOLD_OFF, b"\n", ALIGN_LEFT]
+
+    for style, text in formatReceiptLines(transaction_id, patient_name, staff_name, total_amount,
+                                          transaction_date, service_details, notes, width):
+        encoded = text.encode(ENCODING, errors='replace') + b"\n"
+        if style == 'bold':
+            out += [BOLD_ON, encoded, BOLD_OFF]
+        elif style == 'total':
+            out += [BOLD_ON, DOUBLE_HEIGHT, encoded, NORMAL_SIZE, BOLD_OFF]
+        else:
+            out.append(encoded)
+
+    out += [ALIGN_CENTER,
+            b"VAT-Registered Business\n",
+            b"TIN: [Your TIN Here]\n",
+            "\n".join(textwrap.wrap("VAT rate of 12% is already included in the final price", width)).encode(ENCODING),
+            b"\n\n",
+            b"Thank you for choosing DentiCare Clinic!\n",
+            b"For concerns, please contact us.\n",
+            FEED_AND_CUT]
+    return b"".join(out)
@@ -0,0 +1,161 @@
+import os
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from DentiCare.Controller.query_executor import QueryExecutor
+
+# Receipt settings are read from the environment when the app starts, so each
+# front desk machine can be set up without editing the code.
+
+# How receipts are produced after checkout (DENTICARE_RECEIPT_MODE):
+#   'file'    - written to receipts/ and opened from there
+#   'memory'  - rendered into memory and previewed or printed from there; a copy
+#               is written to receipts/ in the background if SAVE_MEMORY_RECEIPTS
+#   'thermal' - printed as ESC/POS text on THERMAL_PRINTER; the PDF is written
+#               to receipts/ in the background as the archive copy
+RECEIPT_MODES = ('file', 'memory', 'thermal')
+RECEIPT_MODE = os.environ.get('DENTICARE_RECEIPT_MODE', 'file').strip().lower()
+if RECEIPT_MODE not in RECEIPT_MODES:
+    print(f"WARNING: Unknown DENTICARE_RECEIPT_MODE {RECEIPT_MODE!r}, using 'file'")
+    RECEIPT_MODE = 'file'
+
+# DENTICARE_SAVE_MEMORY_RECEIPTS=0 keeps memory mode receipts off the disk
+SAVE_MEMORY_RECEIPTS = os.environ.get('DENTICARE_SAVE_MEMORY_RECEIPTS', '1').strip().lower() not in (
+    '0', 'false', 'no', 'off')
+
+# Thermal printer device (e.g. /dev/usb/lp0, or \\.\COM3 on Windows), or a
+# directory that a print spooler watches for .escpos files (DENTICARE_THERMAL_PRINTER)
+THERMAL_PRINTER = os.environ.get('DENTICARE_THERMAL_PRINTER', '/dev/usb/lp0')
+
+
+class ReceiptPrintError(Exception):
+    """Raised by a render function when the receipt could not be sent to the printer"""
+
+
+class ReceiptJob:
+    """Handle for one receipt being rendered in the background"""
+
+    RENDERING = 'rendering'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, transaction_id):
+        self.transaction_id = transaction_id
+        self.status = self.RENDERING
+        self.filename = None
+        self.pdf_bytes = None  # set in memory mode
+        self.printed = False  # sent straight to a printer (thermal mode)
+        self.print_error = None  # printing failed; the archive copy is still saved
+        self.error = None
+        self.save_error = None
+
+    def isReady(self):
+        return self.status == self.DONE and (self.filename is not None or self.pdf_bytes is not None)
+
+
+class ReceiptJobs(QObject):
+    """
+    Renders receipts off the GUI thread so checkout returns after the commit.
+
+    Has its own executor: tab switches cancel the view's queries, but a
+    receipt for a committed transaction must still be written. job_changed
+    is emitted on the GUI thread whenever a job starts, finishes or fails.
+    A failed receipt can be rendered again from the saved transaction with
+    retry(transaction_id).
+
+    render may return a filename, the PDF bytes, or None when it sent the
+    receipt straight to a printer. Unless it returned a filename the job is
+    done right away; save, if given, then writes the archive PDF in the
+    background from (receipt data, render result) and fills in job.filename.
+
+    A render that raises ReceiptPrintError still leaves the job done: the
+    archive PDF is saved all the same, job.print_error is set and
+    print_failed is emitted once.
+    """
+
+    job_changed = pyqtSignal(object)
+    print_failed = pyqtSignal(object)
+
+    def __init__(self, render, load_receipt_data, parent=None, max_threads=2, save=None):
+        super().__init__(parent)
+        self.executor = QueryExecutor(self, max_threads)
+        self._render = render  # receipt data dict -> filename, PDF bytes or None
+        self._load_receipt_data = load_receipt_data  # transaction ID -> receipt data dict
+        self._save = save  # (receipt data dict, render result) -> filename
+        self.jobs = {}  # TransactionID -> latest ReceiptJob
+
+    def submit(self, transaction_id, receipt_data):
+        """Render from data already in memory (right after checkout)"""
+        return self._start(transaction_id, self._renderData, receipt_data)
+
+    def retry(self, transaction_id):
+        """Render again from what was saved in the database"""
+        return self._start(transaction_id, self._renderSaved, transaction_id)
+
+    def savesToDisk(self):
+        return self._save is not None
+
+    def job(self, transaction_id):
+        return self.jobs.get(transaction_id)
+
+    def _renderData(self, receipt_data):
+        try:
+            return receipt_data, self._render(receipt_data), None
+        except ReceiptPrintError as e:
+            # Nothing was printed, but the transaction still needs its archive copy
+            return receipt_data, None, e
+
+    def _renderSaved(self, transaction_id):
+        receipt_data = self._load_receipt_data(transaction_id)
+        if receipt_data is None:
+            raise ValueError(f"Transaction {transaction_id} not found")
+        return self._renderData(receipt_data)
+
+    def _start(self, transaction_id, func, arg):
+        job = ReceiptJob(transaction_id)
+        self.jobs[transaction_id] = job
+        self.executor.submit(
+            f'receipt-{transaction_id}',
+            func,
+            arg,
+            on_result=lambda rendered: self._finish(job, *rendered),
+            on_error=lambda e: self._fail(job, e)
+        )
+        self.job_changed.emit(job)
+        return job
+
+    def _finish(self, job, receipt_data, result, print_error):
+        job.status = ReceiptJob.DONE
+        if isinstance(result, str):
+            job.filename = result
+        else:
+            job.pdf_bytes = result
+            job.printed = result is None and print_error is None
+            job.print_error = print_error
+            if self._save is not None:
+                self.executor.submit(
+                    f'receipt-save-{job.transaction_id}',
+                    self._save,
+                    receipt_data,
+                    result,
+                    on_result=lambda filename: self._saved(job, filename),
+                    on_error=lambda e: self._saveFailed(job, e)
+                )
+        self.job_changed.emit(job)
+        if print_error is not None:
+            self.print_failed.emit(job)
+
+    def _saved(self, job, filename):
+        job.filename = filename
+        self.job_changed.emit(job)
+
+    def _saveFailed(self, job, error):
+        # The receipt was printed or is still in memory, so it isn't lost
+        print(f"WARNING: Failed to save receipt {job.transaction_id}: {error}")
+        job.save_error = error
+        self.job_changed.emit(job)
+
+    def _fail(self, job, error):
+        job.status = ReceiptJob.FAILED
+        job.error = error
+        self.job_changed.emit(job)
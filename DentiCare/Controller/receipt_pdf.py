@@ -0,0 +1,472 @@
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
+
+from DentiCare.Controller.pdf_templates import CLINIC_COLOR, templates
+
+# Geometry of the platypus layout (SimpleDocTemplate defaults: 1in margins,
+# 6pt frame padding), used by the canvas fast path to draw the same page
+PAGE_WIDTH, PAGE_HEIGHT = letter
+FRAME_LEFT = inch + 6
+FRAME_WIDTH = PAGE_WIDTH - 2 * inch - 12
+FRAME_TOP = PAGE_HEIGHT - inch - 6
+FRAME_BOTTOM = inch + 6
+
+INFO_COLUMNS = (2 * inch, 4 * inch)
+SERVICE_COLUMNS = (2.3 * inch, 0.9 * inch, 0.7 * inch, 0.9 * inch, 0.6 * inch, 1 * inch)
+CELL_PADDING = 6
+
+TITLE_LEADING = 22
+HEADING_LEADING = 18
+HEADING_SPACE = 12                            # spaceBefore and spaceAfter
+CELL_LEADING = 12                             # Table default; FONTSIZE doesn't change it
+INFO_ROW_HEIGHT = 3 + CELL_LEADING + 8        # padding + leading + padding
+SERVICE_HEADER_HEIGHT = 3 + CELL_LEADING + 12
+SERVICE_ROW_HEIGHT = 6 + CELL_LEADING + 6
+SUMMARY_ROW_HEIGHT = 6 + CELL_LEADING + 6
+NOTES_WIDTH = FRAME_WIDTH - 40                # left and right indent
+NOTES_LEADING = 14
+FOOTER_LEADING = 12
+VAT_INFO_LINES = (
+    ("Helvetica-Bold", "VAT-Registered Business"),
+    ("Helvetica", "TIN: [Your TIN Here]"),
+    ("Helvetica", "VAT rate of 12% is already included in the final price"),
+)
+THANKS_LINES = ("Thank you for choosing DentiCare Clinic!", "For concerns, please contact us.")
+FUZZ = 1e-6                                   # Frame's tolerance
+
+
+def renderReceiptPDF(filename, transaction_id, patient_name, staff_name, total_amount,
+                     transaction_date, service_details, notes=None):
+    """
+    Draw the receipt straight on a canvas when it can be, else lay it out with platypus.
+
+    filename may also be a binary file object such as BytesIO (both renderers accept one).
+    """
+    if receiptFitsCanvas(service_details, notes):
+        return drawReceiptPDF(filename, transaction_id, patient_name, staff_name, total_amount,
+                              transaction_date, service_details, notes)
+    return buildReceiptPDF(filename, transaction_id, patient_name, staff_name, total_amount,
+                           transaction_date, service_details, notes)
+
+
+def _notesLines(notes):
+    """
+    Notes broken into lines the way Paragraph breaks them (each space may
+    shrink a little to fit one more word). Returns the lines and the indexes
+    of those that end in a line break.
+    """
+    space = stringWidth(' ', "Helvetica", 10)
+    shrink = templates().receipt_notes.spaceShrinkage * space
+    paragraphs = notes.split('\n')
+    if len(paragraphs) > 1 and not paragraphs[-1].strip():
+        paragraphs.pop()  # Paragraph drops the empty line after a final line break
+    lines = []
+    breaks = set()
+    for paragraph in paragraphs:
+        if lines:
+            breaks.add(len(lines) - 1)
+        line, width = [], -space
+        for word in paragraph.split():
+            word_width = stringWidth(word, "Helvetica", 10)
+            if line and width + space + word_width > NOTES_WIDTH + shrink * len(line):
+                lines.append(' '.join(line))
+                line, width = [], -space
+            line.append(word)
+            width += space + word_width
+        lines.append(' '.join(line))
+    return lines, breaks
+
+
+def receiptFitsCanvas(service_details, notes=None):
+    """
+    True when the canvas fast path lays the receipt out exactly as platypus
+    would, over as many pages as it takes. Notes that Paragraph would treat
+    differently (markup characters, soft hyphens, a word wider than the
+    notes column, nothing but whitespace) are left to platypus.
+    """
+    if not notes:
+        return True
+    if not notes.strip() or any(char in notes for char in '<>&\xad'):
+        return False
+    return all(stringWidth(word, "Helvetica", 10) <= NOTES_WIDTH for word in notes.split())
+
+
+class _CanvasFlow:
+    """
+    Places blocks down the page the way platypus' Frame does: space before a
+    block is dropped at the top of a page and overlaps the previous block's
+    space after; a block that does not fit moves to the next page, and tables
+    and paragraphs are split by row and by line (at least two lines) first.
+    """
+
+    def __init__(self, c):
+        self.c = c
+        self._startPage()
+
+    def _startPage(self):
+        self.y = FRAME_TOP
+        self.at_top = True
+        self.space_after = 0
+
+    def _newPage(self):
+        self.c.showPage()
+        self._startPage()
+
+    def _top(self, space_before):
+        if self.at_top:
+            return self.y
+        return self.y - max(space_before - self.space_after, 0)
+
+    def _room(self, space_before):
+        return self._top(space_before) - FRAME_BOTTOM
+
+    def _put(self, height, space_before, space_after):
+        top = self._top(space_before)
+        y = top - height - space_after
+        if y != self.y:
+            self.at_top = False
+        self.y = y
+        self.space_after = space_after
+        return top
+
+    def block(self, height, space_before=0, space_after=0):
+        """Top of an unsplittable block (a one-line paragraph or a spacer)"""
+        if height > self._room(space_before) + FUZZ:
+            self._newPage()
+        return self._put(height, space_before, space_after)
+
+    def rows(self, heights):
+        """Yields (top, start, end) for the rows of a table that land on each page"""
+        start = 0
+        while start < len(heights):
+            room = self._room(0)
+            if sum(heights[start:]) <= room + FUZZ:
+                end = len(heights)
+            else:
+                end, used = start, 0
+                while end < len(heights) and used + heights[end] <= room:
+                    used += heights[end]
+                    end += 1
+                if end == start:
+                    self._newPage()
+                    continue
+            yield self._put(sum(heights[start:end]), 0, 0), start, end
+            if end < len(heights):
+                self._newPage()
+            start = end
+
+    def lines(self, count, leading, breaks=(), space_before=0, space_after=0):
+        """
+        Yields (top, start, end) for the lines of a paragraph that land on
+        each page. breaks holds the indexes of lines ending in a line break;
+        like Paragraph.split, a paragraph continued after one of those starts
+        the next page with a blank line.
+        """
+        start = 0
+        blank = 0
+        while start < count:
+            room = self._room(space_before)
+            fit = blank + count - start
+            if fit * leading > room + FUZZ:
+                fit = int(room / leading) if room >= FUZZ else 0
+                if fit <= 1:  # no orphans
+                    self._newPage()
+                    continue
+            end = start + fit - blank
+            yield self._put(fit * leading, space_before, space_after) - blank * leading, start, end
+            if end < count:
+                self._newPage()
+            blank = 1 if end - 1 in breaks else 0
+            start = end
+
+
+def drawReceiptPDF(filename, transaction_id, patient_name, staff_name, total_amount,
+                   transaction_date, service_details, notes=None):
+    """
+    Write the receipt directly on a canvas at fixed coordinates.
+
+    Same content, look and page breaks as buildReceiptPDF without the layout
+    engine; callers should go through renderReceiptPDF, which checks that the
+    notes can be wrapped the same way.
+    """
+    c = canvas.Canvas(filename, pagesize=letter)
+    flow = _CanvasFlow(c)
+
+    # Title
+    top = flow.block(TITLE_LEADING, space_after=30)
+    c.setFillColor(CLINIC_COLOR)
+    c.setFont("Helvetica-Bold", 24)
+    c.drawCentredString(FRAME_LEFT + FRAME_WIDTH / 2, top - 24, "DENTICARE CLINIC")
+    flow.block(0.2 * inch)
+
+    # Receipt Header
+    _drawHeading(c, flow, "PAYMENT RECEIPT")
+    flow.block(0.3 * inch)
+
+    # Transaction Information
+    info_data = [
+        ('Transaction ID:', str(transaction_id)),
+        ('Date:', transaction_date.strftime('%B %d, %Y')),
+        ('Patient Name:', patient_name),
+        ('Processed by:', staff_name),
+    ]
+    x = FRAME_LEFT + (FRAME_WIDTH - sum(INFO_COLUMNS)) / 2
+    for top, start, end in flow.rows([INFO_ROW_HEIGHT] * len(info_data)):
+        for label, value in info_data[start:end]:
+            baseline = _cellBaseline(top - INFO_ROW_HEIGHT, 8, 11)
+            c.setFillColor(CLINIC_COLOR)
+            c.setFont("Helvetica-Bold", 11)
+            c.drawRightString(x + INFO_COLUMNS[0] - CELL_PADDING, baseline, label)
+            c.setFillColor(colors.black)
+            c.setFont("Helvetica", 11)
+            c.drawString(x + INFO_COLUMNS[0] + CELL_PADDING, baseline, value)
+            top -= INFO_ROW_HEIGHT
+    flow.block(0.4 * inch)
+
+    # Services Header
+    _drawHeading(c, flow, "SERVICES")
+    flow.block(0.1 * inch)
+
+    # Services Table with VAT breakdown
+    rows = _serviceRows(service_details, total_amount)
+    for top, start, end in flow.rows([row[2] for row in rows]):
+        _drawServiceRows(c, top, rows[start:end], rows[end] if end < len(rows) else None)
+    flow.block(0.3 * inch)
+
+    # Notes section
+    if notes:
+        _drawHeading(c, flow, "NOTES")
+        flow.block(0.1 * inch)
+        notes_lines, breaks = _notesLines(notes)
+        for top, start, end in flow.lines(len(notes_lines), NOTES_LEADING, breaks, space_after=10):
+            c.setFillColor(colors.black)
+            c.setFont("Helvetica", 10)
+            for line in notes_lines[start:end]:
+                # A line that only fits with shrunk spaces is drawn with them shrunk
+                overflow = stringWidth(line, "Helvetica", 10) - NOTES_WIDTH
+                spaces = line.count(' ')
+                word_space = -overflow / spaces if overflow > 0 and spaces else None
+                c.drawString(FRAME_LEFT + 20, top - 10, line, wordSpace=word_space)
+                top -= NOTES_LEADING
+        flow.block(0.3 * inch)
+
+    # VAT Information Footer
+    vat_breaks = range(len(VAT_INFO_LINES) - 1)
+    for top, start, end in flow.lines(len(VAT_INFO_LINES), FOOTER_LEADING, vat_breaks, space_after=10):
+        c.setFillColor(colors.grey)
+        for font, text in VAT_INFO_LINES[start:end]:
+            c.setFont(font, 8)
+            c.drawCentredString(FRAME_LEFT + FRAME_WIDTH / 2, top - 8, text)
+            top -= FOOTER_LEADING
+
+    # Footer
+    thanks_breaks = range(len(THANKS_LINES) - 1)
+    for top, start, end in flow.lines(len(THANKS_LINES), FOOTER_LEADING, thanks_breaks):
+        c.setFillColor(colors.grey)
+        c.setFont("Helvetica", 10)
+        for text in THANKS_LINES[start:end]:
+            c.drawCentredString(FRAME_LEFT + FRAME_WIDTH / 2, top - 10, text)
+            top -= FOOTER_LEADING
+
+    c.showPage()
+    c.save()
+    return filename
+
+
+def _cellBaseline(row_bottom, bottom_padding, font_size):
+    """Where Table puts a bottom-aligned line of text in a row"""
+    return row_bottom + bottom_padding + CELL_LEADING - font_size
+
+
+def _drawHeading(c, flow, text):
+    top = flow.block(HEADING_LEADING, HEADING_SPACE, HEADING_SPACE)
+    c.setFillColor(CLINIC_COLOR)
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(FRAME_LEFT, top - 14, text)
+
+
+def _serviceRows(service_details, total_amount):
+    """(kind, cells, height) for the header, one row per service and the three summary rows"""
+    rows = [('header', ('Service', 'Base Price', 'VAT', 'Price', 'Qty', 'Subtotal'), SERVICE_HEADER_HEIGHT)]
+
+    total_base = 0
+    total_vat = 0
+    for detail in service_details:
+        base_price = detail.get('base_price', 0)
+        vat_amount = detail.get('vat_amount', 0)
+        price = detail['price']
+        quantity = detail['quantity']
+        subtotal = price * quantity
+
+        total_base += base_price * quantity
+        total_vat += vat_amount * quantity
+
+        # Show VAT breakdown only if VAT is applicable
+        vat_display = f"₱{vat_amount:.2f}" if vat_amount > 0 else "N/A"
+        rows.append(('service', (detail['service_name'], f"₱{base_price:.2f}", vat_display, f"₱{price:.2f}",
+                                 str(quantity), f"₱{subtotal:.2f}"), SERVICE_ROW_HEIGHT))
+
+    # Summary rows (Subtotal, VAT, TOTAL)
+    rows.append(('subtotal', ('Subtotal:', f"₱{total_base:.2f}"), SUMMARY_ROW_HEIGHT))
+    rows.append(('vat', ('VAT (12%):', f"₱{total_vat:.2f}"), SUMMARY_ROW_HEIGHT))
+    rows.append(('total', ('TOTAL:', f"₱{total_amount:.2f}"), SUMMARY_ROW_HEIGHT))
+    return rows
+
+
+def _lineAbove(c, kind, edges, y):
+    """The rules above the Subtotal and TOTAL rows"""
+    if kind == 'subtotal':
+        c.setStrokeColor(colors.grey)
+        c.setLineWidth(1)
+        c.line(edges[0], y, edges[-1], y)
+    elif kind == 'total':
+        c.setStrokeColor(CLINIC_COLOR)
+        c.setLineWidth(2)
+        c.line(edges[0], y, edges[-1], y)
+
+
+def _drawServiceRows(c, top, rows, next_row=None):
+    """
+    The part of the services table that lands on one page, from top down.
+    A split Table also draws the rule above the next page's first row under
+    its last row, so next_row is that row (None at the end of the table).
+    """
+    edges = [FRAME_LEFT + (FRAME_WIDTH - sum(SERVICE_COLUMNS)) / 2]
+    for width in SERVICE_COLUMNS:
+        edges.append(edges[-1] + width)
+
+    y = top
+    grid = [top]  # edges of the gridded rows (header and services)
+    for kind, cells, height in rows:
+        if kind == 'header':
+            c.setFillColor(CLINIC_COLOR)
+            c.rect(edges[0], y - height, edges[-1] - edges[0], height, stroke=0, fill=1)
+            c.setFillColor(colors.whitesmoke)
+            c.setFont("Helvetica-Bold", 10)
+            for i, header in enumerate(cells):
+                c.drawCentredString((edges[i] + edges[i + 1]) / 2, _cellBaseline(y - height, 12, 10), header)
+            grid.append(y - height)
+        elif kind == 'service':
+            baseline = _cellBaseline(y - height, 6, 9)
+            c.setFillColor(colors.black)
+            c.setFont("Helvetica", 9)
+            c.drawString(edges[0] + CELL_PADDING, baseline, cells[0])
+            for i, text in enumerate(cells[1:], start=1):
+                c.drawRightString(edges[i + 1] - CELL_PADDING, baseline, text)
+            grid.append(y - height)
+        else:
+            _lineAbove(c, kind, edges, y)
+            size = 12 if kind == 'total' else 10
+            baseline = _cellBaseline(y - height, 6, size)
+            c.setFillColor(colors.black)
+            c.setFont("Helvetica-Bold", size)
+            c.drawRightString(edges[5] - CELL_PADDING, baseline, cells[0])
+            c.drawRightString(edges[6] - CELL_PADDING, baseline, cells[1])
+        y -= height
+
+    # Grid around header and service rows
+    if len(grid) > 1:
+        c.setStrokeColor(colors.grey)
+        c.setLineWidth(1)
+        for row_edge in grid:
+            c.line(edges[0], row_edge, edges[-1], row_edge)
+        for edge in edges:
+            c.line(edge, grid[0], edge, grid[-1])
+    if next_row is not None:
+        _lineAbove(c, next_row[0], edges, y)
+
+
+def buildReceiptPDF(filename, transaction_id, patient_name, staff_name, total_amount,
+                    transaction_date, service_details, notes=None):
+    """Write the receipt PDF with platypus (any length); styles and fixed paragraphs come from the shared templates"""
+    t = templates()
+    doc = SimpleDocTemplate(filename, pagesize=letter)
+    elements = []
+
+    # Title
+    elements.append(t.receiptClinicTitle())
+    elements.append(Spacer(1, 0.2 * inch))
+
+    # Receipt Header
+    elements.append(t.receiptHeading())
+    elements.append(Spacer(1, 0.3 * inch))
+
+    # Transaction Information
+    info_data = [
+        ['Transaction ID:', str(transaction_id)],
+        ['Date:', transaction_date.strftime('%B %d, %Y')],
+        ['Patient Name:', patient_name],
+        ['Processed by:', staff_name],
+    ]
+
+    info_table = Table(info_data, colWidths=[2 * inch, 4 * inch])
+    info_table.setStyle(t.receipt_info_table)
+    elements.append(info_table)
+    elements.append(Spacer(1, 0.4 * inch))
+
+    # Services Header
+    elements.append(t.receiptServicesHeading())
+    elements.append(Spacer(1, 0.1 * inch))
+
+    # Services Table with VAT breakdown
+    service_table_data = [['Service', 'Base Price', 'VAT', 'Price', 'Qty', 'Subtotal']]
+
+    total_base = 0
+    total_vat = 0
+
+    for detail in service_details:
+        base_price = detail.get('base_price', 0)
+        vat_amount = detail.get('vat_amount', 0)
+        price = detail['price']
+        quantity = detail['quantity']
+        subtotal = price * quantity
+
+        total_base += base_price * quantity
+        total_vat += vat_amount * quantity
+
+        # Show VAT breakdown only if VAT is applicable
+        if vat_amount > 0:
+            vat_display = f"₱{vat_amount:.2f}"
+        else:
+            vat_display = "N/A"
+
+        service_table_data.append([
+            detail['service_name'],
+            f"₱{base_price:.2f}",
+            vat_display,
+            f"₱{price:.2f}",
+            str(quantity),
+            f"₱{subtotal:.2f}"
+        ])
+
+    # Add summary rows
+    service_table_data.append(['', '', '', '', 'Subtotal:', f"₱{total_base:.2f}"])
+    service_table_data.append(['', '', '', '', 'VAT (12%):', f"₱{total_vat:.2f}"])
+    service_table_data.append(['', '', '', '', 'TOTAL:', f"₱{total_amount:.2f}"])
+
+    service_table = Table(service_table_data,
+                          colWidths=[2.3 * inch, 0.9 * inch, 0.7 * inch, 0.9 * inch, 0.6 * inch, 1 * inch])
+    service_table.setStyle(t.receipt_service_table)
+    elements.append(service_table)
+    elements.append(Spacer(1, 0.3 * inch))
+
+    # Notes section
+    if notes:
+        elements.append(t.receiptNotesHeading())
+        elements.append(Spacer(1, 0.1 * inch))
+        elements.append(Paragraph(notes.replace('\n', '<br/>'), t.receipt_notes))
+        elements.append(Spacer(1, 0.3 * inch))
+
+    # VAT Information Footer
+    elements.append(t.receiptVATInfo())
+
+    # Footer
+    elements.append(t.receiptThanks())
+
+    # Build PDF
+    doc.build(elements)
+    return filename
@@ -0,0 +1,95 @@
+import os
+import shutil
+import subprocess
+import tempfile
+from datetime import datetime
+
+from PyQt6.QtCore import QBuffer, QByteArray, QIODevice
+from PyQt6.QtWidgets import QDialog, QVBoxLayout
+
+
+class PrintSink:
+    """Pipes receipt PDF bytes to the system print spooler (lp/lpr) without a file"""
+
+    def __init__(self, command=None):
+        self.command = command  # e.g. ['lp', '-d', 'FrontDesk']; found on PATH when None
+
+    def _command(self):
+        if self.command:
+            return self.command
+        for name in ('lp', 'lpr'):
+            if shutil.which(name):
+                return [name]
+        return None
+
+    def isAvailable(self):
+        return self._command() is not None
+
+    def deliver(self, transaction_id, pdf_bytes):
+        """Send one receipt to the printer (safe to call from a worker thread)"""
+        command = self._command()
+        if command is None:
+            raise RuntimeError("No print spooler (lp or lpr) found")
+        subprocess.run(command, input=pdf_bytes, check=True, capture_output=True)
+        return transaction_id
+
+
+class ThermalPrinterSink:
+    """Writes ESC/POS receipt bytes to a thermal printer device or a spool directory"""
+
+    def __init__(self, target):
+        self.target = target  # e.g. /dev/usb/lp0, or a directory a spooler watches
+
+    def deliver(self, transaction_id, ticket):
+        """Send one ticket (safe to call from a worker thread); returns where it went"""
+        if os.path.isdir(self.target):
+            # Write under a temporary name first so the spooler never picks up half a ticket
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(self.target, f"Receipt_{transaction_id}_{timestamp}.escpos")
+            fd, tmp_path = tempfile.mkstemp(dir=self.target, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(ticket)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            return path
+
+        with open(self.target, 'wb') as printer:
+            printer.write(ticket)
+        return self.target
+
+
+class PreviewSink:
+    """Shows receipt PDF bytes in a preview dialog, read straight from memory"""
+
+    def __init__(self, parent=None):
+        self.parent = parent
+
+    def deliver(self, transaction_id, pdf_bytes):
+        """Open the preview (GUI thread); raises RuntimeError when QtPdf is not installed"""
+        try:
+            from PyQt6.QtPdf import QPdfDocument
+            from PyQt6.QtPdfWidgets import QPdfView
+        except ImportError as e:
+            raise RuntimeError(f"Receipt preview needs the QtPdf module (pip install PyQt6-Qt6): {e}")
+
+        dialog = QDialog(self.parent)
+        dialog.setWindowTitle(f"Receipt - Transaction {transaction_id}")
+        dialog.resize(650, 850)
+
+        buffer = QBuffer(dialog)
+        buffer.setData(QByteArray(pdf_bytes))
+        buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+
+        document = QPdfDocument(dialog)
+        document.load(buffer)
+
+        view = QPdfView(dialog)
+        view.setDocument(document)
+        view.setPageMode(QPdfView.PageMode.MultiPage)
+
+        layout = QVBoxLayout(dialog)
+        layout.addWidget(view)
+        dialog.exec()
@@ -1,12 +1,14 @@
+from PyQt6.QtCore import QDate
 from PyQt6.QtWidgets import QMessageBox, QDialog
 from PyQt6.uic import loadUi
 from DentiCare.Model.report_model import ReportModel
+from DentiCare.Controller.pdf_templates import templates
+from DentiCare.Controller.report_pdf import canMergePDFs
+from DentiCare.Controller.report_sections import buildRevenueReport, buildPeriodReport
+from DentiCare.Model.period import Period
 from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.enums import TA_CENTER
+from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
 from datetime import datetime
 from collections import defaultdict
 import os
@@ -29,239 +31,157 @@ class ReportController:
         self.reportForm = QDialog(self.view)
         loadUi("DentiCare/ui/reportForm.ui", self.reportForm)
 
-        # Set current year as default
-        self.reportForm.yearField.setValue(datetime.now().year)
+        # Set current year, quarter and month as default
+        today = QDate.currentDate()
+        self.reportForm.yearField.setValue(today.year())
+        self.reportForm.quarterField.setCurrentIndex((today.month() - 1) // 3)
+        self.reportForm.fromDateField.setDate(QDate(today.year(), today.month(), 1))
+        self.reportForm.toDateField.setDate(today)
+
+        # Show the inputs for the selected report type
+        self.reportForm.reportTypeField.setCurrentIndex(0)
+        self.reportForm.reportTypeField.currentTextChanged.connect(self._updateReportFields)
+        self._updateReportFields(self.reportForm.reportTypeField.currentText())
 
         # Connect generate button
-        self.reportForm.reportFormGenerateBtn.clicked.connect(self.generateMonthlyReport)
+        self.reportForm.reportFormGenerateBtn.clicked.connect(self.generateReport)
 
         self.reportForm.exec()
 
-    def generateMonthlyReport(self):
-        #generate monthy report
-        try:
-            # Get selected month and year
-            month_name = self.reportForm.monthField.currentText()
-            year = self.reportForm.yearField.value()
-
-            # Convert month name to number
-            months = {
-                'January': 1, 'February': 2, 'March': 3, 'April': 4,
-                'May': 5, 'June': 6, 'July': 7, 'August': 8,
-                'September': 9, 'October': 10, 'November': 11, 'December': 12
-            }
-            month = months[month_name]
-
-            # Get data from database
-            transactions = self.report_model.getTransactionsByMonthYear(month, year)
-            service_revenue = self.report_model.getRevenueByServiceForMonth(month, year)
-            total_data = self.report_model.getTotalRevenueForMonth(month, year)
-
-            if not transactions:
-                QMessageBox.information(
-                    self.reportForm,
-                    "No Data",
-                    f"No transactions found for {month_name} {year}"
-                )
+    def _updateReportFields(self, report_type):
+        self.reportForm.monthField.setVisible(report_type == 'Monthly')
+        self.reportForm.quarterField.setVisible(report_type == 'Quarterly')
+        self.reportForm.yearField.setVisible(report_type in ('Monthly', 'Quarterly', 'Annual'))
+        self.reportForm.fromDateField.setVisible(report_type == 'Date Range')
+        self.reportForm.toDateField.setVisible(report_type == 'Date Range')
+
+    def generateReport(self):
+        #generate the report type picked in the form
+        report_type = self.reportForm.reportTypeField.currentText()
+        year = self.reportForm.yearField.value()
+
+        if report_type == 'Quarterly':
+            quarter = self.reportForm.quarterField.currentIndex() + 1
+            self.generatePeriodReport(Period.quarter(year, quarter), "Quarterly Revenue Report")
+        elif report_type == 'Annual':
+            self.generatePeriodReport(Period.year(year), "Annual Revenue Report")
+        elif report_type == 'Date Range':
+            first_day = self.reportForm.fromDateField.date().toPyDate()
+            last_day = self.reportForm.toDateField.date().toPyDate()
+            if last_day < first_day:
+                QMessageBox.warning(self.reportForm, "Invalid Range", "The end date must not be before the start date.")
                 return
-
-            # Generate PDF
-            filename = self._createMonthlyReportPDF(
-                month_name, year, transactions, service_revenue, total_data
-            )
-
-            # Success message with option to open
-            msg = QMessageBox(self.reportForm)
-            msg.setIcon(QMessageBox.Icon.Information)
-            msg.setWindowTitle("Report Generated")
-            msg.setText(
-                f"Monthly report for {month_name} {year} has been generated!\n\n"
-                f"Total Revenue: ₱{total_data['TotalRevenue']:,.2f}\n"
-                f"Total Transactions: {total_data['TransactionCount']}\n\n"
-                f"Report saved as:\n{filename}"
-            )
-
-            open_btn = msg.addButton("Open Report", QMessageBox.ButtonRole.ActionRole)
-            ok_btn = msg.addButton(QMessageBox.StandardButton.Ok)
-
-            msg.exec()
-
-            # Open report if button clicked
-            if msg.clickedButton() == open_btn:
-                import subprocess
-                import platform
-
-                if platform.system() == 'Windows':
-                    os.startfile(filename)
-                elif platform.system() == 'Darwin':  # macOS
-                    subprocess.call(['open', filename])
-                else:  # Linux
-                    subprocess.call(['xdg-open', filename])
-
-            # Close the form
-            self.reportForm.accept()
-
-        except Exception as e:
-            QMessageBox.critical(
-                self.reportForm,
-                "Error",
-                f"Failed to generate report: {e}"
-            )
-            print(f"Report generation error: {e}")
-            import traceback
-            traceback.print_exc()
-
-    def _createMonthlyReportPDF(self, month_name, year, transactions, service_revenue, total_data):
-       #create monthly report in pdf
-        # Create reports directory
-        reports_dir = os.path.join(os.getcwd(), 'reports')
-        if not os.path.exists(reports_dir):
-            os.makedirs(reports_dir)
-
-        # Generate filename
-        filename = os.path.join(
-            reports_dir,
-            f"Monthly_Revenue_Report_{month_name}_{year}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+            self.generatePeriodReport(Period.days(first_day, last_day), "Revenue Report")
+        else:
+            self.generateMonthlyReport()
+
+    def generatePeriodReport(self, period, kind):
+        #multi-month report: months render in worker processes, merged with a cover summary
+        # Prevent double submits while the report is being built
+        self.reportForm.reportFormGenerateBtn.setEnabled(False)
+
+        title = f"{kind} - {period.label}"
+        # buildPeriodReport falls back to a single plain report without pypdf; say so when it's done
+        note = None if canMergePDFs() else (
+            "pypdf is not installed, so the report has no cover summary or per-month sections "
+            "(pip install pypdf)."
         )
-
-        # Create PDF
-        doc = SimpleDocTemplate(filename, pagesize=letter, topMargin=0.5 * inch)
-        elements = []
-
-        # Styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=20,
-            textColor=colors.HexColor('#1A1054'),
-            spaceAfter=20,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
+        self.view.query_executor.submit(
+            'report',
+            buildPeriodReport,
+            self.report_model, period, title, self._reportsDir(),
+            on_result=lambda result: self._onReportReady(kind, period.label, result, note),
+            on_error=self._onMonthlyReportFailed
         )
 
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#1A1054'),
-            spaceAfter=12,
-            fontName='Helvetica-Bold'
+    def generateMonthlyReport(self):
+        #generate monthy report, queries and PDF rendering run in a background worker
+        # Get selected month and year
+        month_name = self.reportForm.monthField.currentText()
+        year = self.reportForm.yearField.value()
+
+        # Convert month name to number
+        months = {
+            'January': 1, 'February': 2, 'March': 3, 'April': 4,
+            'May': 5, 'June': 6, 'July': 7, 'August': 8,
+            'September': 9, 'October': 10, 'November': 11, 'December': 12
+        }
+        month = months[month_name]
+
+        # Prevent double submits while the report is being built
+        self.reportForm.reportFormGenerateBtn.setEnabled(False)
+
+        self.view.query_executor.submit(
+            'report',
+            self._buildMonthlyReport,
+            month, month_name, year,
+            on_result=lambda result: self._onReportReady("Monthly report", f"{month_name} {year}", result),
+            on_error=self._onMonthlyReportFailed
         )
 
-        # Title
-        title = Paragraph("<b>DENTICARE CLINIC</b>", title_style)
-        elements.append(title)
+    def _buildMonthlyReport(self, month, month_name, year):
+        #worker thread: fetch the month's data and write the PDF (no widgets here)
+        section = buildRevenueReport(self.report_model, Period.month(year, month), self._reportsDir())
+        if section['filename'] is None:
+            return None
+        return section['filename'], section['total_data']
 
-        subtitle = Paragraph(f"<b>Monthly Revenue Report - {month_name} {year}</b>", heading_style)
-        elements.append(subtitle)
-        elements.append(Spacer(1, 0.3 * inch))
+    def _reportsDir(self):
+        return os.path.join(os.getcwd(), 'reports')
 
-        # Summary Section
-        summary_title = Paragraph("<b>REVENUE SUMMARY</b>", heading_style)
-        elements.append(summary_title)
-        elements.append(Spacer(1, 0.1 * inch))
+    def _onReportReady(self, kind, label, result, note=None):
+        self.reportForm.reportFormGenerateBtn.setEnabled(True)
 
-        total_revenue = total_data['TotalRevenue'] or 0
-        transaction_count = total_data['TransactionCount'] or 0
+        if result is None:
+            QMessageBox.information(
+                self.reportForm,
+                "No Data",
+                f"No transactions found for {label}"
+            )
+            return
+
+        filename, total_data = result
+
+        # Success message with option to open
+        msg = QMessageBox(self.reportForm)
+        msg.setIcon(QMessageBox.Icon.Information)
+        msg.setWindowTitle("Report Generated")
+        msg.setText(
+            f"{kind} for {label} has been generated!\n\n"
+            f"Total Revenue: ₱{total_data['TotalRevenue']:,.2f}\n"
+            f"Total Transactions: {total_data['TransactionCount']}\n\n"
+            f"Report saved as:\n{filename}"
+            + (f"\n\n{note}" if note else "")
+        )
 
-        summary_data = [
-            ['Total Revenue:', f"₱{total_revenue:,.2f}"],
-            ['Total Transactions:', str(transaction_count)],
-            ['Report Generated:', datetime.now().strftime('%B %d, %Y at %I:%M %p')]
-        ]
+        open_btn = msg.addButton("Open Report", QMessageBox.ButtonRole.ActionRole)
+        ok_btn = msg.addButton(QMessageBox.StandardButton.Ok)
 
-        summary_table = Table(summary_data, colWidths=[2.5 * inch, 3 * inch])
-        summary_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#1A1054')),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
-        elements.append(summary_table)
-        elements.append(Spacer(1, 0.4 * inch))
-
-        # Revenue by Service Section
-        service_title = Paragraph("<b>REVENUE BREAKDOWN BY SERVICE</b>", heading_style)
-        elements.append(service_title)
-        elements.append(Spacer(1, 0.1 * inch))
+        msg.exec()
 
-        service_data = [['Service', 'Quantity', 'Revenue']]
-        for service in service_revenue:
-            service_data.append([
-                service['ServiceName'],
-                str(service['TotalQuantity']),
-                f"₱{service['TotalRevenue']:,.2f}"
-            ])
-
-        service_table = Table(service_data, colWidths=[3 * inch, 1.5 * inch, 2 * inch])
-        service_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1A1054')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 11),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('ALIGN', (1, 1), (-1, -1), 'CENTER'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-            ('TOPPADDING', (0, 1), (-1, -1), 6),
-        ]))
-        elements.append(service_table)
-        elements.append(Spacer(1, 0.4 * inch))
-
-        # Transactions Detail Section
-        trans_title = Paragraph("<b>TRANSACTION DETAILS</b>", heading_style)
-        elements.append(trans_title)
-        elements.append(Spacer(1, 0.1 * inch))
+        # Open report if button clicked
+        if msg.clickedButton() == open_btn:
+            import subprocess
+            import platform
 
-        # Build transaction data (smaller font for space)
-        trans_data = [['ID', 'Processed By', 'Patient', 'Dentist', 'Service', 'Qty', 'Amount', 'Date']]
-
-        for trans in transactions:
-            date_str = trans['TransactionDate'].strftime('%m/%d/%y')
-            trans_data.append([
-                str(trans['TransactionID']),
-                trans['ProcessedBy'][:15] + '...' if len(trans['ProcessedBy']) > 15 else trans['ProcessedBy'],
-                trans['PatientName'][:15] + '...' if len(trans['PatientName']) > 15 else trans['PatientName'],
-                trans['DentistName'][:15] + '...' if len(trans['DentistName']) > 15 else trans['DentistName'],
-                trans['Service'][:12] + '...' if len(trans['Service']) > 12 else trans['Service'],
-                str(trans['Quantity']),
-                f"₱{trans['TotalAmount']:,.2f}",
-                date_str
-            ])
-
-        trans_table = Table(trans_data,
-                            colWidths=[0.4 * inch, 1 * inch, 1 * inch, 1 * inch, 1 * inch, 0.4 * inch, 0.9 * inch,
-                                       0.7 * inch])
-        trans_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1A1054')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 8),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 7),
-            ('ALIGN', (0, 1), (0, -1), 'CENTER'),  # ID
-            ('ALIGN', (5, 1), (5, -1), 'CENTER'),  # Qty
-            ('ALIGN', (6, 1), (6, -1), 'RIGHT'),  # Amount
-            ('ALIGN', (7, 1), (7, -1), 'CENTER'),  # Date
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 4),
-            ('TOPPADDING', (0, 1), (-1, -1), 4),
-        ]))
-        elements.append(trans_table)
+            if platform.system() == 'Windows':
+                os.startfile(filename)
+            elif platform.system() == 'Darwin':  # macOS
+                subprocess.call(['open', filename])
+            else:  # Linux
+                subprocess.call(['xdg-open', filename])
 
-        # Build PDF
-        doc.build(elements)
+        # Close the form
+        self.reportForm.accept()
 
-        return filename
+    def _onMonthlyReportFailed(self, e):
+        self.reportForm.reportFormGenerateBtn.setEnabled(True)
+        QMessageBox.critical(
+            self.reportForm,
+            "Error",
+            f"Failed to generate report: {e}"
+        )
+        print(f"Report generation error: {e}")
 
     def exportRecordsTableToPDF(self):
         """Export the current records table to PDF with notes"""
@@ -354,16 +274,6 @@ class ReportController:
 
     def _createRecordsExportPDF(self, records_data, patient_id, patient_name):
         """Create PDF export of transaction records with VAT breakdown and notes"""
-        from reportlab.lib.pagesizes import letter
-        from reportlab.lib import colors
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-        from reportlab.lib.enums import TA_CENTER
-        from datetime import datetime
-        from collections import defaultdict
-        import os
-
         # Create reports directory
         reports_dir = os.path.join(os.getcwd(), 'reports')
         if not os.path.exists(reports_dir):
@@ -380,40 +290,13 @@ class ReportController:
                                 leftMargin=0.5 * inch, rightMargin=0.5 * inch)
         elements = []
 
-        # Styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=20,
-            textColor=colors.HexColor('#1A1054'),
-            spaceAfter=20,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#1A1054'),
-            spaceAfter=12,
-            fontName='Helvetica-Bold'
-        )
-
-        notes_style = ParagraphStyle(
-            'NotesStyle',
-            parent=styles['Normal'],
-            fontSize=9,
-            leading=12,
-            leftIndent=10,
-            textColor=colors.HexColor('#333333'),
-            spaceAfter=8
-        )
+        # Styles (built once per process)
+        t = templates()
+        heading_style = t.report_heading
+        notes_style = t.export_notes
 
         # Title
-        title = Paragraph("<b>DENTICARE CLINIC</b>", title_style)
-        elements.append(title)
+        elements.append(t.reportClinicTitle())
 
         subtitle = Paragraph(f"<b>Patient Transaction Records</b>", heading_style)
         elements.append(subtitle)
@@ -432,15 +315,7 @@ class ReportController:
         ]
 
         patient_info_table = Table(patient_info_data, colWidths=[2 * inch, 4 * inch])
-        patient_info_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#1A1054')),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        patient_info_table.setStyle(t.export_patient_info_table)
         elements.append(patient_info_table)
         elements.append(Spacer(1, 0.3 * inch))
 
@@ -489,13 +364,7 @@ class ReportController:
             ]
 
             trans_info_table = Table(trans_info_data, colWidths=[1.5 * inch, 5 * inch])
-            trans_info_table.setStyle(TableStyle([
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-            ]))
+            trans_info_table.setStyle(t.export_transaction_info_table)
             elements.append(trans_info_table)
             elements.append(Spacer(1, 0.1 * inch))
 
@@ -540,32 +409,7 @@ class ReportController:
 
             service_table = Table(table_data,
                                   colWidths=[2 * inch, 0.8 * inch, 0.7 * inch, 0.8 * inch, 0.6 * inch, 0.9 * inch])
-            service_table.setStyle(TableStyle([
-                # Header
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1A1054')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 8),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-
-                # Data rows
-                ('FONTNAME', (0, 1), (-1, -4), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -4), 7),
-                ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -4), 0.5, colors.grey),
-                ('BOTTOMPADDING', (0, 1), (-1, -4), 4),
-                ('TOPPADDING', (0, 1), (-1, -4), 4),
-
-                # Summary rows
-                ('FONTNAME', (0, -3), (-1, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, -3), (-1, -2), 8),
-                ('FONTSIZE', (0, -1), (-1, -1), 9),
-                ('LINEABOVE', (0, -3), (-1, -3), 1, colors.grey),
-                ('LINEABOVE', (0, -1), (-1, -1), 1, colors.HexColor('#1A1054')),
-                ('BOTTOMPADDING', (0, -3), (-1, -1), 4),
-                ('TOPPADDING', (0, -3), (-1, -1), 4),
-            ]))
+            service_table.setStyle(t.export_service_table)
             elements.append(service_table)
 
             # Add notes if present
@@ -594,33 +438,16 @@ class ReportController:
         ]
 
         grand_summary_table = Table(grand_summary_data, colWidths=[5.3 * inch, 1.2 * inch])
-        grand_summary_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -2), 'Helvetica'),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -2), 11),
-            ('FONTSIZE', (0, -1), (-1, -1), 12),
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('LINEABOVE', (0, -1), (-1, -1), 2, colors.HexColor('#1A1054')),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        grand_summary_table.setStyle(t.export_summary_table)
         elements.append(grand_summary_table)
         elements.append(Spacer(1, 0.3 * inch))
 
         # Footer
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=8,
-            textColor=colors.grey,
-            alignment=TA_CENTER
-        )
         footer = Paragraph(
             f"DentiCare Clinic - Patient Transaction Records<br/>"
             f"Patient ID: {patient_id} | VAT rate of 12% is already included in prices<br/>"
             f"This is a system-generated report.",
-            footer_style
+            t.export_footer
         )
         elements.append(footer)
 
@@ -0,0 +1,229 @@
+import importlib.util
+from datetime import datetime
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, LongTable, Table, Paragraph, Spacer
+
+from DentiCare.Controller.pdf_templates import templates
+
+# Part of every cached report's fingerprint; bump when the layout changes so
+# reports rendered by older code are not served from the cache
+REPORT_FORMAT_VERSION = 2
+
+# A cached report is served until its data changes, so the time printed on it
+# is when its figures were read (still current), not when it was last asked for
+DATA_AS_OF_LABEL = 'Data as of:'
+
+TRANSACTION_HEADER = ['ID', 'Processed By', 'Patient', 'Dentist', 'Service', 'Qty', 'Amount', 'Date']
+TRANSACTION_COLUMNS = [0.4 * inch, 1 * inch, 1 * inch, 1 * inch, 1 * inch, 0.4 * inch, 0.9 * inch, 0.7 * inch]
+
+
+class StreamingDocTemplate(SimpleDocTemplate):
+    """
+    SimpleDocTemplate that pulls more flowables from an iterator as the
+    story runs out, so a long report is laid out without building the whole
+    story first. Pages already drawn keep no reference to their flowables.
+    """
+
+    def __init__(self, filename, more_flowables, **kw):
+        super().__init__(filename, **kw)
+        self._more_flowables = iter(more_flowables)
+        self._story = None
+
+    def build(self, flowables, **kw):
+        self._story = flowables
+        super().build(flowables, **kw)
+
+    def filterFlowables(self, flowables):
+        # Called before each flowable is handled (also for internal lists such
+        # as page-begin actions, which are left alone); keep one queued behind
+        # it so keepWithNext and splitting see what follows
+        if flowables is not self._story:
+            return
+        while len(flowables) < 2 and self._more_flowables is not None:
+            flowable = next(self._more_flowables, None)
+            if flowable is None:
+                self._more_flowables = None
+            else:
+                flowables.append(flowable)
+
+
+def _truncate(text, length):
+    return text[:length] + '...' if len(text) > length else text
+
+
+def transactionRow(trans):
+    return [
+        str(trans['TransactionID']),
+        _truncate(trans['ProcessedBy'], 15),
+        _truncate(trans['PatientName'], 15),
+        _truncate(trans['DentistName'], 15),
+        _truncate(trans['Service'], 12),
+        str(trans['Quantity']),
+        f"₱{trans['TotalAmount']:,.2f}",
+        trans['TransactionDate'].strftime('%m/%d/%y')
+    ]
+
+
+def transactionTables(row_chunks):
+    """
+    One LongTable per chunk of detail rows; the header repeats on every page
+    a chunk spans. Only the chunk being laid out is held in memory.
+    """
+    style = templates().monthly_transaction_table
+    for rows in row_chunks:
+        table = LongTable([TRANSACTION_HEADER] + [transactionRow(trans) for trans in rows],
+                          colWidths=TRANSACTION_COLUMNS, repeatRows=1)
+        table.setStyle(style)
+        yield table
+
+
+def buildMonthlyReportPDF(filename, title, service_revenue, total_data, row_chunks):
+    """
+    Write a revenue report: summary, breakdown by service, then the
+    transaction details read from row_chunks (an iterable of row lists)
+    while the PDF is laid out.
+    """
+    doc = StreamingDocTemplate(filename, transactionTables(row_chunks), pagesize=letter, topMargin=0.5 * inch)
+    elements = []
+
+    # Styles (built once per process)
+    t = templates()
+    heading_style = t.report_heading
+
+    # Title
+    elements.append(t.reportClinicTitle())
+
+    subtitle = Paragraph(f"<b>{title}</b>", heading_style)
+    elements.append(subtitle)
+    elements.append(Spacer(1, 0.3 * inch))
+
+    # Summary Section
+    summary_title = Paragraph("<b>REVENUE SUMMARY</b>", heading_style)
+    elements.append(summary_title)
+    elements.append(Spacer(1, 0.1 * inch))
+
+    total_revenue = total_data['TotalRevenue'] or 0
+    transaction_count = total_data['TransactionCount'] or 0
+
+    summary_data = [
+        ['Total Revenue:', f"₱{total_revenue:,.2f}"],
+        ['Total Transactions:', str(transaction_count)],
+        [DATA_AS_OF_LABEL, datetime.now().strftime('%B %d, %Y at %I:%M %p')]
+    ]
+
+    summary_table = Table(summary_data, colWidths=[2.5 * inch, 3 * inch])
+    summary_table.setStyle(t.monthly_summary_table)
+    elements.append(summary_table)
+    elements.append(Spacer(1, 0.4 * inch))
+
+    # Revenue by Service Section
+    service_title = Paragraph("<b>REVENUE BREAKDOWN BY SERVICE</b>", heading_style)
+    elements.append(service_title)
+    elements.append(Spacer(1, 0.1 * inch))
+
+    service_data = [['Service', 'Quantity', 'Revenue']]
+    for service in service_revenue:
+        service_data.append([
+            service['ServiceName'],
+            str(service['TotalQuantity']),
+            f"₱{service['TotalRevenue']:,.2f}"
+        ])
+
+    service_table = Table(service_data, colWidths=[3 * inch, 1.5 * inch, 2 * inch])
+    service_table.setStyle(t.monthly_service_table)
+    elements.append(service_table)
+    elements.append(Spacer(1, 0.4 * inch))
+
+    # Transactions Detail Section, tables are streamed in by the doc template
+    trans_title = Paragraph("<b>TRANSACTION DETAILS</b>", heading_style)
+    elements.append(trans_title)
+    elements.append(Spacer(1, 0.1 * inch))
+
+    doc.build(elements)
+    return filename
+
+
+def buildCoverPDF(filename, title, sections, service_revenue, total_data):
+    """Cover summary for a multi-month report: totals, one line per month and the combined service breakdown"""
+    doc = SimpleDocTemplate(filename, pagesize=letter, topMargin=0.5 * inch)
+    elements = []
+
+    # Styles (built once per process)
+    t = templates()
+    heading_style = t.report_heading
+
+    # Title
+    elements.append(t.reportClinicTitle())
+    elements.append(Paragraph(f"<b>{title}</b>", heading_style))
+    elements.append(Spacer(1, 0.3 * inch))
+
+    # Summary Section
+    elements.append(Paragraph("<b>REVENUE SUMMARY</b>", heading_style))
+    elements.append(Spacer(1, 0.1 * inch))
+
+    summary_data = [
+        ['Total Revenue:', f"₱{total_data['TotalRevenue'] or 0:,.2f}"],
+        ['Total Transactions:', str(total_data['TransactionCount'] or 0)],
+        [DATA_AS_OF_LABEL, datetime.now().strftime('%B %d, %Y at %I:%M %p')]
+    ]
+    summary_table = Table(summary_data, colWidths=[2.5 * inch, 3 * inch])
+    summary_table.setStyle(t.monthly_summary_table)
+    elements.append(summary_table)
+    elements.append(Spacer(1, 0.4 * inch))
+
+    # Revenue by Month Section (same look as the service breakdown)
+    elements.append(Paragraph("<b>REVENUE BY MONTH</b>", heading_style))
+    elements.append(Spacer(1, 0.1 * inch))
+
+    month_data = [['Month', 'Transactions', 'Revenue']]
+    for section in sections:
+        month_data.append([
+            section['label'],
+            str(section['total_data']['TransactionCount'] or 0),
+            f"₱{section['total_data']['TotalRevenue'] or 0:,.2f}"
+        ])
+    month_table = Table(month_data, colWidths=[3 * inch, 1.5 * inch, 2 * inch])
+    month_table.setStyle(t.monthly_service_table)
+    elements.append(month_table)
+    elements.append(Spacer(1, 0.4 * inch))
+
+    # Revenue by Service Section
+    elements.append(Paragraph("<b>REVENUE BREAKDOWN BY SERVICE</b>", heading_style))
+    elements.append(Spacer(1, 0.1 * inch))
+
+    service_data = [['Service', 'Quantity', 'Revenue']]
+    for service in service_revenue:
+        service_data.append([
+            service['ServiceName'],
+            str(service['TotalQuantity']),
+            f"₱{service['TotalRevenue']:,.2f}"
+        ])
+    service_table = Table(service_data, colWidths=[3 * inch, 1.5 * inch, 2 * inch])
+    service_table.setStyle(t.monthly_service_table)
+    elements.append(service_table)
+
+    doc.build(elements)
+    return filename
+
+
+def canMergePDFs():
+    """True when pypdf, which mergePDFs needs, is installed"""
+    return importlib.util.find_spec('pypdf') is not None
+
+
+def mergePDFs(filename, sources):
+    """Concatenate PDF files into filename; needs pypdf (pip install pypdf)"""
+    try:
+        from pypdf import PdfWriter
+    except ImportError as e:
+        raise RuntimeError(f"Multi-month reports need the pypdf package (pip install pypdf): {e}")
+
+    writer = PdfWriter()
+    for source in sources:
+        writer.append(source)
+    with open(filename, 'wb') as merged:
+        writer.write(merged)
+    writer.close()
+    return filename
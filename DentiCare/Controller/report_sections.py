@@ -0,0 +1,263 @@
+"""
+Revenue reports built from per-month sections.
+
+Every month of a quarterly, annual or date-range report is an ordinary
+monthly report (the same cached file the monthly report produces). The
+months are rendered in parallel in a small pool of worker processes
+(MAX_SECTION_WORKERS), since ReportLab layout is CPU-bound and holds the
+GIL. Then a cover page is placed in front of them and everything is merged
+into one PDF. Months beyond the pool size wait for a free worker, so with 4
+workers a 12-month report takes about three rounds of its slowest month.
+
+No Qt in here: this module is imported by the worker processes.
+"""
+
+import calendar
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from DentiCare.Controller.report_pdf import (REPORT_FORMAT_VERSION, buildCoverPDF, buildMonthlyReportPDF,
+                                             canMergePDFs, mergePDFs)
+from DentiCare.Model.database_model import POOL_SIZE, DatabaseModel
+from DentiCare.Model.period import Period
+from DentiCare.Model.report_model import ReportModel
+from DentiCare.Model.schema_cache import schema_capabilities
+
+# Every worker holds a database connection of its own on top of the GUI
+# process's pool, so keep the count small; sections beyond it queue up
+MAX_SECTION_WORKERS = min(4, POOL_SIZE)
+
+
+def reportNames(period):
+    """(file prefix, title) for a section; whole months share the monthly report's names"""
+    if period == Period.month(period.start.year, period.start.month):
+        month_name = calendar.month_name[period.start.month]
+        return (f"Monthly_Revenue_Report_{month_name}_{period.start.year}",
+                f"Monthly Revenue Report - {month_name} {period.start.year}")
+    return (f"Revenue_Report_{period.label.replace(' ', '_')}",
+            f"Revenue Report - {period.label}")
+
+
+DIGEST_CHARS = 16  # hex digits of the fingerprint hash in a cached file name
+
+
+def cachedReportFilename(reports_dir, prefix, fingerprint):
+    """<reports_dir>/<prefix>_<hash>.pdf, where the hash covers the report's data and layout version"""
+    key = json.dumps([REPORT_FORMAT_VERSION, prefix, fingerprint], sort_keys=True, default=str)
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:DIGEST_CHARS]
+    return os.path.join(reports_dir, f"{prefix}_{digest}.pdf")
+
+
+def pruneSupersededReports(filename, prefix):
+    """
+    Delete the other cached versions of a report (same prefix, older data)
+    once filename has been written, so reports/ keeps one file per report
+    """
+    reports_dir = os.path.dirname(filename)
+    cached_name = re.compile(rf"{re.escape(prefix)}_[0-9a-f]{{{DIGEST_CHARS}}}\.pdf")
+    for name in os.listdir(reports_dir):
+        path = os.path.join(reports_dir, name)
+        if path != filename and cached_name.fullmatch(name):
+            try:
+                os.remove(path)
+            except OSError as e:
+                # e.g. open in a PDF viewer on Windows; tried again after the next render
+                print(f"WARNING: Could not remove old report {path}: {e}")
+
+
+def _writeAtomically(filename, write):
+    """Call write(path) on a temporary name, then move it into place so a half-written file is never served"""
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    partial = f"{filename}.{os.getpid()}.{threading.get_ident()}.part"
+    try:
+        write(partial)
+        os.replace(partial, filename)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return filename
+
+
+def buildRevenueReport(report_model, period, reports_dir):
+    """
+    Write the revenue report for one Period, or find it in the cache.
+
+    Returns a section dict: label, filename (None when the period has no
+    transactions), fingerprint, total_data and service_revenue.
+    """
+    prefix, title = reportNames(period)
+
+    # Fingerprint and breakdown from one snapshot, enough for a cover page if the file is cached
+    report_model.connection.beginSnapshot()
+    try:
+        fingerprint = report_model.getReportFingerprint(period)
+        service_revenue = report_model.getRevenueByServiceForPeriod(period) if fingerprint['TransactionCount'] else []
+    finally:
+        report_model.connection.rollback()
+
+    section = {
+        'label': period.label,
+        'filename': None,
+        'fingerprint': fingerprint,
+        'total_data': {'TotalRevenue': fingerprint['TotalRevenue'],
+                       'TransactionCount': fingerprint['TransactionCount']},
+        'service_revenue': service_revenue,
+    }
+    if not fingerprint['TransactionCount']:
+        return section
+
+    # Same data as a report already on disk: hand that one back without rendering
+    filename = cachedReportFilename(reports_dir, prefix, fingerprint)
+    if os.path.exists(filename):
+        section['filename'] = filename
+        return section
+
+    # Summary first, then detail rows in chunks, all from one snapshot
+    report_data = report_model.streamReportDataForPeriod(period)
+    try:
+        service_revenue, total_data = next(report_data)
+        # Data may have changed since the check above, name the file after what is rendered
+        fingerprint = report_model.getReportFingerprint(period)
+        section.update(fingerprint=fingerprint, total_data=total_data, service_revenue=service_revenue)
+        if not total_data['TransactionCount']:
+            return section
+
+        section['filename'] = _writeAtomically(
+            cachedReportFilename(reports_dir, prefix, fingerprint),
+            lambda path: buildMonthlyReportPDF(path, title, service_revenue, total_data, report_data)
+        )
+    finally:
+        report_data.close()
+    pruneSupersededReports(section['filename'], prefix)
+    return section
+
+
+# Worker process side
+
+_worker_model = None  # one ReportModel (and pool connection) per worker process
+
+
+def _renderSection(period, reports_dir):
+    global _worker_model
+    if _worker_model is None:
+        # A worker renders one section at a time, so one connection is enough;
+        # the schema is read up front so no check needs a second one mid-snapshot
+        DatabaseModel.configurePool(size=1)
+        schema_capabilities.load()
+        _worker_model = ReportModel()
+    return buildRevenueReport(_worker_model, period, reports_dir)
+
+
+# GUI process side
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def sectionPool():
+    """Process pool shared by every report, started on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forked children would share the parent's database sockets
+            _pool = ProcessPoolExecutor(max_workers=min(MAX_SECTION_WORKERS, os.cpu_count() or 1),
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def shutdownSectionPool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def renderSections(periods, reports_dir):
+    """Section dicts for each Period, in order, rendered in parallel"""
+    try:
+        futures = [sectionPool().submit(_renderSection, period, reports_dir) for period in periods]
+        return [future.result() for future in futures]
+    except BrokenProcessPool:
+        # A worker died (e.g. killed); start a fresh pool next time
+        shutdownSectionPool()
+        raise
+
+
+def _combinedSummary(sections):
+    """(service_revenue, total_data) for all sections added together"""
+    services = {}
+    total_revenue = 0
+    transaction_count = 0
+    for section in sections:
+        total_revenue += section['total_data']['TotalRevenue'] or 0
+        transaction_count += section['total_data']['TransactionCount'] or 0
+        for service in section['service_revenue']:
+            combined = services.setdefault(service['ServiceName'], {
+                'ServiceName': service['ServiceName'],
+                'TotalQuantity': 0,
+                'TotalRevenue': 0,
+            })
+            combined['TotalQuantity'] += service['TotalQuantity']
+            combined['TotalRevenue'] += service['TotalRevenue']
+
+    service_revenue = sorted(services.values(), key=lambda s: s['TotalRevenue'], reverse=True)
+    return service_revenue, {'TotalRevenue': total_revenue, 'TransactionCount': transaction_count}
+
+
+def buildPeriodReport(report_model, period, title, reports_dir):
+    """
+    Write a multi-month revenue report for any Period: a cover summary
+    followed by one section per month. Returns (filename, total_data), or
+    None when the period has no transactions.
+    """
+    if not canMergePDFs():
+        # Sections can't be merged without pypdf: render the whole period as
+        # one plain report instead, without the cover page (the controller
+        # tells the user)
+        section = buildRevenueReport(report_model, period, reports_dir)
+        if section['filename'] is None:
+            return None
+        return section['filename'], section['total_data']
+
+    periods = period.months()
+    prefix = title.replace(' - ', '_').replace(' ', '_')
+
+    # The combined file is cached on the month fingerprints (one query for
+    # all of them), so it is reused until any month changes
+    fingerprints = report_model.getReportFingerprints(periods)
+    if not any(fingerprint['TransactionCount'] for fingerprint in fingerprints):
+        return None
+    filename = cachedReportFilename(reports_dir, prefix, [title, fingerprints])
+    if os.path.exists(filename):
+        return filename, {
+            'TotalRevenue': sum(fingerprint['TotalRevenue'] or 0 for fingerprint in fingerprints),
+            'TransactionCount': sum(fingerprint['TransactionCount'] for fingerprint in fingerprints),
+        }
+
+    sections = renderSections(periods, reports_dir)
+    service_revenue, total_data = _combinedSummary(sections)
+    if not total_data['TransactionCount']:
+        return None
+
+    # Name the file after what the sections actually contain
+    filename = cachedReportFilename(reports_dir, prefix, [title, [s['fingerprint'] for s in sections]])
+
+    def write(path):
+        cover = f"{path}.cover"
+        try:
+            buildCoverPDF(cover, title, sections, service_revenue, total_data)
+            mergePDFs(path, [cover] + [s['filename'] for s in sections if s['filename']])
+        finally:
+            if os.path.exists(cover):
+                os.remove(cover)
+
+    _writeAtomically(filename, write)
+    pruneSupersededReports(filename, prefix)
+    return filename, total_data
@@ -1,5 +1,6 @@
-from PyQt6.QtWidgets import QMessageBox, QTableWidgetItem, QHeaderView, QDialog
+from PyQt6.QtWidgets import QMessageBox, QHeaderView, QDialog
 from PyQt6.uic import loadUi
+from DentiCare.Controller.table_model import Column, RecordTableModel, selectedRecord
 from DentiCare.Model.service_model import ServiceModel
 
 
@@ -10,6 +11,24 @@ class ServiceTabController:
         self.updateForm = None
         self.addForm = None
 
+        # Columns: ID, Name, Base Price, VAT, Final Price, Added At, Updated At
+        # Cells are formatted on demand by the model, only for visible rows
+        self.table_model = RecordTableModel([
+            Column('ID', 'ServiceID'),
+            Column('Service Name', 'ServiceName', QHeaderView.ResizeMode.Stretch),
+            Column('Base Price', lambda svc: f"₱{float(svc['BasePrice']):.2f}"),
+            Column('VAT', self._formatVAT),
+            Column('Final Price', lambda svc: f"₱{float(svc['FinalPrice']):.2f}"),
+            Column('Added At', lambda svc: self._formatDateTime(svc.get('created_at'))),
+            Column('Updated At', lambda svc: self._formatDateTime(svc.get('updated_at'))),
+        ], self.view)
+        self.table_model.attachTo(self.view.servicesTable)
+
+    def _formatVAT(self, svc):
+        if svc['IsVATApplicable']:
+            return f"₱{float(svc['VATAmount']):.2f} ({float(svc['VATRate']):.0f}%)"
+        return "N/A"
+
     def _formatDateTime(self, datetime_obj):
         """Format datetime to 12-hour format with AM/PM"""
         if not datetime_obj:
@@ -136,58 +155,29 @@ class ServiceTabController:
             QMessageBox.critical(self.addForm, "Database Error", f"Error adding Service: {e}")
 
     def loadServiceTable(self):
-        """Load services table with VAT information"""
+        """Load services table with VAT information (query runs in a background worker)"""
+        self.view.query_executor.submit(
+            'services',
+            self.service_model.getAllService,
+            on_result=self._populateServiceTable,
+            on_error=lambda e: QMessageBox.critical(self.view, "Error", f"Failed to load services: {e}")
+        )
+
+    def _populateServiceTable(self, serviceList):
+        """Show rows from the model in the services table"""
         try:
-            serviceList = self.service_model.getAllService()
-            table = self.view.servicesTable
-            header = table.horizontalHeader()
-
-            # Set columns: ID, Name, Base Price, VAT, Final Price, Added At, Updated At
-            table.setColumnCount(7)
-            table.setHorizontalHeaderLabels([
-                'ID', 'Service Name', 'Base Price', 'VAT', 'Final Price', 'Added At', 'Updated At'
-            ])
-
-            header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)  # ID
-            header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)  # Name
-            header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)  # Base Price
-            header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)  # VAT
-            header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)  # Final Price
-            header.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)  # Added At
-            header.setSectionResizeMode(6, QHeaderView.ResizeMode.ResizeToContents)  # Updated At
-
-            table.setRowCount(len(serviceList))
-
-            for row, svc in enumerate(serviceList):
-                table.setItem(row, 0, QTableWidgetItem(str(svc["ServiceID"])))
-                table.setItem(row, 1, QTableWidgetItem(svc["ServiceName"]))
-                table.setItem(row, 2, QTableWidgetItem(f"₱{float(svc['BasePrice']):.2f}"))
-
-                # VAT column
-                if svc['IsVATApplicable']:
-                    vat_text = f"₱{float(svc['VATAmount']):.2f} ({float(svc['VATRate']):.0f}%)"
-                else:
-                    vat_text = "N/A"
-                table.setItem(row, 3, QTableWidgetItem(vat_text))
-
-                table.setItem(row, 4, QTableWidgetItem(f"₱{float(svc['FinalPrice']):.2f}"))
-
-                created_at_str = self._formatDateTime(svc.get('created_at'))
-                updated_at_str = self._formatDateTime(svc.get('updated_at'))
-
-                table.setItem(row, 5, QTableWidgetItem(created_at_str))
-                table.setItem(row, 6, QTableWidgetItem(updated_at_str))
+            self.table_model.setRows(serviceList)
 
         except Exception as e:
             QMessageBox.critical(self.view, "Error", f"Failed to load services: {e}")
 
     def getSelectedService(self):
         """Get selected service ID"""
-        row = self.view.servicesTable.currentRow()
-        if row < 0:
+        svc = selectedRecord(self.view.servicesTable)
+        if svc is None:
             QMessageBox.warning(self.view, "Selection Error", "Please select a service first.")
             return None
-        return self.view.servicesTable.item(row, 0).text()
+        return str(svc['ServiceID'])
 
     def showServiceUpdateForm(self):
         """Show form to update service"""
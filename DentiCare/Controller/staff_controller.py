@@ -1,6 +1,7 @@
 
 from PyQt6.QtCore import QDate
-from PyQt6.QtWidgets import QMessageBox, QTableWidgetItem, QHeaderView
+from PyQt6.QtWidgets import QMessageBox
+from DentiCare.Controller.table_model import Column, RecordTableModel, selectedRecord
 from DentiCare.Model.staff_model import StaffModel
 
 
@@ -12,6 +13,22 @@ class StaffTabController:
         self.model = StaffModel()
         self.current_form = None
 
+        # Cells are formatted on demand by the model, only for visible rows
+        self.table_model = RecordTableModel([
+            Column('Staff ID', 'StaffID'),
+            Column('Full Name', self._formatFullName),
+            Column('Sex', 'Sex'),
+            Column('Birthday', lambda s: self._formatDate(s['Birthday'])),
+            Column('Contact Number', 'ContactNumber'),
+            Column('Address', self._formatAddress),
+            Column('Role', 'Role'),
+            Column('Date Hired', lambda s: self._formatDate(s['DateHired'])),
+            Column('License Number', lambda s: s['LicenseNum'] or 'N/A'),
+            Column('Added At', lambda s: self._formatDateTime(s.get('created_at'))),
+            Column('Updated At', lambda s: self._formatDateTime(s.get('updated_at'))),
+        ], self.view)
+        self.table_model.attachTo(self.view.getStaffTable())
+
     def _formatDateTime(self, datetime_obj):
         """Format datetime to 12-hour format with AM/PM"""
         if not datetime_obj:
@@ -235,57 +252,19 @@ class StaffTabController:
                                  f"Error deleting staff: {str(e)}")
 
     def loadStaffTable(self):
-        """Load staff table with timestamps in 12-hour format"""
-        try:
-            # Get data from Model (includes created_at and updated_at)
-            staff_list = self.model.getAllStaff()
-
-            # Get table widget from View
-            table = self.view.getStaffTable()
-
-            # Configure table headers (now includes 2 timestamp columns)
-            header = table.horizontalHeader()
-            header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)  # ID
-            header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)  # Name
-            header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)  # Sex
-            header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)  # Birthday
-            header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)  # Contact
-            header.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)  # Address
-            header.setSectionResizeMode(6, QHeaderView.ResizeMode.ResizeToContents)  # Role
-            header.setSectionResizeMode(7, QHeaderView.ResizeMode.ResizeToContents)  # Date Hired
-            header.setSectionResizeMode(8, QHeaderView.ResizeMode.ResizeToContents)  # License
-            header.setSectionResizeMode(9, QHeaderView.ResizeMode.ResizeToContents)  # Added At
-            header.setSectionResizeMode(10, QHeaderView.ResizeMode.ResizeToContents)  # Updated At
-
-            # Populate table
-            table.setRowCount(len(staff_list))
-
-            for row, staff in enumerate(staff_list):
-                # Format data for display
-                full_name = self._formatFullName(staff)
-                address = self._formatAddress(staff)
-                birthday_str = self._formatDate(staff['Birthday'])
-                date_hired_str = self._formatDate(staff['DateHired'])
-                license_num = staff['LicenseNum'] or 'N/A'
-
-                # ✅ Format timestamps in 12-hour format
-                created_at_str = self._formatDateTime(staff.get('created_at'))
-                updated_at_str = self._formatDateTime(staff.get('updated_at'))
-
-                # Set table items
-                table.setItem(row, 0, QTableWidgetItem(str(staff['StaffID'])))
-                table.setItem(row, 1, QTableWidgetItem(full_name))
-                table.setItem(row, 2, QTableWidgetItem(staff['Sex']))
-                table.setItem(row, 3, QTableWidgetItem(birthday_str))
-                table.setItem(row, 4, QTableWidgetItem(staff['ContactNumber']))
-                table.setItem(row, 5, QTableWidgetItem(address))
-                table.setItem(row, 6, QTableWidgetItem(staff['Role']))
-                table.setItem(row, 7, QTableWidgetItem(date_hired_str))
-                table.setItem(row, 8, QTableWidgetItem(license_num))
+        """Load staff table with timestamps in 12-hour format (query runs in a background worker)"""
+        self.view.query_executor.submit(
+            'staff',
+            self.model.getAllStaff,  # includes created_at and updated_at
+            on_result=self._populateStaffTable,
+            on_error=lambda e: QMessageBox.critical(self.view, "Load Error",
+                                                    f"Error loading staff table: {str(e)}")
+        )
 
-                # ✅ Add timestamp columns
-                table.setItem(row, 9, QTableWidgetItem(created_at_str))
-                table.setItem(row, 10, QTableWidgetItem(updated_at_str))
+    def _populateStaffTable(self, staff_list):
+        """Show rows from the model in the staff table"""
+        try:
+            self.table_model.setRows(staff_list)
 
         except Exception as e:
             QMessageBox.critical(self.view, "Load Error",
@@ -293,15 +272,14 @@ class StaffTabController:
 
     def _getSelectedStaffID(self):
         """Get the selected staff ID from table"""
-        table = self.view.getStaffTable()
-        row = table.currentRow()
+        staff = selectedRecord(self.view.getStaffTable())
 
-        if row < 0:
+        if staff is None:
             QMessageBox.warning(self.view, "Selection Error",
                                 "Please select a staff member from the table first")
             return None
 
-        staff_id = table.item(row, 0).text()
+        staff_id = str(staff['StaffID'])
         return staff_id
 
     def _formatFullName(self, staff):
@@ -0,0 +1,165 @@
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt6.QtWidgets import QHeaderView
+
+
+class Column:
+    """
+    One column of a RecordTableModel.
+
+    value is either a key into the row dict or a callable taking the row and
+    returning the text to show. It is only evaluated when the view asks for a
+    cell, so formatting cost follows what is on screen, not the row count.
+    """
+
+    def __init__(self, header, value, resize=QHeaderView.ResizeMode.ResizeToContents):
+        self.header = header
+        self.value = value
+        self.resize = resize
+
+    def text(self, row):
+        if callable(self.value):
+            value = self.value(row)
+        else:
+            value = row.get(self.value)
+        return '' if value is None else str(value)
+
+
+class RecordTableModel(QAbstractTableModel):
+    """
+    Read-only table model over the raw dict rows returned by the models.
+
+    Shared by every list screen (patients, staff, services, accounts, records).
+    Rows are kept exactly as fetched; no QTableWidgetItem is created per cell.
+    """
+
+    def __init__(self, columns, parent=None):
+        super().__init__(parent)
+        self._columns = list(columns)
+        self._rows = []
+
+    # Attaching to a view
+
+    def attachTo(self, table):
+        """Set this model on a QTableView and apply the column resize modes"""
+        table.setModel(self)
+        header = table.horizontalHeader()
+        for section, column in enumerate(self._columns):
+            header.setSectionResizeMode(section, column.resize)
+
+    # Row access
+
+    def setRows(self, rows):
+        self.beginResetModel()
+        self._rows = list(rows)
+        self.endResetModel()
+
+    def appendRows(self, rows):
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def insertRowsAt(self, position, rows):
+        if not rows:
+            return
+        self.beginInsertRows(QModelIndex(), position, position + len(rows) - 1)
+        self._rows[position:position] = rows
+        self.endInsertRows()
+
+    def removeRowsAt(self, position, count):
+        if count <= 0:
+            return
+        self.beginRemoveRows(QModelIndex(), position, position + count - 1)
+        del self._rows[position:position + count]
+        self.endRemoveRows()
+
+    def refreshRow(self, row):
+        """Repaint one row after state its columns read from has changed"""
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self._columns) - 1))
+
+    def mergeRows(self, rows, key, sort_key=None, reverse=False):
+        """
+        Fold changed rows into the table without rebuilding it.
+
+        Rows whose key(row) is already shown replace it in place; the rest are
+        added, then the table is re-sorted by sort_key if given (appended
+        otherwise). Returns the number of rows added.
+        """
+        if not rows:
+            return 0
+
+        positions = {key(row): i for i, row in enumerate(self._rows)}
+        added = []
+        for row in rows:
+            i = positions.get(key(row))
+            if i is None:
+                added.append(row)
+            else:
+                self._rows[i] = row
+                self.dataChanged.emit(self.index(i, 0), self.index(i, len(self._columns) - 1))
+
+        if not added:
+            return 0
+        if sort_key is None:
+            self.appendRows(added)
+            return len(added)
+
+        # Keep selection and current row on the same records after sorting
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        old_rows = [self._rows[index.row()] for index in old_indexes]
+
+        self._rows.extend(added)
+        self._rows.sort(key=sort_key, reverse=reverse)
+
+        new_positions = {id(row): i for i, row in enumerate(self._rows)}
+        self.changePersistentIndexList(
+            old_indexes,
+            [self.index(new_positions[id(row)], index.column()) for row, index in zip(old_rows, old_indexes)]
+        )
+        self.layoutChanged.emit()
+        return len(added)
+
+    def clear(self):
+        self.setRows([])
+
+    def rowAt(self, row):
+        return self._rows[row]
+
+    def rows(self):
+        return self._rows
+
+    # QAbstractTableModel
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        try:
+            return self._columns[index.column()].text(self._rows[index.row()])
+        except Exception as e:
+            # A bad value should blank one cell, not break painting of the table
+            print(f"Failed to format row {index.row()}, column {index.column()}: {e}")
+            return ''
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self._columns[section].header
+        return str(section + 1)
+
+
+def selectedRecord(table):
+    """Row dict for the current row of a QTableView using RecordTableModel, or None"""
+    index = table.currentIndex()
+    if not index.isValid():
+        return None
+    return table.model().rowAt(index.row())
@@ -1,16 +1,20 @@
 from PyQt6.QtCore import QDate
-from PyQt6.QtWidgets import QMessageBox, QTableWidgetItem, QHeaderView
+from PyQt6.QtWidgets import QMessageBox
 from decimal import Decimal
-from DentiCare.Model.transaction_model import TransactionModel
+from io import BytesIO
+from DentiCare.Controller.receipt_escpos import buildEscPosReceipt
+from DentiCare.Controller.receipt_jobs import (ReceiptJob, ReceiptJobs, ReceiptPrintError, RECEIPT_MODE,
+                                               SAVE_MEMORY_RECEIPTS, THERMAL_PRINTER)
+from DentiCare.Controller.receipt_sinks import PreviewSink, PrintSink, ThermalPrinterSink
+from DentiCare.Controller.receipt_pdf import renderReceiptPDF
+from DentiCare.Controller.table_model import Column, RecordTableModel
+from DentiCare.Model.catalog import Catalog
+from DentiCare.Model.line_item_cache import LineItemCache
+from DentiCare.Model.service_catalog import service_catalog
+from DentiCare.Model.transaction_model import PriceChangedError, TransactionModel
 from DentiCare.Model.patient_model import PatientModel
 from DentiCare.Model.dashboard_model import DashboardModel
 from DentiCare.Model.staff_model import StaffModel
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.enums import TA_CENTER, TA_RIGHT
 from datetime import datetime
 import os
 
@@ -25,12 +29,73 @@ class TransactionController:
         self.transaction_model = TransactionModel()
         self.patient_model = PatientModel()
         self.dashboard_model = DashboardModel()
+        self.staff_model = StaffModel()
         self.current_staff_id = current_staff_id  # ID of logged-in staff
         self.selected_patient = None
 
+        # Receipts render in the background after checkout
+        if RECEIPT_MODE == 'memory':
+            self.receipt_jobs = ReceiptJobs(
+                lambda receipt_data: self.generateReceiptBytes(**receipt_data),
+                self.transaction_model.getReceiptData,
+                self.view,
+                save=self.saveReceipt if SAVE_MEMORY_RECEIPTS else None
+            )
+        elif RECEIPT_MODE == 'thermal':
+            self.receipt_jobs = ReceiptJobs(
+                lambda receipt_data: self.printThermalReceipt(**receipt_data),
+                self.transaction_model.getReceiptData,
+                self.view,
+                save=self.saveReceipt
+            )
+        else:
+            self.receipt_jobs = ReceiptJobs(
+                lambda receipt_data: self.generateReceipt(**receipt_data),
+                self.transaction_model.getReceiptData,
+                self.view
+            )
+        self.print_sink = PrintSink()
+        self.preview_sink = PreviewSink(self.view)
+        self.thermal_sink = ThermalPrinterSink(THERMAL_PRINTER)
+        self.receipt_jobs.job_changed.connect(self._onReceiptJobChanged)
+        self.receipt_jobs.print_failed.connect(self._onReceiptPrintFailed)
+        self.receipt_dialogs = set()  # TransactionIDs whose checkout dialog is open
+
+        # Running payment total, updated per service row change
+        self.row_subtotals = {}  # ServiceRowWidget -> Decimal subtotal
+        self.running_total = Decimal('0.00')
+
+        # Records tab paging state, (TransactionDate, TransactionID) of the oldest row shown
+        self.records_after = None
+        self.records_exhausted = False
+        self.records_paging = False  # False while search results are shown
+        self.records_max_id = None  # highest TransactionID loaded, for refreshRecordsTable
+
+        # One row per transaction; its service lines are inserted below it when
+        # expanded (double-click), fetched once and kept in line_item_cache
+        self.line_item_cache = LineItemCache()
+        self.expanded_records = set()  # TransactionIDs currently expanded
+
+        # Cells are formatted on demand by the model, only for visible rows
+        self.records_table_model = RecordTableModel([
+            Column('Transaction ID', lambda rec: self._headerValue(rec, 'TransactionID')),
+            Column('Processed By', lambda rec: self._headerValue(rec, 'ProcessedBy')),
+            Column('Patient ID', lambda rec: self._headerValue(rec, 'PatientID')),
+            Column('Patient Name', lambda rec: self._headerValue(rec, 'PatientName')),
+            Column('Dentist', lambda rec: self._headerValue(rec, 'DentistName')),
+            Column('Service', self._formatRecordService),
+            Column('Price at Transaction', lambda rec: f"₱{float(rec['PriceAtTransaction'] or 0):.2f}" if rec.get('_line') else ''),
+            Column('Quantity', lambda rec: rec['Quantity'] if rec.get('_line') else rec.get('ItemCount')),
+            Column('Total', self._formatRecordTotal),
+            Column('Transaction Date', lambda rec: '' if rec.get('_line') else self._formatRecordDate(rec.get('TransactionDate'))),
+        ], self.view)
+        self.records_table_model.attachTo(self.view.recordsTable)
+        self.view.recordsTable.doubleClicked.connect(self.toggleRecordLines)
+
         # Load initial data
         self.loadServices()
         self.loadDentists()
+        self.catalog = Catalog(self.services, self.dentists)
 
     def switchToTransactionsTab(self):
         """Switch to transaction tab with error handling"""
@@ -46,7 +111,7 @@ class TransactionController:
                 # Continue even if revenue fails
 
             print("DEBUG: Loading records table...")
-            self.loadRecordsTable()
+            self.refreshRecordsTable()
 
             print("DEBUG: Tab loaded successfully!")
 
@@ -61,12 +126,34 @@ class TransactionController:
             )
 
     def loadServices(self):
-        #load all service
+        #load all service (memory hit once the shared catalog is warm)
         try:
-            self.services = self.transaction_model.getAllServices()
+            self.catalog_version, self.services = service_catalog.snapshot()
         except Exception as e:
             QMessageBox.critical(self.view, "Error", f"Failed to load services: {e}")
-            self.services = []
+            self.catalog_version, self.services = None, []
+
+    def pollServiceCatalog(self):
+        """Pick up service edits (from any machine); only the version stamp is queried when nothing changed"""
+        if self.view.query_executor.isBusy('service-catalog'):
+            return
+        self.view.query_executor.submit(
+            'service-catalog',
+            service_catalog.refresh,
+            on_result=self._onServiceCatalogPolled,
+            on_error=lambda e: print(f"WARNING: Failed to check service catalog: {e}")
+        )
+
+    def _onServiceCatalogPolled(self, snapshot):
+        version, services = snapshot
+        if version == self.catalog_version:
+            return
+        # Service combos keep their items; the total is recomputed from the new
+        # prices, and createTransactions rejects a checkout whose total does not
+        # match the prices it writes
+        self.catalog_version, self.services = version, services
+        self.catalog = Catalog(self.services, self.dentists)
+        self.calculateTotal()
 
     def loadDentists(self):
         #load all dentist
@@ -153,34 +240,43 @@ class TransactionController:
         self.view.contactField.clear()
 
     def calculateTotal(self):
-        #calculate total amount
+        #recalculate total amount over every row (used once at checkout)
         total = Decimal('0.00')
+        self.row_subtotals = {}
 
         for service_row in self.view.service_rows:
-            try:
-                # Get service price
-                service_name = service_row.serviceField.currentText()
-                if service_name == 'Services':  # Skip placeholder
-                    continue
-
-                # Find service price from loaded services
-                service = next((s for s in self.services if s['ServiceName'] == service_name), None)#self.services from loadServices function
-                if not service:
-                    continue
-
-                price = Decimal(str(service['Price']))
-                quantity = service_row.quantityField.value()
-
-                subtotal = price * quantity
-                total += subtotal
-
-            except Exception:
-                continue
+            subtotal = self._rowSubtotal(service_row)
+            self.row_subtotals[service_row] = subtotal
+            total += subtotal
 
+        self.running_total = total
         # Update total field
         self.view.totalField.setText(f"{total:.2f}")
         return total
 
+    def onServiceRowChanged(self, service_row):
+        #service or quantity changed in one row, adjust the total by the difference
+        subtotal = self._rowSubtotal(service_row)
+        previous = self.row_subtotals.get(service_row, Decimal('0.00'))
+        self.row_subtotals[service_row] = subtotal
+        self.running_total += subtotal - previous
+        self.view.totalField.setText(f"{self.running_total:.2f}")
+
+    def onServiceRowRemoved(self, service_row):
+        self.running_total -= self.row_subtotals.pop(service_row, Decimal('0.00'))
+        self.view.totalField.setText(f"{self.running_total:.2f}")
+
+    def resetRunningTotal(self):
+        self.row_subtotals = {}
+        self.running_total = Decimal('0.00')
+
+    def _rowSubtotal(self, service_row):
+        # Service ID is stored as the combo item data (None for the placeholder)
+        service = self.catalog.service(service_row.serviceField.currentData())
+        if not service:
+            return Decimal('0.00')
+        return Decimal(str(service['Price'])) * service_row.quantityField.value()
+
     def processPayment(self):
         """Process payment with notes and VAT"""
         # Validate patient selection
@@ -200,23 +296,25 @@ class TransactionController:
         selected_dentist_id = None
 
         for service_row in self.view.service_rows:
-            service_name = service_row.serviceField.currentText()
-            dentist_name = service_row.dentistField.currentText()
+            service_id = service_row.serviceField.currentData()
+            dentist_id = service_row.dentistField.currentData()
 
-            # Skip invalid rows
-            if service_name == 'Services' or dentist_name == 'Dentists':
+            # Skip invalid rows (placeholders carry no ID)
+            if service_id is None or dentist_id is None:
                 QMessageBox.warning(self.view, "Validation Error",
                                     "Please complete all service fields (Service and Dentist)")
                 return
 
             # Get service ID and full details
-            service = next((s for s in self.services if s['ServiceName'] == service_name), None)
+            service = self.catalog.service(service_id)
+            service_name = service_row.serviceField.currentText()
             if not service:
                 QMessageBox.warning(self.view, "Error", f"Service '{service_name}' not found")
                 return
 
             if not selected_dentist_id:
-                dentist = next((d for d in self.dentists if dentist_name in d['DentistName']), None)
+                dentist = self.catalog.dentist(dentist_id)
+                dentist_name = service_row.dentistField.currentText()
                 if not dentist:
                     QMessageBox.warning(self.view, "Error", f"Dentist '{dentist_name}' not found")
                     return
@@ -303,59 +401,28 @@ class TransactionController:
                 notes=notes
             )
 
-            # Generate receipt (service_details already includes VAT info)
-            try:
-                receipt_filename = self.generateReceipt(
-                    transaction_id=transaction_id,
-                    patient_name=patient_name,
-                    total_amount=float(total_amount),
-                    transaction_date=transaction_date,
-                    service_details=service_details,  # ← Contains base_price, vat_amount, price
-                    notes=notes
-                )
-
-                # Success message with receipt info
-                from PyQt6.QtWidgets import QPushButton
-                msg = QMessageBox(self.view)
-                msg.setIcon(QMessageBox.Icon.Information)
-                msg.setWindowTitle("Success")
-                msg.setText(
-                    f"Transaction completed successfully!\n\n"
-                    f"Transaction ID: {transaction_id}\n"
-                    f"Total Amount: ₱{total_amount:.2f}\n\n"
-                    f"Receipt saved as:\n{receipt_filename}"
-                )
-
-                # Add Open Receipt button
-                open_btn = msg.addButton("Open Receipt", QMessageBox.ButtonRole.ActionRole)
-                ok_btn = msg.addButton(QMessageBox.StandardButton.Ok)
-
-                msg.exec()
-
-                # Open receipt if button was clicked
-                if msg.clickedButton() == open_btn:
-                    import subprocess
-                    import platform
-
-                    if platform.system() == 'Windows':
-                        os.startfile(receipt_filename)
-                    elif platform.system() == 'Darwin':  # macOS
-                        subprocess.call(['open', receipt_filename])
-                    else:  # Linux
-                        subprocess.call(['xdg-open', receipt_filename])
-
-            except Exception as e:
-                QMessageBox.warning(
-                    self.view,
-                    "Receipt Generation Failed",
-                    f"Transaction completed but receipt generation failed:\n{e}"
-                )
-                import traceback
-                traceback.print_exc()
+            # Render the receipt in the background (service_details already includes VAT info)
+            job = self.receipt_jobs.submit(transaction_id, {
+                'transaction_id': transaction_id,
+                'patient_name': patient_name,
+                'total_amount': float(total_amount),
+                'transaction_date': transaction_date,
+                'service_details': service_details,  # ← Contains base_price, vat_amount, price
+                'notes': notes,
+            })
 
             # Clear form
             self.clearPaymentForm()
 
+        except PriceChangedError as e:
+            # Prices moved after the form was filled in; show the new total and let the user confirm again
+            self.pollServiceCatalog()
+            QMessageBox.warning(self.view, "Prices Changed",
+                                f"Service prices were changed while this payment was being entered.\n\n"
+                                f"New total: ₱{e.expected_total:.2f}\n\n"
+                                f"Please review the total and process the payment again.")
+            return
+
         except Exception as e:
             print("Transaction creation failed:", e)
             import traceback
@@ -363,10 +430,151 @@ class TransactionController:
             QMessageBox.critical(self.view, "Error", f"Failed to create transaction: {e}")
             return
 
+        self._showTransactionComplete(job, total_amount)
+
+    def _showTransactionComplete(self, job, total_amount):
+        """Success dialog that follows the receipt job; Open Receipt is enabled once it is written"""
+        msg = QMessageBox(self.view)
+        msg.setIcon(QMessageBox.Icon.Information)
+        msg.setWindowTitle("Success")
+
+        # Add Open / Print / Retry Receipt buttons
+        open_btn = msg.addButton("Open Receipt", QMessageBox.ButtonRole.ActionRole)
+        print_btn = msg.addButton("Print Receipt", QMessageBox.ButtonRole.ActionRole)
+        retry_btn = msg.addButton("Retry Receipt", QMessageBox.ButtonRole.ActionRole)
+        msg.addButton(QMessageBox.StandardButton.Ok)
+
+        def showJob(changed):
+            if changed.transaction_id != job.transaction_id:
+                return
+            if changed.status == ReceiptJob.DONE and changed.printed and changed.filename:
+                receipt_text = f"Receipt printed, PDF copy saved as:\n{changed.filename}"
+            elif changed.status == ReceiptJob.DONE and changed.printed and changed.save_error:
+                receipt_text = f"Receipt printed (PDF copy not saved: {changed.save_error})"
+            elif changed.status == ReceiptJob.DONE and changed.printed:
+                receipt_text = "Receipt printed (archiving PDF in the background…)"
+            elif changed.status == ReceiptJob.DONE and changed.print_error and changed.filename:
+                receipt_text = (f"Receipt was NOT printed: {changed.print_error}\n"
+                                f"PDF copy saved as:\n{changed.filename}")
+            elif changed.status == ReceiptJob.DONE and changed.print_error and changed.save_error:
+                receipt_text = (f"Receipt was NOT printed: {changed.print_error}\n"
+                                f"PDF copy not saved: {changed.save_error}")
+            elif changed.status == ReceiptJob.DONE and changed.print_error:
+                receipt_text = (f"Receipt was NOT printed: {changed.print_error}\n"
+                                f"(archiving PDF in the background…)")
+            elif changed.status == ReceiptJob.DONE and changed.filename:
+                receipt_text = f"Receipt saved as:\n{changed.filename}"
+            elif changed.status == ReceiptJob.DONE and changed.save_error:
+                receipt_text = f"Receipt ready (not saved to disk: {changed.save_error})"
+            elif changed.status == ReceiptJob.DONE and self.receipt_jobs.savesToDisk():
+                receipt_text = "Receipt ready (saving in the background…)"
+            elif changed.status == ReceiptJob.DONE:
+                receipt_text = "Receipt ready"
+            elif changed.status == ReceiptJob.FAILED:
+                receipt_text = f"Receipt generation failed:\n{changed.error}"
+            else:
+                receipt_text = "Receipt rendering…"
+            msg.setText(
+                f"Transaction completed successfully!\n\n"
+                f"Transaction ID: {changed.transaction_id}\n"
+                f"Total Amount: ₱{total_amount:.2f}\n\n"
+                f"{receipt_text}"
+            )
+            open_btn.setEnabled(changed.isReady())
+            print_btn.setVisible(changed.pdf_bytes is not None and self.print_sink.isAvailable())
+            retry_btn.setVisible(changed.status == ReceiptJob.FAILED or changed.print_error is not None)
+
+        showJob(job)
+        self.receipt_dialogs.add(job.transaction_id)
+        self.receipt_jobs.job_changed.connect(showJob)
+        try:
+            msg.exec()
+        finally:
+            self.receipt_jobs.job_changed.disconnect(showJob)
+            self.receipt_dialogs.discard(job.transaction_id)
+
+        # Jobs finishing while the dialog is open update job in place
+        job = self.receipt_jobs.job(job.transaction_id)
+        if msg.clickedButton() == open_btn and job.isReady():
+            self.openReceipt(job)
+        elif msg.clickedButton() == print_btn and job.pdf_bytes is not None:
+            self.printReceipt(job)
+        elif msg.clickedButton() == retry_btn:
+            self._showTransactionComplete(self.retryReceipt(job.transaction_id), total_amount)
+
+    def retryReceipt(self, transaction_id):
+        """Render a transaction's receipt again from the saved records"""
+        return self.receipt_jobs.retry(transaction_id)
+
+    def _onReceiptJobChanged(self, job):
+        # A receipt that fails after its checkout dialog was closed still needs reporting
+        if job.status != ReceiptJob.FAILED or job.transaction_id in self.receipt_dialogs:
+            return
+        reply = QMessageBox.question(
+            self.view,
+            "Receipt Generation Failed",
+            f"Transaction {job.transaction_id} was completed but its receipt failed:\n{job.error}\n\nRetry?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.Yes
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            self.retryReceipt(job.transaction_id)
+
+    def _onReceiptPrintFailed(self, job):
+        # The archive PDF is still written; only the printout needs reporting
+        if job.transaction_id in self.receipt_dialogs:
+            return
+        reply = QMessageBox.question(
+            self.view,
+            "Receipt Not Printed",
+            f"Transaction {job.transaction_id} was completed but its receipt was not printed:\n"
+            f"{job.print_error}\n\nA PDF copy is still saved to the receipts folder. Print again?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.Yes
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            self.retryReceipt(job.transaction_id)
+
+    def openReceipt(self, job):
+        """Preview from memory when the receipt was rendered there, otherwise open the saved file"""
+        if job.pdf_bytes is not None:
+            try:
+                self.preview_sink.deliver(job.transaction_id, job.pdf_bytes)
+                return
+            except RuntimeError as e:
+                if not job.filename:
+                    QMessageBox.warning(self.view, "Preview Unavailable", str(e))
+                    return
+                print(f"WARNING: {e}; opening the saved receipt instead")
+        self.openReceiptFile(job.filename)
+
+    def printReceipt(self, job):
+        """Send an in-memory receipt to the printer in the background"""
+        self.receipt_jobs.executor.submit(
+            f'receipt-print-{job.transaction_id}',
+            self.print_sink.deliver,
+            job.transaction_id,
+            job.pdf_bytes,
+            on_error=lambda e: QMessageBox.warning(self.view, "Print Failed",
+                                                   f"Receipt for transaction {job.transaction_id} was not printed:\n{e}")
+        )
+
+    def openReceiptFile(self, receipt_filename):
+        import subprocess
+        import platform
+
+        if platform.system() == 'Windows':
+            os.startfile(receipt_filename)
+        elif platform.system() == 'Darwin':  # macOS
+            subprocess.call(['open', receipt_filename])
+        else:  # Linux
+            subprocess.call(['xdg-open', receipt_filename])
+
     def clearPaymentForm(self):
         #clear fields
         self.clearPatientInfo()
         self.view.clear_all_services()
+        self.resetRunningTotal()
         self.view.totalField.clear()
         self.view.searchIDField.clear()
         # self.view.searchNameField.clear()
@@ -374,47 +582,194 @@ class TransactionController:
         self.view.noteField.clear()
 
     def loadRecordsTable(self):
-       #load records table (frontdesk)
+       #load the newest page of records (frontdesk), older pages load on scroll
+        self.records_after = None
+        self.records_exhausted = False
+        self.records_paging = True
+        self.records_max_id = None
+        self.line_item_cache.clear()
+        self.view.query_executor.submit(
+            'records',
+            self.transaction_model.getTransactionHeadersPage,
+            on_result=self._populateRecordsTable,
+            on_error=lambda e: QMessageBox.critical(self.view, "Error", f"Failed to load records: {e}")
+        )
+
+    def refreshRecordsTable(self):
+        #fetch only transactions created since the last load (plus a small overlap) and merge them in
+        if not self.records_paging or self.records_max_id is None:
+            self.loadRecordsTable()
+            return
+
+        self.view.query_executor.submit(
+            'records',
+            self.transaction_model.getTransactionHeadersSince,
+            self.records_max_id,
+            on_result=self._mergeNewRecords,
+            on_error=lambda e: QMessageBox.critical(self.view, "Error", f"Failed to load records: {e}")
+        )
+
+    def _mergeNewRecords(self, records):
+        try:
+            if not records:
+                return
+            self._advanceRecordsMaxID(records)
+
+            # A back-dated transaction older than the loaded pages will show up
+            # when the user pages down to it, don't add it twice. Rows already
+            # shown (the overlap window) are replaced in place by mergeRows
+            if not self.records_exhausted and self.records_after is not None:
+                records = [rec for rec in records
+                           if (rec['TransactionDate'], rec['TransactionID']) >= self.records_after]
+
+            self.records_table_model.mergeRows(
+                records,
+                key=self._recordKey,
+                sort_key=self._recordSortKey,
+                reverse=True  # same order as getTransactionHeadersPage
+            )
+
+        except Exception as e:
+            QMessageBox.critical(self.view, "Error", f"Failed to load records: {e}")
+
+    def _advanceRecordsMaxID(self, records):
+        newest = max(rec['TransactionID'] for rec in records)
+        if self.records_max_id is None or newest > self.records_max_id:
+            self.records_max_id = newest
+
+    def loadMoreRecords(self):
+        #fetch the next (older) page of records
+        if not self.records_paging or self.records_exhausted:
+            return
+        if self.view.query_executor.isBusy('records'):
+            return
+        self.view.query_executor.submit(
+            'records',
+            self.transaction_model.getTransactionHeadersPage,
+            self.records_after,
+            on_result=self._appendRecordsPage,
+            on_error=lambda e: QMessageBox.critical(self.view, "Error", f"Failed to load records: {e}")
+        )
+
+    def onRecordsScrolled(self, value):
+        #load the next page once the user scrolls near the bottom
+        scrollbar = self.view.recordsTable.verticalScrollBar()
+        if value >= scrollbar.maximum() - 5 * max(scrollbar.singleStep(), 1):
+            self.loadMoreRecords()
+
+    def _populateRecordsTable(self, records):
+        #show the first page in the records table
+        try:
+            self.records_table_model.clear()
+            self.expanded_records.clear()
+            if records:
+                # Older pages don't move the mark: a back-dated transaction found
+                # while paging must not hide newer ones not merged yet
+                self._advanceRecordsMaxID(records)
+            self._appendRecordsPage(records)
+
+        except Exception as e:
+            QMessageBox.critical(self.view, "Error", f"Failed to load records: {e}")
+
+    def _appendRecordsPage(self, records):
+        #add a page of records below the rows already shown
         try:
-            records = self.transaction_model.getAllTransactionRecords()
-
-            table = self.view.recordsTable
-            header = table.horizontalHeader()
-
-            table.setColumnCount(10)  # Changed from 9 to 10
-
-            # Resize behavior
-            header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)  # Transaction ID
-            header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)  # Processed By
-            header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)  # Patient ID
-            header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)  # Patient Name
-            header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)  # Dentist
-            header.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)  # Service
-            header.setSectionResizeMode(6, QHeaderView.ResizeMode.ResizeToContents)  # Price
-            header.setSectionResizeMode(7, QHeaderView.ResizeMode.ResizeToContents)  # Quantity
-            header.setSectionResizeMode(8, QHeaderView.ResizeMode.ResizeToContents)  # Total
-            header.setSectionResizeMode(9, QHeaderView.ResizeMode.ResizeToContents)  # Date
-
-            table.setRowCount(len(records))
-
-            # Fill rows
-            for row, rec in enumerate(records):
-                date_str = rec['TransactionDate'].strftime('%Y-%m-%d')
-
-                table.setItem(row, 0, QTableWidgetItem(str(rec['TransactionID'])))
-                table.setItem(row, 1, QTableWidgetItem(rec['ProcessedBy']))
-                table.setItem(row, 2, QTableWidgetItem(str(rec['PatientID'])))
-                table.setItem(row, 3, QTableWidgetItem(rec['PatientName']))
-                table.setItem(row, 4, QTableWidgetItem(rec['DentistName']))
-                table.setItem(row, 5, QTableWidgetItem(rec['Service']))
-                table.setItem(row, 6, QTableWidgetItem(f"₱{rec['PriceAtTransaction']:.2f}"))
-                table.setItem(row, 7, QTableWidgetItem(str(rec['Quantity'])))
-                table.setItem(row, 8, QTableWidgetItem(f"₱{rec['Total']:.2f}"))
-                table.setItem(row, 9, QTableWidgetItem(date_str))
+            if not records:
+                self.records_exhausted = True
+                return
+
+            last = records[-1]
+            self.records_after = (last['TransactionDate'], last['TransactionID'])
+
+            self.records_table_model.appendRows(records)
 
         except Exception as e:
             QMessageBox.critical(self.view, "Error", f"Failed to load records: {e}")
 
+    def toggleRecordLines(self, index):
+        #expand or collapse the service lines under a transaction row
+        row = self._findRecordHeaderRow(self.records_table_model.rowAt(index.row())['TransactionID'])
+        if row is None:
+            return
+        transaction_id = self.records_table_model.rowAt(row)['TransactionID']
+
+        if transaction_id in self.expanded_records:
+            count = 0
+            rows = self.records_table_model.rows()
+            while row + 1 + count < len(rows) and rows[row + 1 + count].get('_line'):
+                count += 1
+            self.records_table_model.removeRowsAt(row + 1, count)
+            self.expanded_records.discard(transaction_id)
+            self.records_table_model.refreshRow(row)
+            return
+
+        lines = self.line_item_cache.get(transaction_id)
+        if lines is not None:
+            self._expandRecord(transaction_id, lines)
+            return
+
+        # Own key, so fetching lines never cancels a page load (and vice versa)
+        self.view.query_executor.submit(
+            'record-lines',
+            self.transaction_model.getTransactionLineItems,
+            [transaction_id],
+            on_result=lambda line_items: self._onLineItemsLoaded(transaction_id, line_items),
+            on_error=lambda e: QMessageBox.critical(self.view, "Error", f"Failed to load services: {e}")
+        )
+
+    def _onLineItemsLoaded(self, transaction_id, line_items):
+        self.line_item_cache.putMany(line_items)
+        self._expandRecord(transaction_id, line_items.get(transaction_id, []))
+
+    def _expandRecord(self, transaction_id, lines):
+        # Rows may have moved while the lines were loading
+        row = self._findRecordHeaderRow(transaction_id)
+        if row is None or transaction_id in self.expanded_records:
+            return
+        header = self.records_table_model.rowAt(row)
+        line_rows = [dict(line, _line=True, TransactionDate=header['TransactionDate']) for line in lines]
+        self.records_table_model.insertRowsAt(row + 1, line_rows)
+        self.expanded_records.add(transaction_id)
+        self.records_table_model.refreshRow(row)
+
+    def _findRecordHeaderRow(self, transaction_id):
+        for row, rec in enumerate(self.records_table_model.rows()):
+            if not rec.get('_line') and rec['TransactionID'] == transaction_id:
+                return row
+        return None
+
+    def _recordKey(self, rec):
+        return rec['TransactionID'], rec.get('TransactionDetailsID') if rec.get('_line') else None
+
+    def _recordSortKey(self, rec):
+        # Newest first (sorted in reverse); a transaction's lines follow it in detail order
+        if rec.get('_line'):
+            return rec['TransactionDate'], rec['TransactionID'], 0, -rec['TransactionDetailsID']
+        return rec['TransactionDate'], rec['TransactionID'], 1
+
+    def _headerValue(self, rec, key):
+        return '' if rec.get('_line') else rec.get(key)
+
+    def _formatRecordService(self, rec):
+        if rec.get('_line'):
+            return f"    {rec['Service']}"
+        marker = '▾' if rec['TransactionID'] in self.expanded_records else '▸'
+        count = rec.get('LineCount') or 0
+        return f"{marker} {count} service{'s' if count != 1 else ''}"
+
+    def _formatRecordTotal(self, rec):
+        if rec.get('_line'):
+            return f"₱{float(rec['PriceAtTransaction'] or 0) * (rec['Quantity'] or 0):.2f}"
+        return f"₱{float(rec.get('Total') or 0):.2f}"
+
+    def _formatRecordDate(self, date_obj):
+        # Handle date safely
+        if isinstance(date_obj, (str, bytes)):
+            return str(date_obj)
+        if date_obj:
+            return date_obj.strftime('%Y-%m-%d')
+        return ''
+
     # def viewTransactionDetails(self): # wa nay gamit
     #     """View details of selected transaction"""
     #     table = self.view.recordsTable
@@ -472,9 +827,19 @@ class TransactionController:
             )
             return
 
-        try:
-            records = self.transaction_model.searchTransactionRecordsByPatientID(int(search_id))
+        # Same key as loadRecordsTable so a pending page load can't overwrite the results
+        self.records_paging = False
+        self.view.query_executor.submit(
+            'records',
+            self.transaction_model.searchTransactionHeadersByPatientID,
+            int(search_id),
+            on_result=lambda records: self._showSearchedRecords(search_id, records),
+            on_error=lambda e: QMessageBox.critical(self.view, "Error", f"Failed to search records: {e}")
+        )
 
+    def _showSearchedRecords(self, search_id, records):
+        #show records found for a patient ID
+        try:
             # Check if records were found
             if not records:
                 QMessageBox.information(
@@ -483,7 +848,8 @@ class TransactionController:
                     f"No transaction records found for Patient ID: {search_id}"
                 )
                 # Clear the table
-                self.view.recordsTable.setRowCount(0)
+                self.expanded_records.clear()
+                self.records_table_model.clear()
                 return
 
             # Records found - show success message
@@ -493,266 +859,65 @@ class TransactionController:
                 f"Found {len(records)} transaction record(s) for Patient ID: {search_id}"
             )
 
-            table = self.view.recordsTable
-            header = table.horizontalHeader()
-
-            table.setColumnCount(10)  # Increased to 10 columns to include Patient ID
-
-            # Resize behavior
-            header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)  # Transaction ID
-            header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)  # Processed By
-            header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)  # Patient ID
-            header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)  # Patient Name
-            header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)  # Dentist
-            header.setSectionResizeMode(5, QHeaderView.ResizeMode.ResizeToContents)  # Service
-            header.setSectionResizeMode(6, QHeaderView.ResizeMode.ResizeToContents)  # Price
-            header.setSectionResizeMode(7, QHeaderView.ResizeMode.ResizeToContents)  # Quantity
-            header.setSectionResizeMode(8, QHeaderView.ResizeMode.ResizeToContents)  # Total
-            header.setSectionResizeMode(9, QHeaderView.ResizeMode.ResizeToContents)  # Date
-
-            table.setRowCount(len(records))
-
-            for row, rec in enumerate(records):
-                try:
-                    # Handle date safely
-                    date_obj = rec.get('TransactionDate')
-                    if isinstance(date_obj, (str, bytes)):
-                        date_str = str(date_obj)
-                    elif date_obj:
-                        date_str = date_obj.strftime('%Y-%m-%d')
-                    else:
-                        date_str = ''
-
-                    # Convert numeric fields safely
-                    price = float(rec.get('PriceAtTransaction') or 0)
-                    total = float(rec.get('Total') or 0)
-
-                    table.setItem(row, 0, QTableWidgetItem(str(rec.get('TransactionID', ''))))
-                    table.setItem(row, 1, QTableWidgetItem(rec.get('ProcessedBy', '')))
-                    table.setItem(row, 2, QTableWidgetItem(str(rec.get('PatientID', ''))))
-                    table.setItem(row, 3, QTableWidgetItem(rec.get('PatientName', '')))
-                    table.setItem(row, 4, QTableWidgetItem(rec.get('DentistName', '')))
-                    table.setItem(row, 5, QTableWidgetItem(rec.get('Service', '')))
-                    table.setItem(row, 6, QTableWidgetItem(f"₱{price:.2f}"))
-                    table.setItem(row, 7, QTableWidgetItem(str(rec.get('Quantity', ''))))
-                    table.setItem(row, 8, QTableWidgetItem(f"₱{total:.2f}"))
-                    table.setItem(row, 9, QTableWidgetItem(date_str))
-                except Exception as e:
-                    print(f"Failed to populate row {row}: {e}")
+            self.expanded_records.clear()
+            self.records_table_model.setRows(records)
 
         except Exception as e:
             QMessageBox.critical(self.view, "Error", f"Failed to search records: {e}")
 
     def generateReceipt(self, transaction_id, patient_name, total_amount,
-                        transaction_date, service_details, notes=None):
-        """Generate PDF receipt including VAT breakdown and notes"""
+                        transaction_date, service_details, notes=None, staff_id=None):
+        """Generate PDF receipt including VAT breakdown and notes (runs on a receipt worker thread)"""
+        return self._renderReceipt(self.receiptFilename(transaction_id), transaction_id, patient_name,
+                                   total_amount, transaction_date, service_details, notes, staff_id)
+
+    def generateReceiptBytes(self, transaction_id, patient_name, total_amount,
+                             transaction_date, service_details, notes=None, staff_id=None):
+        """Same receipt rendered into memory; returns the PDF bytes"""
+        buffer = BytesIO()
+        self._renderReceipt(buffer, transaction_id, patient_name, total_amount,
+                            transaction_date, service_details, notes, staff_id)
+        return buffer.getvalue()
+
+    def printThermalReceipt(self, transaction_id, patient_name, total_amount,
+                            transaction_date, service_details, notes=None, staff_id=None):
+        """Print the receipt as ESC/POS text on the thermal printer (runs on a receipt worker thread)"""
+        ticket = buildEscPosReceipt(transaction_id, patient_name, self._receiptStaffName(staff_id),
+                                    total_amount, transaction_date, service_details, notes)
         try:
-
-
-            staff_model = StaffModel()
-            staff_info = staff_model.getStaffByID(self.current_staff_id)
-
-            # Format staff name
-            if staff_info:
-                staff_name = f"{staff_info['StaffLname']}, {staff_info['StaffFname']}"
-                if staff_info.get('StaffMname'):
-                    staff_name += f" {staff_info['StaffMname']}"
-            else:
-                staff_name = "Unknown Staff"
-
-            # Create receipts directory
-            receipts_dir = os.path.join(os.getcwd(), 'receipts')
-            if not os.path.exists(receipts_dir):
-                os.makedirs(receipts_dir)
-
-            # Generate filename
-            filename = os.path.join(receipts_dir,
-                                    f"Receipt_{transaction_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
-
-            # Create PDF
-            doc = SimpleDocTemplate(filename, pagesize=letter)
-            elements = []
-
-            # Styles
-            styles = getSampleStyleSheet()
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=24,
-                textColor=colors.HexColor('#1A1054'),
-                spaceAfter=30,
-                alignment=TA_CENTER
-            )
-
-            heading_style = ParagraphStyle(
-                'CustomHeading',
-                parent=styles['Heading2'],
-                fontSize=14,
-                textColor=colors.HexColor('#1A1054'),
-                spaceAfter=12
-            )
-
-            # Title
-            title = Paragraph("<b>DENTICARE CLINIC</b>", title_style)
-            elements.append(title)
-            elements.append(Spacer(1, 0.2 * inch))
-
-            # Receipt Header
-            receipt_title = Paragraph("<b>PAYMENT RECEIPT</b>", heading_style)
-            elements.append(receipt_title)
-            elements.append(Spacer(1, 0.3 * inch))
-
-            # Transaction Information
-            info_data = [
-                ['Transaction ID:', str(transaction_id)],
-                ['Date:', transaction_date.strftime('%B %d, %Y')],
-                ['Patient Name:', patient_name],
-                ['Processed by:', staff_name],
-            ]
-
-            info_table = Table(info_data, colWidths=[2 * inch, 4 * inch])
-            info_table.setStyle(TableStyle([
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 11),
-                ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#1A1054')),
-                ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-                ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ]))
-            elements.append(info_table)
-            elements.append(Spacer(1, 0.4 * inch))
-
-            # Services Header
-            services_header = Paragraph("<b>SERVICES</b>", heading_style)
-            elements.append(services_header)
-            elements.append(Spacer(1, 0.1 * inch))
-
-            # Services Table with VAT breakdown
-            service_table_data = [['Service', 'Base Price', 'VAT', 'Price', 'Qty', 'Subtotal']]
-
-            total_base = 0
-            total_vat = 0
-            total_amount_calc = 0
-
-            for detail in service_details:
-                service_name = detail['service_name']
-                base_price = detail.get('base_price', 0)
-                vat_amount = detail.get('vat_amount', 0)
-                price = detail['price']
-                quantity = detail['quantity']
-                subtotal = price * quantity
-
-                total_base += base_price * quantity
-                total_vat += vat_amount * quantity
-                total_amount_calc += subtotal
-
-                # Show VAT breakdown only if VAT is applicable
-                if vat_amount > 0:
-                    vat_display = f"₱{vat_amount:.2f}"
-                else:
-                    vat_display = "N/A"
-
-                service_table_data.append([
-                    service_name,
-                    f"₱{base_price:.2f}",
-                    vat_display,
-                    f"₱{price:.2f}",
-                    str(quantity),
-                    f"₱{subtotal:.2f}"
-                ])
-
-            # Add summary rows
-            service_table_data.append(['', '', '', '', 'Subtotal:', f"₱{total_base:.2f}"])
-            service_table_data.append(['', '', '', '', 'VAT (12%):', f"₱{total_vat:.2f}"])
-            service_table_data.append(['', '', '', '', 'TOTAL:', f"₱{total_amount:.2f}"])
-
-            service_table = Table(service_table_data,
-                                  colWidths=[2.3 * inch, 0.9 * inch, 0.7 * inch, 0.9 * inch, 0.6 * inch, 1 * inch])
-            service_table.setStyle(TableStyle([
-                # Header row
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1A1054')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-
-                # Data rows
-                ('FONTNAME', (0, 1), (-1, -4), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -4), 9),
-                ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
-                ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-                ('GRID', (0, 0), (-1, -4), 1, colors.grey),
-                ('BOTTOMPADDING', (0, 1), (-1, -4), 6),
-                ('TOPPADDING', (0, 1), (-1, -4), 6),
-
-                # Summary rows (Subtotal, VAT, TOTAL)
-                ('FONTNAME', (0, -3), (-1, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, -3), (-1, -2), 10),
-                ('FONTSIZE', (0, -1), (-1, -1), 12),
-                ('LINEABOVE', (0, -3), (-1, -3), 1, colors.grey),
-                ('LINEABOVE', (0, -1), (-1, -1), 2, colors.HexColor('#1A1054')),
-                ('BOTTOMPADDING', (0, -3), (-1, -1), 6),
-                ('TOPPADDING', (0, -3), (-1, -1), 6),
-            ]))
-            elements.append(service_table)
-            elements.append(Spacer(1, 0.3 * inch))
-
-            # Notes section
-            if notes:
-                notes_header = Paragraph("<b>NOTES</b>", heading_style)
-                elements.append(notes_header)
-                elements.append(Spacer(1, 0.1 * inch))
-
-                notes_style = ParagraphStyle(
-                    'NotesStyle',
-                    parent=styles['Normal'],
-                    fontSize=10,
-                    leading=14,
-                    leftIndent=20,
-                    rightIndent=20,
-                    spaceAfter=10
-                )
-
-                notes_paragraph = Paragraph(notes.replace('\n', '<br/>'), notes_style)
-                elements.append(notes_paragraph)
-                elements.append(Spacer(1, 0.3 * inch))
-
-            # VAT Information Footer
-            vat_info_style = ParagraphStyle(
-                'VATInfo',
-                parent=styles['Normal'],
-                fontSize=8,
-                textColor=colors.grey,
-                alignment=TA_CENTER,
-                spaceAfter=10
-            )
-
-            vat_info = Paragraph(
-                "<b>VAT-Registered Business</b><br/>"
-                "TIN: [Your TIN Here]<br/>"
-                "VAT rate of 12% is already included in the final price",
-                vat_info_style
-            )
-            elements.append(vat_info)
-
-            # Footer
-            footer_style = ParagraphStyle(
-                'Footer',
-                parent=styles['Normal'],
-                fontSize=10,
-                textColor=colors.grey,
-                alignment=TA_CENTER
-            )
-            footer = Paragraph("Thank you for choosing DentiCare Clinic!<br/>For concerns, please contact us.",
-                               footer_style)
-            elements.append(footer)
-
-            # Build PDF
-            doc.build(elements)
-
-            return filename
+            self.thermal_sink.deliver(transaction_id, ticket)
+        except OSError as e:
+            raise ReceiptPrintError(f"Failed to print receipt on {THERMAL_PRINTER}: {e}")
+
+    def saveReceipt(self, receipt_data, pdf_bytes):
+        """Write the archive copy of a receipt to the receipts directory; returns the filename
+
+        pdf_bytes is None when the receipt went to the thermal printer, so the
+        PDF is rendered here.
+        """
+        if pdf_bytes is None:
+            return self.generateReceipt(**receipt_data)
+        filename = self.receiptFilename(receipt_data['transaction_id'])
+        with open(filename, 'wb') as receipt_file:
+            receipt_file.write(pdf_bytes)
+        return filename
+
+    def receiptFilename(self, transaction_id):
+        # Create receipts directory
+        receipts_dir = os.path.join(os.getcwd(), 'receipts')
+        if not os.path.exists(receipts_dir):
+            os.makedirs(receipts_dir)
+
+        # Generate filename
+        return os.path.join(receipts_dir,
+                            f"Receipt_{transaction_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
+
+    def _renderReceipt(self, target, transaction_id, patient_name, total_amount,
+                       transaction_date, service_details, notes, staff_id):
+        """Render into target (a filename or a binary file object)"""
+        try:
+            return renderReceiptPDF(target, transaction_id, patient_name, self._receiptStaffName(staff_id),
+                                    total_amount, transaction_date, service_details, notes)
 
         except Exception as e:
             print(f"DEBUG: Exception in generateReceipt: {e}")
@@ -760,11 +925,28 @@ class TransactionController:
             traceback.print_exc()
             raise Exception(f"Failed to generate receipt: {e}")
 
+    def _receiptStaffName(self, staff_id):
+        staff_info = self.staff_model.getStaffByID(staff_id or self.current_staff_id)
+
+        # Format staff name
+        if staff_info:
+            staff_name = f"{staff_info['StaffLname']}, {staff_info['StaffFname']}"
+            if staff_info.get('StaffMname'):
+                staff_name += f" {staff_info['StaffMname']}"
+            return staff_name
+        return "Unknown Staff"
+
     def loadTotalRevenueForTransactions(self):
-        """Load total revenue and display in transaction tab"""
-        try:
-            total_revenue = self.dashboard_model.getTotalRevenue()
+        """Load total revenue and display in transaction tab (query runs in a background worker)"""
+        self.view.query_executor.submit(
+            'revenue',
+            self.dashboard_model.getTotalRevenue,
+            on_result=self._showTotalRevenue,
+            on_error=self._showTotalRevenueError
+        )
 
+    def _showTotalRevenue(self, total_revenue):
+        try:
             # Format the revenue with peso sign and 2 decimal places
             formatted_revenue = f"₱{total_revenue:,.2f}"
 
@@ -780,12 +962,13 @@ class TransactionController:
             print(f"DEBUG: Total revenue loaded: {formatted_revenue}")
 
         except Exception as e:
-            print(f"ERROR loading revenue: {e}")
-            import traceback
-            traceback.print_exc()
-            # Don't show error to user, just log it
-            # Set field to 0 if it exists
-            if hasattr(self.view, 'totalRevenueField'):
-                self.view.totalRevenueField.setText("₱0.00")
-            elif hasattr(self.view, 'revenueField'):
-                self.view.revenueField.setText("₱0.00")
\ No newline at end of file
+            self._showTotalRevenueError(e)
+
+    def _showTotalRevenueError(self, e):
+        print(f"ERROR loading revenue: {e}")
+        # Don't show error to user, just log it
+        # Set field to 0 if it exists
+        if hasattr(self.view, 'totalRevenueField'):
+            self.view.totalRevenueField.setText("₱0.00")
+        elif hasattr(self.view, 'revenueField'):
+            self.view.revenueField.setText("₱0.00")
\ No newline at end of file
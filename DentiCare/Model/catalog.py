@@ -0,0 +1,28 @@
+class Catalog:
+    """
+    Services and dentists for the payment screen, indexed for O(1) lookup.
+
+    Combo boxes store ServiceID / StaffID as item data, so callers look rows
+    up by ID; the by-name lookups are for callers that only have the text.
+    """
+
+    def __init__(self, services=(), dentists=()):
+        self.services = list(services)
+        self.dentists = list(dentists)
+
+        self._services_by_id = {s['ServiceID']: s for s in self.services}
+        self._services_by_name = {s['ServiceName']: s for s in self.services}
+        self._dentists_by_id = {d['StaffID']: d for d in self.dentists}
+        self._dentists_by_name = {d['DentistName']: d for d in self.dentists}
+
+    def service(self, service_id):
+        return self._services_by_id.get(service_id)
+
+    def serviceByName(self, service_name):
+        return self._services_by_name.get(service_name)
+
+    def dentist(self, staff_id):
+        return self._dentists_by_id.get(staff_id)
+
+    def dentistByName(self, dentist_name):
+        return self._dentists_by_name.get(dentist_name)
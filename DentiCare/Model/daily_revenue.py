@@ -0,0 +1,146 @@
+"""
+daily_revenue is a rollup with one row per (day, service, dentist, staff).
+Dashboard totals, the yearly sales chart and report summaries add up these
+rows instead of scanning every transaction and detail row.
+
+Quantity and ServiceRevenue come from the detail rows. Each transaction is
+booked once: its TotalAmount and a count of 1 go on the row for its first
+detail (lowest TransactionDetailsID). Summing TransactionTotal and
+TransactionCount over any date range therefore matches the raw transactions
+table. A transaction without detail rows is booked on a row with ServiceID
+NO_SERVICE_ID (0, which no service has) and a Quantity of 0, so it still
+counts; per-service breakdowns join services and leave that row out.
+
+Rows are added in the same database transaction as the transactions they
+describe. rebuild() recomputes the table from scratch, and verify() compares
+it with the raw tables:
+
+    python -m DentiCare.migrations --rebuild-daily-revenue
+    python -m DentiCare.migrations --verify-daily-revenue
+"""
+
+from .schema_cache import schema_capabilities
+
+ROLLUP_TABLE = "daily_revenue"
+NO_SERVICE_ID = 0  # ServiceID of the row for transactions without detail rows
+
+# True on the detail row a transaction's TotalAmount and count are booked on
+# (an index lookup on transactiondetails.TransactionID per row), or on the
+# only row of a transaction that has no details
+FIRST_DETAIL_SQL = """(td.TransactionDetailsID IS NULL
+                       OR td.TransactionDetailsID = (SELECT MIN(first_td.TransactionDetailsID)
+                                                     FROM transactiondetails first_td
+                                                     WHERE first_td.TransactionID = t.TransactionID))"""
+
+
+def _rollupSelectSQL(where=""):
+    """SELECT producing rollup rows from the normalized tables"""
+    return f"""
+        SELECT t.TransactionDate AS RevenueDate,
+               IFNULL(td.ServiceID, {NO_SERVICE_ID}) AS ServiceID,
+               t.DentistID,
+               t.StaffID,
+               IFNULL(SUM(td.Quantity), 0) AS Quantity,
+               IFNULL(SUM(td.PriceAtTransaction * td.Quantity), 0) AS ServiceRevenue,
+               SUM(IF({FIRST_DETAIL_SQL}, t.TotalAmount, 0)) AS TransactionTotal,
+               SUM(IF({FIRST_DETAIL_SQL}, 1, 0)) AS TransactionCount
+        FROM transactions t
+                 LEFT JOIN transactiondetails td ON t.TransactionID = td.TransactionID
+        {where}
+        GROUP BY t.TransactionDate, IFNULL(td.ServiceID, {NO_SERVICE_ID}), t.DentistID, t.StaffID
+    """
+
+
+def isAvailable():
+    """False until the migration that creates the table has run"""
+    return schema_capabilities.hasTable(ROLLUP_TABLE)
+
+
+def addTransactions(cursor, transaction_ids):
+    """Add newly created transactions to their days' rows (one INSERT ... SELECT)"""
+    if not transaction_ids or not isAvailable():
+        return
+    placeholders = ", ".join(["%s"] * len(transaction_ids))
+    # new_rows has the same column names as the table, so every column in the
+    # UPDATE clause is qualified (unqualified ones are ambiguous, error 1052)
+    cursor.execute(
+        f"""
+        INSERT INTO {ROLLUP_TABLE}
+            (RevenueDate, ServiceID, DentistID, StaffID,
+             Quantity, ServiceRevenue, TransactionTotal, TransactionCount)
+        SELECT new_rows.RevenueDate, new_rows.ServiceID, new_rows.DentistID, new_rows.StaffID,
+               new_rows.Quantity, new_rows.ServiceRevenue, new_rows.TransactionTotal, new_rows.TransactionCount
+        FROM ({_rollupSelectSQL(f"WHERE t.TransactionID IN ({placeholders})")}) AS new_rows
+        ON DUPLICATE KEY UPDATE
+            {ROLLUP_TABLE}.Quantity = {ROLLUP_TABLE}.Quantity + new_rows.Quantity,
+            {ROLLUP_TABLE}.ServiceRevenue = {ROLLUP_TABLE}.ServiceRevenue + new_rows.ServiceRevenue,
+            {ROLLUP_TABLE}.TransactionTotal = {ROLLUP_TABLE}.TransactionTotal + new_rows.TransactionTotal,
+            {ROLLUP_TABLE}.TransactionCount = {ROLLUP_TABLE}.TransactionCount + new_rows.TransactionCount
+        """,
+        tuple(transaction_ids)
+    )
+
+
+def rebuild(cursor):
+    """Repopulate the whole table from the normalized tables"""
+    cursor.execute(f"DELETE FROM {ROLLUP_TABLE}")
+    cursor.execute(
+        f"""
+        INSERT INTO {ROLLUP_TABLE}
+            (RevenueDate, ServiceID, DentistID, StaffID,
+             Quantity, ServiceRevenue, TransactionTotal, TransactionCount)
+        {_rollupSelectSQL()}
+        """
+    )
+
+
+def verify(cursor):
+    """
+    Compare the rollup with the raw tables day by day.
+
+    Returns one dict per day where they disagree, with the raw figures and
+    the rollup figures side by side; an empty list means the rollup is exact.
+    """
+    cursor.execute(
+        f"""
+        SELECT raw.RevenueDate,
+               raw.TransactionTotal, stored.TransactionTotal AS RollupTransactionTotal,
+               raw.TransactionCount, stored.TransactionCount AS RollupTransactionCount,
+               raw.Quantity, stored.Quantity AS RollupQuantity,
+               raw.ServiceRevenue, stored.ServiceRevenue AS RollupServiceRevenue
+        FROM (SELECT RevenueDate,
+                     SUM(TransactionTotal) AS TransactionTotal,
+                     SUM(TransactionCount) AS TransactionCount,
+                     SUM(Quantity) AS Quantity,
+                     SUM(ServiceRevenue) AS ServiceRevenue
+              FROM ({_rollupSelectSQL()}) AS expected
+              GROUP BY RevenueDate) raw
+                 LEFT JOIN (SELECT RevenueDate,
+                                   SUM(TransactionTotal) AS TransactionTotal,
+                                   SUM(TransactionCount) AS TransactionCount,
+                                   SUM(Quantity) AS Quantity,
+                                   SUM(ServiceRevenue) AS ServiceRevenue
+                            FROM {ROLLUP_TABLE}
+                            GROUP BY RevenueDate) stored ON stored.RevenueDate = raw.RevenueDate
+        WHERE NOT (raw.TransactionTotal <=> stored.TransactionTotal
+                   AND raw.TransactionCount <=> stored.TransactionCount
+                   AND raw.Quantity <=> stored.Quantity
+                   AND raw.ServiceRevenue <=> stored.ServiceRevenue)
+        ORDER BY raw.RevenueDate
+        """
+    )
+    mismatches = list(cursor.fetchall())
+
+    # Days that only exist in the rollup (e.g. left behind by deleted transactions)
+    cursor.execute(
+        f"""
+        SELECT DISTINCT dr.RevenueDate
+        FROM {ROLLUP_TABLE} dr
+        WHERE NOT EXISTS (SELECT 1
+                          FROM transactions t
+                          WHERE t.TransactionDate = dr.RevenueDate)
+        ORDER BY dr.RevenueDate
+        """
+    )
+    mismatches += [{'RevenueDate': row['RevenueDate'], 'Orphaned': True} for row in cursor.fetchall()]
+    return mismatches
@@ -1,4 +1,6 @@
 from .database_model import DatabaseModel
+from .period import Period
+from . import daily_revenue
 import pandas as pd
 
 class DashboardModel:
@@ -22,7 +24,10 @@ class DashboardModel:
 
     def getTotalRevenue(self):
         cursor = self.connection.cursor()
-        cursor.execute("SELECT SUM(TotalAmount) AS TotalRevenue FROM transactions;")
+        if daily_revenue.isAvailable():
+            cursor.execute("SELECT SUM(TransactionTotal) AS TotalRevenue FROM daily_revenue;")
+        else:
+            cursor.execute("SELECT SUM(TotalAmount) AS TotalRevenue FROM transactions;")
         result = cursor.fetchone()
         cursor.close()
         return result["TotalRevenue"] if result["TotalRevenue"] is not None else 0
@@ -30,16 +35,29 @@ class DashboardModel:
     def getMonthlySalesData(self):
         """Get monthly sales data for the current year"""
         cursor = self.connection.cursor()
-        # FIXED: Removed ALL spaces between function names and parentheses
-        query = """
-                SELECT
-                MONTH(TransactionDate) AS Month, YEAR(TransactionDate) AS Year, SUM(TotalAmount) AS TotalSales
-                FROM transactions
-                WHERE YEAR (TransactionDate) = YEAR(CURDATE())
-                GROUP BY YEAR (TransactionDate), MONTH(TransactionDate)
-                ORDER BY Month; 
-                """
-        cursor.execute(query)
+        if daily_revenue.isAvailable():
+            # At most one row per day, service, dentist and staff instead of every transaction
+            date_filter, params = Period.currentYear().predicate('RevenueDate')
+            query = f"""
+                    SELECT
+                    MONTH(RevenueDate) AS Month, YEAR(RevenueDate) AS Year, SUM(TransactionTotal) AS TotalSales
+                    FROM daily_revenue
+                    WHERE {date_filter}
+                    GROUP BY YEAR(RevenueDate), MONTH(RevenueDate)
+                    ORDER BY Month;
+                    """
+        else:
+            # Range filter on the raw column so the TransactionDate index is used
+            date_filter, params = Period.currentYear().predicate('TransactionDate')
+            query = f"""
+                    SELECT
+                    MONTH(TransactionDate) AS Month, YEAR(TransactionDate) AS Year, SUM(TotalAmount) AS TotalSales
+                    FROM transactions
+                    WHERE {date_filter}
+                    GROUP BY YEAR(TransactionDate), MONTH(TransactionDate)
+                    ORDER BY Month;
+                    """
+        cursor.execute(query, params)
         results = cursor.fetchall()
         cursor.close()
 
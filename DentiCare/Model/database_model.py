@@ -1,22 +1,352 @@
+import threading
+import time
+from collections import deque
 
 import pymysql
 
+from .query_stats import query_stats
+
+# Connection settings for the clinic database
+DB_CONFIG = {
+    'host': "localhost",
+    'user': "root",
+    'password': "",
+    'database': "dentalclinic",
+}
+
+# Pool settings (override with DatabaseModel.configurePool before the first model is created)
+POOL_SIZE = 5        # max open connections for the whole application
+POOL_TIMEOUT = 10    # seconds to wait for a free connection before giving up
+IDLE_TIMEOUT = 300   # idle connections older than this are closed
+PING_AFTER = 30      # idle connections older than this are pinged before reuse
+
+
+class PoolExhaustedError(pymysql.err.OperationalError):
+    """Raised when no pooled connection becomes free in time"""
+
+
+class ConnectionPool:
+    """Thread-safe, bounded pool of pymysql connections shared by every model"""
+
+    def __init__(self, size=POOL_SIZE, timeout=POOL_TIMEOUT, idle_timeout=IDLE_TIMEOUT,
+                 ping_after=PING_AFTER, **connect_kwargs):
+        self.size = size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.ping_after = ping_after
+        self.connect_kwargs = connect_kwargs
+
+        self._idle = deque()  # (connection, last_used) - newest on the right
+        self._in_use = 0
+        self._condition = threading.Condition()
+
+    def _open(self):
+        """Open a new physical connection"""
+        connection = pymysql.connect(
+            cursorclass=pymysql.cursors.DictCursor,
+            autocommit=True,
+            **self.connect_kwargs
+        )
+        print('connected to database')
+        return connection
+
+    def _closeQuietly(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _evictIdle(self):
+        """Close connections that sat idle longer than idle_timeout (caller holds the lock)"""
+        cutoff = time.monotonic() - self.idle_timeout
+        while self._idle and self._idle[0][1] < cutoff:
+            connection, _ = self._idle.popleft()
+            self._closeQuietly(connection)
+
+    def _checkHealth(self, connection):
+        """Ping a connection that has been idle for a while, replace it if it is dead"""
+        try:
+            connection.ping(reconnect=False)
+            return connection
+        except pymysql.Error:
+            self._closeQuietly(connection)
+            return self._open()
+
+    def acquire(self):
+        """Check out a connection, waiting up to `timeout` seconds for one to be free"""
+        deadline = time.monotonic() + self.timeout
+        connection, last_used = None, None
+
+        with self._condition:
+            while True:
+                self._evictIdle()
+                if self._idle:
+                    # Reuse the most recently returned connection (warmest)
+                    connection, last_used = self._idle.pop()
+                    break
+                if self._in_use < self.size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolExhaustedError(
+                        f"No database connection available after {self.timeout}s "
+                        f"({self.size} in use)"
+                    )
+                self._condition.wait(remaining)
+            self._in_use += 1
+
+        # Network work happens outside the lock
+        try:
+            if connection is None:
+                return self._open()
+            if time.monotonic() - last_used > self.ping_after:
+                return self._checkHealth(connection)
+            return connection
+        except Exception:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, connection, discard=False):
+        """Check a connection back in (or close it when discard is True or it is broken)"""
+        with self._condition:
+            self._in_use -= 1
+            if discard or not connection.open:
+                self._closeQuietly(connection)
+            else:
+                self._idle.append((connection, time.monotonic()))
+            self._evictIdle()
+            self._condition.notify()
+
+    def closeAll(self):
+        """Close every idle connection (connections in use are closed when released)"""
+        with self._condition:
+            while self._idle:
+                connection, _ = self._idle.popleft()
+                self._closeQuietly(connection)
+
+    def stats(self):
+        with self._condition:
+            return {
+                'size': self.size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+            }
+
+
+class PooledCursor:
+    """Cursor handed out by PooledConnection - gives the connection back when closed"""
+
+    def __init__(self, cursor, owner, state):
+        self._cursor = cursor
+        self._owner = owner
+        self._state = state
+        self._closed = False
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def _rowcount(self):
+        # Unbuffered cursors don't know the count until every row is read;
+        # pymysql reports 2**64 - 1 for them, so record it as unknown
+        if isinstance(self._cursor, pymysql.cursors.SSCursor):
+            return None
+        return self._cursor.rowcount
+
+    def execute(self, query, args=None):
+        """Run a query and record its wall time, row count and fingerprint"""
+        start = time.perf_counter()
+        rows = -1
+        try:
+            result = self._cursor.execute(query, args)
+            rows = self._rowcount()
+            return result
+        finally:
+            query_stats.record(query, time.perf_counter() - start, rows)
+
+    def executemany(self, query, args):
+        start = time.perf_counter()
+        rows = -1
+        try:
+            result = self._cursor.executemany(query, args)
+            rows = self._rowcount()
+            return result
+        finally:
+            query_stats.record(query, time.perf_counter() - start, rows)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._cursor.close()
+        finally:
+            self._owner._cursorClosed(self._state)
+
+    def __del__(self):
+        if not getattr(self, '_closed', True):
+            self.close()
+
+
+class _BorrowState(threading.local):
+    """Per-thread view of what a PooledConnection currently holds"""
+
+    def __init__(self):
+        self.connection = None
+        self.cursors = 0
+        self.in_transaction = False
+
+
+class PooledConnection:
+    """
+    Connection handle stored on each model as `self.connection`.
+    Borrows a real connection from the pool on cursor()/begin() and hands it
+    back once all its cursors are closed and no transaction is open, so models
+    keep their usual cursor/commit/rollback code while sharing a few connections.
+    Each thread borrows separately, so a model can be used from worker threads.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._local = _BorrowState()
+
+    def _bind(self):
+        state = self._local
+        if state.connection is None:
+            state.connection = self.pool.acquire()
+        return state
+
+    def _releaseIfIdle(self, state):
+        if state.connection is not None and state.cursors <= 0 and not state.in_transaction:
+            connection, state.connection = state.connection, None
+            state.cursors = 0
+            self.pool.release(connection)
+
+    def _cursorClosed(self, state):
+        state.cursors -= 1
+        self._releaseIfIdle(state)
+
+    def cursor(self, cursorclass=None):
+        state = self._bind()
+        if cursorclass is None:
+            cursor = state.connection.cursor()
+        else:
+            cursor = state.connection.cursor(cursorclass)
+        state.cursors += 1
+        return PooledCursor(cursor, self, state)
+
+    def begin(self):
+        state = self._bind()
+        state.connection.begin()
+        state.in_transaction = True
+
+    def beginSnapshot(self):
+        """
+        Start a read-only transaction whose reads all see one snapshot, taken
+        now. The isolation level is set to REPEATABLE READ for it explicitly
+        (under READ COMMITTED every statement would get a fresh snapshot).
+        There is nothing to commit; end it with rollback().
+        """
+        state = self._bind()
+        try:
+            with state.connection.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+                cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY")
+        except Exception:
+            self._releaseIfIdle(state)
+            raise
+        state.in_transaction = True
+
+    def commit(self):
+        state = self._local
+        if state.connection is not None:
+            state.connection.commit()
+        state.in_transaction = False
+        self._releaseIfIdle(state)
+
+    def rollback(self):
+        state = self._local
+        if state.connection is not None:
+            state.connection.rollback()
+        state.in_transaction = False
+        self._releaseIfIdle(state)
+
+    def close(self):
+        """Give back whatever this thread still holds (the pool keeps the connection open)"""
+        state = self._local
+        if state.connection is None:
+            return
+        connection, state.connection = state.connection, None
+        discard = False
+        if state.in_transaction:
+            try:
+                connection.rollback()
+            except pymysql.Error:
+                discard = True
+        state.cursors = 0
+        state.in_transaction = False
+        self.pool.release(connection, discard=discard)
+
+
 class DatabaseModel:
+    _pool = None
+    _pool_settings = {}
+    _pool_lock = threading.Lock()
+
     def __init__(self):
         self.connection = None
 
-    def connect(self):
-        if self.connection is None:
-            self.connection = pymysql.connect(
-                host="localhost",
-                user="root",
-                password="",
-                database="dentalclinic",
-                cursorclass=pymysql.cursors.DictCursor,
-                autocommit = True
-            )
-            print('connected to database')
-        return self.connection
+    @classmethod
+    def configurePool(cls, **settings):
+        """
+        Change pool settings (size, timeout, idle_timeout, ping_after, or any
+        pymysql.connect argument). Takes effect for models created afterwards.
+        """
+        with cls._pool_lock:
+            cls._pool_settings = dict(cls._pool_settings, **settings)
+            if cls._pool is not None:
+                cls._pool.closeAll()
+                cls._pool = None
+
+    @classmethod
+    def getPool(cls):
+        """Return the process-wide connection pool, creating it on first use"""
+        with cls._pool_lock:
+            if cls._pool is None:
+                settings = dict(DB_CONFIG, **cls._pool_settings)
+                cls._pool = ConnectionPool(**settings)
+            return cls._pool
+
+    @classmethod
+    def closePool(cls):
+        """Close idle pooled connections (call on application exit)"""
+        with cls._pool_lock:
+            if cls._pool is not None:
+                cls._pool.closeAll()
 
+    @staticmethod
+    def configureQueryLog(threshold=None, log_path=None, enabled=None):
+        """Set the slow query threshold (seconds) and/or the rotating log file path"""
+        query_stats.configure(threshold=threshold, log_path=log_path, enabled=enabled)
 
+    @staticmethod
+    def dumpQueryStats(to_log=False):
+        """Print p50/p95/max timings per query fingerprint (to_log: write them to the slow query log only)"""
+        return query_stats.dump(to_log=to_log)
 
+    def connect(self):
+        if self.connection is None:
+            self.connection = PooledConnection(self.getPool())
+        return self.connection
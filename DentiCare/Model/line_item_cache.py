@@ -0,0 +1,43 @@
+import threading
+from collections import OrderedDict
+
+
+class LineItemCache:
+    """
+    Per-transaction cache of service lines for the records tab.
+
+    Lines are fetched only when a transaction row is expanded, and kept here
+    so expanding it again (or re-rendering after a refresh) costs nothing.
+    Transactions are not edited after checkout, so entries stay valid; the
+    least recently used ones are dropped past max_transactions.
+    """
+
+    def __init__(self, max_transactions=500):
+        self.max_transactions = max_transactions
+        self._lock = threading.Lock()
+        self._lines = OrderedDict()  # TransactionID -> list of line rows
+
+    def get(self, transaction_id):
+        with self._lock:
+            lines = self._lines.get(transaction_id)
+            if lines is not None:
+                self._lines.move_to_end(transaction_id)
+            return lines
+
+    def putMany(self, line_items):
+        """Store a {TransactionID: lines} dict as returned by getTransactionLineItems"""
+        with self._lock:
+            for transaction_id, lines in line_items.items():
+                self._lines[transaction_id] = lines
+                self._lines.move_to_end(transaction_id)
+            while len(self._lines) > self.max_transactions:
+                self._lines.popitem(last=False)
+
+    def missing(self, transaction_ids):
+        """IDs not cached yet, in the order given"""
+        with self._lock:
+            return [transaction_id for transaction_id in transaction_ids if transaction_id not in self._lines]
+
+    def clear(self):
+        with self._lock:
+            self._lines.clear()
@@ -1,5 +1,11 @@
 import pymysql
 from .database_model import DatabaseModel
+from . import transaction_listing
+
+# getPatientsChangedSince re-reads this many seconds before the high-water
+# mark: updated_at is stamped when the row is written, not when it commits,
+# so a slow transaction can commit a stamp older than one already shown
+REFRESH_OVERLAP_SECONDS = 60
 
 
 class PatientModel:
@@ -44,6 +50,30 @@ class PatientModel:
         finally:
             cursor.close()
 
+    def getPatientsChangedSince(self, since):
+        """
+        Patients added or edited at or after since (updated_at), for
+        incremental refresh. Also returns the ones changed in the
+        REFRESH_OVERLAP_SECONDS before it, merge the result by PatientID.
+        """
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+
+        try:
+            # idx_patient_updated_at range scan
+            sql = """
+                SELECT * FROM patient
+                WHERE updated_at >= %s - INTERVAL %s SECOND
+                ORDER BY PatientID DESC
+            """
+            cursor.execute(sql, (since, REFRESH_OVERLAP_SECONDS))
+            results = cursor.fetchall()
+            return results
+
+        except pymysql.Error as e:
+            raise e
+        finally:
+            cursor.close()
+
     def getPatientByID(self, patientID):
         """Get a specific patient by ID"""
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
@@ -64,6 +94,7 @@ class PatientModel:
         cursor = self.connection.cursor()
 
         try:
+            self.connection.begin()
             sql = """
                   UPDATE patient
                   SET PatientFname  = %s,
@@ -75,9 +106,10 @@ class PatientModel:
                   WHERE PatientID = %s 
                   """
             cursor.execute(sql, (fname, mname, lname, sex, birthday, contact, int(patientID)))
+            transaction_listing.refreshPatientName(cursor, int(patientID))
             self.connection.commit()
 
-        except pymysql.Error as e:
+        except Exception as e:
             self.connection.rollback()
             raise e
         finally:
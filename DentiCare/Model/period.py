@@ -0,0 +1,96 @@
+import calendar
+from datetime import date, datetime, timedelta
+
+
+class Period:
+    """
+    A half-open date range [start, end) used to filter date columns.
+
+    predicate() produces `column >= %s AND column < %s` so MySQL can do an
+    index range scan, unlike MONTH(column) = %s which has to read every row.
+    """
+
+    def __init__(self, start, end, label=None):
+        start = _toDate(start)
+        end = _toDate(end)
+        if end <= start:
+            raise ValueError(f"Period end ({end}) must be after start ({start})")
+
+        self.start = start
+        self.end = end
+        self.label = label or f"{start:%Y-%m-%d} to {(end - timedelta(days=1)):%Y-%m-%d}"
+
+    @classmethod
+    def month(cls, year, month):
+        start = date(year, month, 1)
+        end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        return cls(start, end, f"{calendar.month_name[month]} {year}")
+
+    @classmethod
+    def year(cls, year):
+        return cls(date(year, 1, 1), date(year + 1, 1, 1), str(year))
+
+    @classmethod
+    def quarter(cls, year, quarter):
+        if quarter not in (1, 2, 3, 4):
+            raise ValueError(f"Quarter must be 1-4, got {quarter}")
+        first_month = 3 * (quarter - 1) + 1
+        start = date(year, first_month, 1)
+        end = date(year + 1, 1, 1) if quarter == 4 else date(year, first_month + 3, 1)
+        return cls(start, end, f"Q{quarter} {year}")
+
+    @classmethod
+    def week(cls, year, week):
+        """ISO week (Monday to Sunday)"""
+        start = date.fromisocalendar(year, week, 1)
+        return cls(start, start + timedelta(days=7), f"Week {week}, {year}")
+
+    @classmethod
+    def days(cls, first_day, last_day):
+        """Both days inclusive, e.g. a range picked in the UI"""
+        first_day = _toDate(first_day)
+        last_day = _toDate(last_day)
+        return cls(first_day, last_day + timedelta(days=1))
+
+    @classmethod
+    def currentYear(cls):
+        return cls.year(date.today().year)
+
+    def predicate(self, column='TransactionDate'):
+        """Return (sql, params) for a sargable WHERE clause on column"""
+        return f"{column} >= %s AND {column} < %s", (self.start, self.end)
+
+    def months(self):
+        """Split into calendar-month periods (partial months at the edges are trimmed)"""
+        periods = []
+        current = date(self.start.year, self.start.month, 1)
+        while current < self.end:
+            month = Period.month(current.year, current.month)
+            start = max(month.start, self.start)
+            end = min(month.end, self.end)
+            label = month.label if (start, end) == (month.start, month.end) else None
+            periods.append(Period(start, end, label))
+            current = month.end
+        return periods
+
+    def __contains__(self, day):
+        return self.start <= _toDate(day) < self.end
+
+    def __eq__(self, other):
+        return isinstance(other, Period) and (self.start, self.end) == (other.start, other.end)
+
+    def __hash__(self):
+        return hash((self.start, self.end))
+
+    def __repr__(self):
+        return f"Period({self.start!r}, {self.end!r}, {self.label!r})"
+
+
+def _toDate(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    raise TypeError(f"Expected a date, got {type(value).__name__}")
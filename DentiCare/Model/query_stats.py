@@ -0,0 +1,182 @@
+import logging
+import os
+import re
+import threading
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+# Slow query log settings (override with QueryStats.configure)
+SLOW_QUERY_THRESHOLD = 0.5   # seconds
+SLOW_QUERY_LOG = os.path.join(os.getcwd(), 'logs', 'slow_queries.log')
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUP_COUNT = 5
+SAMPLES_PER_QUERY = 500      # durations kept per fingerprint for p50/p95
+
+_COMMENT_RE = re.compile(r'(--[^\n]*|/\*.*?\*/)', re.DOTALL)
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%s|%\(\w+\)s')
+_IN_LIST_RE = re.compile(r'\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_VALUES_RE = re.compile(r'\bvalues\s*\(.*?\)(?:\s*,\s*\(.*?\))*', re.DOTALL)
+_SPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Normalize a query so every call of the same statement groups together"""
+    sql = _COMMENT_RE.sub(' ', sql)
+    sql = _STRING_RE.sub('?', sql)
+    sql = _PLACEHOLDER_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _SPACE_RE.sub(' ', sql.replace('\\', ' ')).strip().rstrip(';').strip().lower()
+    sql = _IN_LIST_RE.sub('in (...)', sql)
+    sql = _VALUES_RE.sub('values (...)', sql)
+    return sql
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class QueryStats:
+    """
+    Collects wall time and row counts for every query run through a pooled cursor.
+    Queries slower than the threshold go to a rotating log file. Only the
+    fingerprint is logged, never the parameters (they can hold patient data
+    and passwords).
+    """
+
+    def __init__(self):
+        self.threshold = SLOW_QUERY_THRESHOLD
+        self.log_path = SLOW_QUERY_LOG
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._logger = None
+
+    def configure(self, threshold=None, log_path=None, enabled=None):
+        with self._lock:
+            if threshold is not None:
+                self.threshold = threshold
+            if enabled is not None:
+                self.enabled = enabled
+            if log_path is not None and log_path != self.log_path:
+                self.log_path = log_path
+                self._closeLogger()
+
+    def _closeLogger(self):
+        if self._logger is not None:
+            for handler in list(self._logger.handlers):
+                handler.close()
+                self._logger.removeHandler(handler)
+            self._logger = None
+
+    def _getLogger(self):
+        # Under the lock, so two threads logging their first slow query don't both attach a handler
+        with self._lock:
+            if self._logger is None:
+                os.makedirs(os.path.dirname(self.log_path) or '.', exist_ok=True)
+                logger = logging.getLogger('DentiCare.slow_queries')
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                handler = RotatingFileHandler(self.log_path, maxBytes=LOG_MAX_BYTES,
+                                              backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+                handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+                logger.addHandler(handler)
+                self._logger = logger
+            return self._logger
+
+    def record(self, sql, duration, rows):
+        """Record one execute() call"""
+        if not self.enabled:
+            return
+
+        key = fingerprint(sql if isinstance(sql, str) else sql.decode('utf-8', 'replace'))
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = {
+                    'count': 0,
+                    'total': 0.0,
+                    'max': 0.0,
+                    'rows': 0,
+                    'counted': 0,  # calls with a known row count
+                    'samples': deque(maxlen=SAMPLES_PER_QUERY),
+                }
+            entry['count'] += 1
+            entry['total'] += duration
+            entry['max'] = max(entry['max'], duration)
+            if rows is not None and rows >= 0:
+                entry['rows'] += rows
+                entry['counted'] += 1
+            entry['samples'].append(duration)
+            slow = duration >= self.threshold
+
+        if slow:
+            try:
+                self._getLogger().warning(
+                    f"SLOW {duration * 1000:.1f}ms rows={rows if rows is not None and rows >= 0 else '?'} | {key}"
+                )
+            except OSError as e:
+                print(f"WARNING: could not write slow query log: {e}")
+
+    def snapshot(self):
+        """Return per-fingerprint stats sorted by total time (slowest first)"""
+        with self._lock:
+            items = [(key, dict(entry, samples=sorted(entry['samples'])))
+                     for key, entry in self._stats.items()]
+
+        rows = []
+        for key, entry in items:
+            samples = entry['samples']
+            rows.append({
+                'Fingerprint': key,
+                'Count': entry['count'],
+                'TotalMs': entry['total'] * 1000,
+                'P50Ms': _percentile(samples, 50) * 1000,
+                'P95Ms': _percentile(samples, 95) * 1000,
+                'MaxMs': entry['max'] * 1000,
+                # None when no call reported a row count (e.g. unbuffered cursors)
+                'AvgRows': entry['rows'] / entry['counted'] if entry['counted'] else None,
+            })
+        rows.sort(key=lambda r: r['TotalMs'], reverse=True)
+        return rows
+
+    def formatTable(self, limit=None):
+        rows = self.snapshot()
+        if limit:
+            rows = rows[:limit]
+
+        lines = [f"{'count':>7} {'total ms':>10} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'rows':>8}  query"]
+        for r in rows:
+            query = r['Fingerprint']
+            if len(query) > 120:
+                query = query[:117] + '...'
+            avg_rows = f"{r['AvgRows']:>8.1f}" if r['AvgRows'] is not None else f"{'-':>8}"
+            lines.append(
+                f"{r['Count']:>7} {r['TotalMs']:>10.1f} {r['P50Ms']:>8.1f} {r['P95Ms']:>8.1f} "
+                f"{r['MaxMs']:>8.1f} {avg_rows}  {query}"
+            )
+        return '\n'.join(lines)
+
+    def dump(self, to_log=False):
+        """Print the stats table, or with to_log append it to the slow query log instead"""
+        table = self.formatTable()
+        if not to_log:
+            print(table)
+        elif self._stats:
+            try:
+                self._getLogger().info("QUERY STATS\n" + table)
+            except OSError as e:
+                print(f"WARNING: could not write slow query log: {e}")
+        return table
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+# Shared collector used by every pooled cursor
+query_stats = QueryStats()
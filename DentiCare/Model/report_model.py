@@ -1,5 +1,9 @@
 import pymysql
 from .database_model import DatabaseModel
+from .period import Period
+from . import daily_revenue, transaction_listing
+
+REPORT_CHUNK_ROWS = 200  # detail rows per chunk when streaming a report
 
 
 class ReportModel:
@@ -9,12 +13,26 @@ class ReportModel:
         db = DatabaseModel()
         self.connection = db.connect()
 
-    def getTransactionsByMonthYear(self, month, year):
-        """Get all transactions for a specific month and year with details"""
-        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
-
-        try:
-            sql = """
+    def _reportRowsSQL(self, period):
+        """(sql, params) for the detail rows a report lists"""
+        if transaction_listing.isAvailable():
+            date_filter, params = period.predicate('TransactionDate')
+            sql = f"""
+                  SELECT TransactionID,
+                         ProcessedBy,
+                         PatientName,
+                         DentistName,
+                         Service,
+                         Quantity,
+                         TotalAmount,
+                         TransactionDate
+                  FROM transaction_listing
+                  WHERE {date_filter}
+                  ORDER BY TransactionDate DESC, TransactionID DESC
+                  """
+        else:
+            date_filter, params = period.predicate('t.TransactionDate')
+            sql = f"""
                   SELECT t.TransactionID,
                          CONCAT(s.StaffLname, ', ', s.StaffFname, ' ', IFNULL(s.StaffMname, '')) AS ProcessedBy,
                          CONCAT(p.PatientLname, ', ', p.PatientFname, ' ', IFNULL(p.PatientMname, '')) AS PatientName,
@@ -30,39 +48,253 @@ class ReportModel:
                            INNER JOIN staff d_staff ON d.StaffID = d_staff.StaffID
                            INNER JOIN transactiondetails td ON t.TransactionID = td.TransactionID
                            INNER JOIN services svc ON td.ServiceID = svc.ServiceID
-                  WHERE MONTH(t.TransactionDate) = %s 
-                    AND YEAR(t.TransactionDate) = %s
+                  WHERE {date_filter}
                   ORDER BY t.TransactionDate DESC, t.TransactionID DESC
                   """
+        return sql, params
 
-            cursor.execute(sql, (month, year))
-            results = cursor.fetchall()
-            return results
+    def streamReportDataForPeriod(self, period, chunk_rows=REPORT_CHUNK_ROWS):
+        """
+        Generator for reports too big to hold in memory.
+
+        The first item is (service_revenue, total_data); after that come the
+        detail rows in lists of up to chunk_rows, read through a server-side
+        cursor. Everything is read in one read-only consistent-snapshot
+        transaction (see PooledConnection.beginSnapshot), so the summary and
+        the rows agree. Call close() on the generator if it isn't run to the
+        end; that ends the transaction.
+        """
+        self.connection.beginSnapshot()
+        cursor = None
+        try:
+            yield self.getRevenueByServiceForPeriod(period), self.getTotalRevenueForPeriod(period)
+
+            sql, params = self._reportRowsSQL(period)
+            cursor = self.connection.cursor(pymysql.cursors.SSDictCursor)
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            if cursor is not None:
+                cursor.close()
+            # Read-only, nothing to commit
+            self.connection.rollback()
+
+    def getReportFingerprint(self, period):
+        """
+        Cheap summary of everything a report for the Period shows.
+
+        Changes whenever a transaction in the period is added or removed, or
+        a patient, staff member or service that one of them refers to is
+        edited (names appear in the report); edits to anyone else leave it
+        alone. Uses the daily_revenue rollup when it exists, otherwise an
+        aggregate over the period's transactions. Called inside an open
+        transaction it reads the same snapshot as the rest of that transaction.
+        """
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+
+        try:
+            names_sql, names_params = self._referencedNamesSQL(period)
+            if daily_revenue.isAvailable():
+                rollup_filter, params = period.predicate('RevenueDate')
+                date_filter, date_params = period.predicate('t.TransactionDate')
+                sql = f"""
+                      SELECT CAST(IFNULL(SUM(TransactionCount), 0) AS SIGNED) AS TransactionCount,
+                             SUM(TransactionTotal) AS TotalRevenue,
+                             SUM(Quantity) AS TotalQuantity,
+                             (SELECT MAX(t.TransactionID) FROM transactions t WHERE {date_filter}) AS MaxTransactionID,
+                             {names_sql}
+                      FROM daily_revenue
+                      WHERE {rollup_filter}
+                      """
+                params = date_params + names_params + params
+            else:
+                date_filter, params = period.predicate('t.TransactionDate')
+                sql = f"""
+                      SELECT COUNT(*) AS TransactionCount,
+                             SUM(t.TotalAmount) AS TotalRevenue,
+                             MAX(t.TransactionID) AS MaxTransactionID,
+                             {names_sql}
+                      FROM transactions t
+                      WHERE {date_filter}
+                      """
+                params = names_params + params
+
+            cursor.execute(sql, params)
+            return cursor.fetchone()
 
         except pymysql.Error as e:
             raise e
         finally:
             cursor.close()
 
+    def getReportFingerprints(self, periods):
+        """
+        getReportFingerprint for each of a Period's months (as returned by
+        Period.months()) from a single query grouped by month. Returns a list
+        in the same order, each dict equal to the one-month fingerprint.
+        """
+        if not periods:
+            return []
+        span = Period(periods[0].start, periods[-1].end)
+        date_filter, date_params = span.predicate('t.TransactionDate')
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+
+        try:
+            if daily_revenue.isAvailable():
+                rollup_filter, rollup_params = span.predicate('RevenueDate')
+                totals_sql = """CAST(IFNULL(dr.TransactionCount, 0) AS SIGNED) AS TransactionCount,
+                                dr.TotalRevenue,
+                                dr.TotalQuantity,"""
+                rollup_sql = f"""
+                    LEFT JOIN (SELECT YEAR(RevenueDate) AS ReportYear,
+                                      MONTH(RevenueDate) AS ReportMonth,
+                                      SUM(TransactionCount) AS TransactionCount,
+                                      SUM(TransactionTotal) AS TotalRevenue,
+                                      SUM(Quantity) AS TotalQuantity
+                               FROM daily_revenue
+                               WHERE {rollup_filter}
+                               GROUP BY ReportYear, ReportMonth) dr
+                              ON dr.ReportYear = txn.ReportYear AND dr.ReportMonth = txn.ReportMonth
+                """
+            else:
+                rollup_params = ()
+                totals_sql = """txn.TransactionCount,
+                                txn.TotalRevenue,"""
+                rollup_sql = ""
+
+            # Names joined to each month's transactions, as in _referencedNamesSQL;
+            # LEFT JOINs so a dangling reference doesn't drop the transaction from the count
+            sql = f"""
+                  SELECT txn.ReportYear,
+                         txn.ReportMonth,
+                         {totals_sql}
+                         txn.MaxTransactionID,
+                         txn.PatientsUpdated,
+                         txn.StaffUpdated,
+                         txn.DentistsUpdated,
+                         svc.ServicesUpdated
+                  FROM (SELECT YEAR(t.TransactionDate) AS ReportYear,
+                               MONTH(t.TransactionDate) AS ReportMonth,
+                               COUNT(*) AS TransactionCount,
+                               SUM(t.TotalAmount) AS TotalRevenue,
+                               MAX(t.TransactionID) AS MaxTransactionID,
+                               MAX(p.updated_at) AS PatientsUpdated,
+                               MAX(s.updated_at) AS StaffUpdated,
+                               MAX(d.updated_at) AS DentistsUpdated
+                        FROM transactions t
+                                 LEFT JOIN patient p ON p.PatientID = t.PatientID
+                                 LEFT JOIN staff s ON s.StaffID = t.StaffID
+                                 LEFT JOIN staff d ON d.StaffID = t.DentistID
+                        WHERE {date_filter}
+                        GROUP BY ReportYear, ReportMonth) txn
+                           LEFT JOIN (SELECT YEAR(t.TransactionDate) AS ReportYear,
+                                             MONTH(t.TransactionDate) AS ReportMonth,
+                                             MAX(sv.updated_at) AS ServicesUpdated
+                                      FROM transactions t
+                                               INNER JOIN transactiondetails td ON td.TransactionID = t.TransactionID
+                                               INNER JOIN services sv ON sv.ServiceID = td.ServiceID
+                                      WHERE {date_filter}
+                                      GROUP BY ReportYear, ReportMonth) svc
+                                     ON svc.ReportYear = txn.ReportYear AND svc.ReportMonth = txn.ReportMonth
+                  {rollup_sql}
+                  """
+            cursor.execute(sql, date_params + date_params + rollup_params)
+            columns = [column[0] for column in cursor.description]
+            by_month = {(row.pop('ReportYear'), row.pop('ReportMonth')): row for row in cursor.fetchall()}
+        except pymysql.Error as e:
+            raise e
+        finally:
+            cursor.close()
+
+        # Months without transactions look like the empty one-month fingerprint
+        empty = {column: None for column in columns if column not in ('ReportYear', 'ReportMonth')}
+        empty['TransactionCount'] = 0
+        return [by_month.get((month.start.year, month.start.month), dict(empty)) for month in periods]
+
+    def _referencedNamesSQL(self, period):
+        """
+        Select-list items with the latest updated_at of the patients, staff
+        (processed by), dentists and services the Period's transactions refer
+        to; returns (sql, params)
+        """
+        date_filter, params = period.predicate('t.TransactionDate')
+        sql = f"""
+            (SELECT MAX(p.updated_at)
+             FROM transactions t
+                      INNER JOIN patient p ON p.PatientID = t.PatientID
+             WHERE {date_filter}) AS PatientsUpdated,
+            (SELECT MAX(s.updated_at)
+             FROM transactions t
+                      INNER JOIN staff s ON s.StaffID = t.StaffID
+             WHERE {date_filter}) AS StaffUpdated,
+            (SELECT MAX(d.updated_at)
+             FROM transactions t
+                      INNER JOIN staff d ON d.StaffID = t.DentistID
+             WHERE {date_filter}) AS DentistsUpdated,
+            (SELECT MAX(sv.updated_at)
+             FROM transactions t
+                      INNER JOIN transactiondetails td ON td.TransactionID = t.TransactionID
+                      INNER JOIN services sv ON sv.ServiceID = td.ServiceID
+             WHERE {date_filter}) AS ServicesUpdated
+        """
+        return sql, params * 4
+
     def getRevenueByServiceForMonth(self, month, year):
         """Get revenue breakdown by service for a specific month/year"""
+        return self.getRevenueByServiceForPeriod(Period.month(year, month))
+
+    def getRevenueByServiceForPeriod(self, period):
+        """Get revenue breakdown by service for a Period"""
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
 
         try:
-            sql = """
+            if daily_revenue.isAvailable():
+                date_filter, params = period.predicate('dr.RevenueDate')
+                sql = f"""
+                      SELECT svc.ServiceName,
+                             SUM(dr.Quantity) AS TotalQuantity,
+                             SUM(dr.ServiceRevenue) AS TotalRevenue
+                      FROM daily_revenue dr
+                               INNER JOIN services svc ON dr.ServiceID = svc.ServiceID
+                      WHERE {date_filter}
+                      GROUP BY dr.ServiceID, svc.ServiceName
+                      ORDER BY TotalRevenue DESC
+                      """
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+
+            if transaction_listing.isAvailable():
+                date_filter, params = period.predicate('TransactionDate')
+                sql = f"""
+                      SELECT Service AS ServiceName,
+                             SUM(Quantity) AS TotalQuantity,
+                             SUM(PriceAtTransaction * Quantity) AS TotalRevenue
+                      FROM transaction_listing
+                      WHERE {date_filter}
+                      GROUP BY ServiceID, Service
+                      ORDER BY TotalRevenue DESC
+                      """
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+
+            date_filter, params = period.predicate('t.TransactionDate')
+            sql = f"""
                   SELECT svc.ServiceName,
                          SUM(td.Quantity) AS TotalQuantity,
                          SUM(td.PriceAtTransaction * td.Quantity) AS TotalRevenue
                   FROM transactions t
                            INNER JOIN transactiondetails td ON t.TransactionID = td.TransactionID
                            INNER JOIN services svc ON td.ServiceID = svc.ServiceID
-                  WHERE MONTH(t.TransactionDate) = %s 
-                    AND YEAR(t.TransactionDate) = %s
+                  WHERE {date_filter}
                   GROUP BY svc.ServiceID, svc.ServiceName
                   ORDER BY TotalRevenue DESC
                   """
 
-            cursor.execute(sql, (month, year))
+            cursor.execute(sql, params)
             results = cursor.fetchall()
             return results
 
@@ -73,18 +305,33 @@ class ReportModel:
 
     def getTotalRevenueForMonth(self, month, year):
         """Get total revenue for a specific month/year"""
+        return self.getTotalRevenueForPeriod(Period.month(year, month))
+
+    def getTotalRevenueForPeriod(self, period):
+        """Get total revenue and transaction count for a Period"""
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
 
         try:
-            sql = """
+            if daily_revenue.isAvailable():
+                date_filter, params = period.predicate('RevenueDate')
+                sql = f"""
+                      SELECT SUM(TransactionTotal) AS TotalRevenue,
+                             CAST(IFNULL(SUM(TransactionCount), 0) AS SIGNED) AS TransactionCount
+                      FROM daily_revenue
+                      WHERE {date_filter}
+                      """
+                cursor.execute(sql, params)
+                return cursor.fetchone()
+
+            date_filter, params = period.predicate('t.TransactionDate')
+            sql = f"""
                   SELECT SUM(t.TotalAmount) AS TotalRevenue,
                          COUNT(DISTINCT t.TransactionID) AS TransactionCount
                   FROM transactions t
-                  WHERE MONTH(t.TransactionDate) = %s 
-                    AND YEAR(t.TransactionDate) = %s
+                  WHERE {date_filter}
                   """
 
-            cursor.execute(sql, (month, year))
+            cursor.execute(sql, params)
             result = cursor.fetchone()
             return result
 
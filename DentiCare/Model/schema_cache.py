@@ -0,0 +1,73 @@
+import threading
+
+from .database_model import DatabaseModel
+
+
+class SchemaCapabilities:
+    """
+    Process-wide cache of which tables and columns exist.
+
+    Loaded from information_schema with one query by load(), which the app
+    calls at startup (and each report worker process before its first query),
+    then answered from memory. A check made before that loads it on the spot,
+    which borrows a pooled connection of its own: with a connection already
+    held, every thread doing that at once can exhaust the pool, so warm the
+    cache before threads start querying. The migration runner reloads it
+    after changing the schema.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._columns = None  # table name (lower case) -> set of column names (lower case)
+
+    def _read(self, cursor):
+        cursor.execute(
+            """
+            SELECT TABLE_NAME, COLUMN_NAME
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE()
+            """
+        )
+        columns = {}
+        for row in cursor.fetchall():
+            columns.setdefault(row['TABLE_NAME'].lower(), set()).add(row['COLUMN_NAME'].lower())
+        return columns
+
+    def _readOwn(self):
+        cursor = DatabaseModel().connect().cursor()
+        try:
+            return self._read(cursor)
+        finally:
+            cursor.close()
+
+    def load(self, cursor=None):
+        """(Re)load the cache now, through cursor (a DictCursor) if given, otherwise a pooled connection"""
+        columns = self._read(cursor) if cursor is not None else self._readOwn()
+        with self._lock:
+            self._columns = columns
+
+    def _getColumns(self):
+        with self._lock:
+            if self._columns is None:
+                self._columns = self._readOwn()
+            return self._columns
+
+    def invalidate(self):
+        with self._lock:
+            self._columns = None
+
+    def hasTable(self, table):
+        return table.lower() in self._getColumns()
+
+    def hasColumn(self, table, column):
+        return column.lower() in self._getColumns().get(table.lower(), ())
+
+    # Feature flags used to pick query variants
+
+    def hasVATColumns(self):
+        """transactiondetails has the BasePrice/VATAmount columns added for VAT"""
+        return self.hasColumn('transactiondetails', 'BasePrice')
+
+
+# Shared cache used by every model
+schema_capabilities = SchemaCapabilities()
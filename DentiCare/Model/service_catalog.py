@@ -0,0 +1,163 @@
+import threading
+
+from .database_model import DatabaseModel
+from .schema_cache import schema_capabilities
+
+VERSION_TABLE = "service_catalog_version"
+
+# Every column any screen reads from a service row. Price and FinalPrice are
+# the same value under the names the payment and services screens use.
+SERVICES_SQL = """
+    SELECT
+        ServiceID,
+        ServiceName,
+        BasePrice,
+        IsVATApplicable,
+        VATRate,
+        CASE
+            WHEN IsVATApplicable = TRUE THEN BasePrice * (1 + VATRate/100)
+            ELSE BasePrice
+        END AS Price,
+        CASE
+            WHEN IsVATApplicable = TRUE THEN BasePrice * (1 + VATRate/100)
+            ELSE BasePrice
+        END AS FinalPrice,
+        CASE
+            WHEN IsVATApplicable = TRUE THEN BasePrice * (VATRate/100)
+            ELSE 0
+        END AS VATAmount,
+        created_at,
+        updated_at
+    FROM services
+    ORDER BY ServiceName
+"""
+
+# updated_at moves on every edit; the count and highest ID catch deletes and inserts
+VERSION_SQL = """
+    SELECT MAX(updated_at) AS LastUpdated, COUNT(*) AS ServiceCount, MAX(ServiceID) AS LastServiceID
+    FROM services
+"""
+
+# Counter bumped by every edit made through ServiceModel, so two edits within
+# the same second still move the version (see migration 5)
+COUNTER_SQL = f"SELECT Version FROM {VERSION_TABLE} WHERE ID = 1"
+
+
+def bumpVersion(cursor):
+    """Move the catalog version; call inside the database transaction that edits services"""
+    if schema_capabilities.hasTable(VERSION_TABLE):
+        cursor.execute(f"UPDATE {VERSION_TABLE} SET Version = Version + 1 WHERE ID = 1")
+
+
+class ServiceCatalogCache:
+    """
+    Process-wide cache of the services table, stamped with a version.
+
+    Loaded with one query the first time anything asks, then answered from
+    memory. ServiceModel bumps the version counter and calls invalidate()
+    after adding, updating or deleting a service; edits made from another
+    machine are picked up by refresh(), which only re-reads the rows when the
+    version stamp has moved. Returned
+    rows are shared, so callers must not modify them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._services = None  # tuple of service rows, ordered by name
+        self._by_id = {}
+        self._version = None
+
+    def _readVersion(self, cursor):
+        counter = None
+        if schema_capabilities.hasTable(VERSION_TABLE):
+            cursor.execute(COUNTER_SQL)
+            row = cursor.fetchone()
+            counter = row['Version'] if row else None
+        # The table stamp still catches edits made outside ServiceModel
+        cursor.execute(VERSION_SQL)
+        row = cursor.fetchone()
+        return counter, row['LastUpdated'], row['ServiceCount'], row['LastServiceID']
+
+    def _load(self, cursor):
+        """Re-read version and rows (caller holds the lock)"""
+        # Version first: an edit landing between the two reads only causes one extra reload
+        self._version = self._readVersion(cursor)
+        cursor.execute(SERVICES_SQL)
+        self._services = tuple(cursor.fetchall())
+        self._by_id = {service['ServiceID']: service for service in self._services}
+
+    def _withCursor(self, func):
+        connection = DatabaseModel().connect()
+        cursor = connection.cursor()
+        try:
+            return func(cursor)
+        finally:
+            cursor.close()
+
+    def _ensureLoaded(self):
+        """Load if empty (caller holds the lock)"""
+        if self._services is None:
+            self._withCursor(self._load)
+
+    def invalidate(self):
+        with self._lock:
+            self._services = None
+            self._by_id = {}
+            self._version = None
+
+    def snapshot(self):
+        """(version, services) taken together, so a caller can tell when to rebuild"""
+        with self._lock:
+            self._ensureLoaded()
+            return self._version, self._services
+
+    def refresh(self, cursor=None):
+        """
+        Check the version stamp (one small query) and reload only if it moved.
+
+        Pass a cursor to run the check inside the caller's database transaction.
+        Returns the same (version, services) pair as snapshot().
+        """
+        def check(cursor):
+            if self._services is None or self._readVersion(cursor) != self._version:
+                self._load(cursor)
+
+        with self._lock:
+            if cursor is None:
+                self._withCursor(check)
+            else:
+                check(cursor)
+            return self._version, self._services
+
+    def version(self):
+        return self.snapshot()[0]
+
+    def services(self):
+        return self.snapshot()[1]
+
+    def service(self, service_id):
+        with self._lock:
+            self._ensureLoaded()
+            return self._by_id.get(int(service_id))
+
+    def prices(self, service_ids, cursor=None):
+        """
+        Service rows for the given IDs, keyed by ServiceID, for pricing a transaction.
+
+        The version is checked first (on cursor, if given) so a checkout never
+        charges a price that was changed from another machine.
+        """
+        self.refresh(cursor)
+        with self._lock:
+            prices = {service_id: self._by_id[service_id]
+                      for service_id in service_ids if service_id in self._by_id}
+
+        missing = sorted(set(service_ids) - set(prices))
+        if missing:
+            raise ValueError(f"Service ID {', '.join(str(m) for m in missing)} not found")
+
+        return prices
+
+
+# Shared cache used by every model and controller
+service_catalog = ServiceCatalogCache()
@@ -1,5 +1,6 @@
-import pymysql
 from .database_model import DatabaseModel
+from . import transaction_listing
+from .service_catalog import bumpVersion, service_catalog
 
 class ServiceModel:
     def __init__(self):
@@ -9,90 +10,64 @@ class ServiceModel:
     def add_service(self, serviceName, basePrice, isVATApplicable=True, vatRate=12.00):
         """Add a new service with VAT information"""
         cursor = self.connection.cursor()
-        sql = """
-            INSERT INTO services (ServiceName, BasePrice, IsVATApplicable, VATRate) 
-            VALUES (%s, %s, %s, %s)
-        """
-        cursor.execute(sql, (serviceName, basePrice, isVATApplicable, vatRate))
-        self.connection.commit()
-        cursor.close()
+        try:
+            self.connection.begin()
+            sql = """
+                INSERT INTO services (ServiceName, BasePrice, IsVATApplicable, VATRate) 
+                VALUES (%s, %s, %s, %s)
+            """
+            cursor.execute(sql, (serviceName, basePrice, isVATApplicable, vatRate))
+            bumpVersion(cursor)
+            self.connection.commit()
+            service_catalog.invalidate()
+        except Exception as e:
+            self.connection.rollback()
+            raise e
+        finally:
+            cursor.close()
 
     def getAllService(self):
-        """Get all services with calculated final price"""
-        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
-        sql = """
-            SELECT 
-                ServiceID,
-                ServiceName,
-                BasePrice,
-                IsVATApplicable,
-                VATRate,
-                CASE 
-                    WHEN IsVATApplicable = TRUE THEN BasePrice * (1 + VATRate/100)
-                    ELSE BasePrice
-                END AS FinalPrice,
-                CASE 
-                    WHEN IsVATApplicable = TRUE THEN BasePrice * (VATRate/100)
-                    ELSE 0
-                END AS VATAmount,
-                created_at,
-                updated_at
-            FROM services
-            ORDER BY ServiceName
-        """
-        cursor.execute(sql)
-        results = cursor.fetchall()
-        cursor.close()
-        return results
+        """Get all services with calculated final price (from the shared catalog cache)"""
+        return service_catalog.services()
 
     def getServiceByID(self, serviceID):
-        """Get service details by ID with VAT calculations"""
-        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
-        sql = """
-            SELECT 
-                ServiceID,
-                ServiceName,
-                BasePrice,
-                IsVATApplicable,
-                VATRate,
-                CASE 
-                    WHEN IsVATApplicable = TRUE THEN BasePrice * (1 + VATRate/100)
-                    ELSE BasePrice
-                END AS FinalPrice,
-                CASE 
-                    WHEN IsVATApplicable = TRUE THEN BasePrice * (VATRate/100)
-                    ELSE 0
-                END AS VATAmount
-            FROM services 
-            WHERE ServiceID = %s
-        """
-        cursor.execute(sql, (serviceID,))
-        result = cursor.fetchone()
-        cursor.close()
-        return result
+        """Get service details by ID with VAT calculations (from the shared catalog cache)"""
+        return service_catalog.service(serviceID)
 
     def updateService(self, serviceID, serviceName, basePrice, isVATApplicable=True, vatRate=12.00):
         """Update service with VAT information"""
         cursor = self.connection.cursor()
-        sql = """
-            UPDATE services
-            SET ServiceName = %s, 
-                BasePrice = %s, 
-                IsVATApplicable = %s,
-                VATRate = %s
-            WHERE ServiceID = %s
-        """
-        cursor.execute(sql, (serviceName, basePrice, isVATApplicable, vatRate, serviceID))
-        self.connection.commit()
-        cursor.close()
+        try:
+            self.connection.begin()
+            sql = """
+                UPDATE services
+                SET ServiceName = %s, 
+                    BasePrice = %s, 
+                    IsVATApplicable = %s,
+                    VATRate = %s
+                WHERE ServiceID = %s
+            """
+            cursor.execute(sql, (serviceName, basePrice, isVATApplicable, vatRate, serviceID))
+            transaction_listing.refreshServiceName(cursor, serviceID)
+            bumpVersion(cursor)
+            self.connection.commit()
+            service_catalog.invalidate()
+        except Exception as e:
+            self.connection.rollback()
+            raise e
+        finally:
+            cursor.close()
 
     def deleteService(self, serviceID):
         """Delete a service"""
         cursor = self.connection.cursor()
         try:
+            self.connection.begin()
             sql = "DELETE FROM services WHERE ServiceID = %s"
             cursor.execute(sql, (serviceID,))
+            bumpVersion(cursor)
             self.connection.commit()
+            service_catalog.invalidate()
         except Exception as e:
             self.connection.rollback()
             raise e
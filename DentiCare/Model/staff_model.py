@@ -1,5 +1,6 @@
 import pymysql
 from .database_model import DatabaseModel
+from . import transaction_listing
 
 
 class StaffModel:
@@ -76,39 +77,50 @@ class StaffModel:
         """
         cursor = self.connection.cursor()
 
-        sql_staff = """
-            UPDATE staff
-            SET StaffFname=%s, 
-                StaffMname=%s, 
-                StaffLname=%s, 
-                Sex=%s, 
-                Birthday=%s,
-                ContactNumber=%s, 
-                Barangay=%s, 
-                City=%s, 
-                Province=%s, 
-                Zipcode=%s,
-                Role=%s, 
-                DateHired=%s
-            WHERE StaffID = %s 
-        """
-        cursor.execute(sql_staff,
-                       (fn, mn, ln, sex, bday, contact, barangay, city, province, zipcode,
-                        role, datehired, staff_id))
-
-        if role == "dentist":
-            sql_dentist = """
-                INSERT INTO dentist (StaffID, LicenseNum)
-                VALUES (%s, %s) ON DUPLICATE KEY 
-                UPDATE LicenseNum=%s 
+        try:
+            self.connection.begin()
+
+            sql_staff = """
+                UPDATE staff
+                SET StaffFname=%s, 
+                    StaffMname=%s, 
+                    StaffLname=%s, 
+                    Sex=%s, 
+                    Birthday=%s,
+                    ContactNumber=%s, 
+                    Barangay=%s, 
+                    City=%s, 
+                    Province=%s, 
+                    Zipcode=%s,
+                    Role=%s, 
+                    DateHired=%s
+                WHERE StaffID = %s 
             """
-            cursor.execute(sql_dentist, (staff_id, licenseNum, licenseNum))
-        else:
-            sql_delete = "DELETE FROM dentist WHERE StaffID=%s"
-            cursor.execute(sql_delete, (staff_id,))
+            cursor.execute(sql_staff,
+                           (fn, mn, ln, sex, bday, contact, barangay, city, province, zipcode,
+                            role, datehired, staff_id))
+
+            if role == "dentist":
+                sql_dentist = """
+                    INSERT INTO dentist (StaffID, LicenseNum)
+                    VALUES (%s, %s) ON DUPLICATE KEY 
+                    UPDATE LicenseNum=%s 
+                """
+                cursor.execute(sql_dentist, (staff_id, licenseNum, licenseNum))
+            else:
+                sql_delete = "DELETE FROM dentist WHERE StaffID=%s"
+                cursor.execute(sql_delete, (staff_id,))
+
+            # Names shown in transaction_listing follow the staff row
+            transaction_listing.refreshStaffNames(cursor, staff_id)
 
-        self.connection.commit()
-        cursor.close()
+            self.connection.commit()
+
+        except Exception as e:
+            self.connection.rollback()
+            raise e
+        finally:
+            cursor.close()
 
     def deleteStaff(self, staff_id):
         cursor = self.connection.cursor()
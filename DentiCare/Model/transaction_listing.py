@@ -0,0 +1,144 @@
+"""
+transaction_listing is a read table with one row per transaction detail. The
+staff, patient, dentist and service names are already resolved in each row.
+
+Listing and report reads hit this one table instead of repeating the 7-way
+join. Rows are written in the same database transaction as the transaction
+they describe, and the name columns are rewritten when a staff member,
+patient or service is renamed. The helpers take the caller's cursor so they
+join the caller's transaction.
+"""
+
+from .schema_cache import schema_capabilities
+
+LISTING_TABLE = "transaction_listing"
+
+LISTING_COLUMNS = (
+    "TransactionDetailsID", "TransactionID", "TransactionDate",
+    "PatientID", "StaffID", "DentistID", "ServiceID",
+    "ProcessedBy", "PatientName", "DentistName", "Service",
+    "BasePrice", "VATAmount", "VATRate", "IsVATApplicable",
+    "PriceAtTransaction", "Quantity", "TotalAmount", "Notes",
+)
+
+# Same name format the old joined queries built for every row
+STAFF_NAME_SQL = "CONCAT({0}.StaffLname, ', ', {0}.StaffFname, ' ', IFNULL({0}.StaffMname, ''))"
+PATIENT_NAME_SQL = "CONCAT(p.PatientLname, ', ', p.PatientFname, ' ', IFNULL(p.PatientMname, ''))"
+
+
+def listingSelectSQL(where="", has_vat=True):
+    """SELECT producing listing rows from the normalized tables, in LISTING_COLUMNS order"""
+    if has_vat:
+        vat_columns = "td.BasePrice, td.VATAmount, td.VATRate, td.IsVATApplicable"
+    else:
+        vat_columns = "td.PriceAtTransaction, 0, 0, 0"
+
+    return f"""
+        SELECT td.TransactionDetailsID,
+               t.TransactionID,
+               t.TransactionDate,
+               t.PatientID,
+               t.StaffID,
+               t.DentistID,
+               td.ServiceID,
+               {STAFF_NAME_SQL.format('s')},
+               {PATIENT_NAME_SQL},
+               {STAFF_NAME_SQL.format('d')},
+               svc.ServiceName,
+               {vat_columns},
+               td.PriceAtTransaction,
+               td.Quantity,
+               t.TotalAmount,
+               t.Notes
+        FROM transactions t
+                 INNER JOIN staff s ON t.StaffID = s.StaffID
+                 INNER JOIN patient p ON t.PatientID = p.PatientID
+                 INNER JOIN staff d ON t.DentistID = d.StaffID
+                 INNER JOIN transactiondetails td ON t.TransactionID = td.TransactionID
+                 INNER JOIN services svc ON td.ServiceID = svc.ServiceID
+        {where}
+    """
+
+
+def _insertSQL(where, has_vat):
+    columns = ", ".join(LISTING_COLUMNS)
+    return f"INSERT INTO {LISTING_TABLE} ({columns}) {listingSelectSQL(where, has_vat)}"
+
+
+def isAvailable():
+    """False until the migration that creates the table has run"""
+    return schema_capabilities.hasTable(LISTING_TABLE)
+
+
+def addTransactions(cursor, transaction_ids):
+    """Copy the listing rows for newly created transactions (one INSERT ... SELECT)"""
+    if not transaction_ids or not isAvailable():
+        return
+    placeholders = ", ".join(["%s"] * len(transaction_ids))
+    cursor.execute(
+        _insertSQL(f"WHERE t.TransactionID IN ({placeholders})", schema_capabilities.hasVATColumns()),
+        tuple(transaction_ids)
+    )
+
+
+def refreshStaffNames(cursor, staff_id):
+    """Rewrite ProcessedBy / DentistName after a staff member's name changed"""
+    if not isAvailable():
+        return
+    name_sql = STAFF_NAME_SQL.format('s')
+    cursor.execute(
+        f"""
+        UPDATE {LISTING_TABLE} tl
+            INNER JOIN staff s ON s.StaffID = tl.StaffID
+        SET tl.ProcessedBy = {name_sql}
+        WHERE tl.StaffID = %s
+        """,
+        (staff_id,)
+    )
+    cursor.execute(
+        f"""
+        UPDATE {LISTING_TABLE} tl
+            INNER JOIN staff s ON s.StaffID = tl.DentistID
+        SET tl.DentistName = {name_sql}
+        WHERE tl.DentistID = %s
+        """,
+        (staff_id,)
+    )
+
+
+def refreshPatientName(cursor, patient_id):
+    """Rewrite PatientName after a patient's name changed"""
+    if not isAvailable():
+        return
+    cursor.execute(
+        f"""
+        UPDATE {LISTING_TABLE} tl
+            INNER JOIN patient p ON p.PatientID = tl.PatientID
+        SET tl.PatientName = {PATIENT_NAME_SQL}
+        WHERE tl.PatientID = %s
+        """,
+        (patient_id,)
+    )
+
+
+def refreshServiceName(cursor, service_id):
+    """Rewrite Service after a service was renamed"""
+    if not isAvailable():
+        return
+    cursor.execute(
+        f"""
+        UPDATE {LISTING_TABLE} tl
+            INNER JOIN services svc ON svc.ServiceID = tl.ServiceID
+        SET tl.Service = svc.ServiceName
+        WHERE tl.ServiceID = %s
+        """,
+        (service_id,)
+    )
+
+
+def rebuild(cursor, has_vat=None):
+    """Repopulate the whole table from the normalized tables"""
+    if has_vat is None:
+        has_vat = schema_capabilities.hasVATColumns()
+    cursor.execute(f"DELETE FROM {LISTING_TABLE}")
+    cursor.execute(_insertSQL("", has_vat))
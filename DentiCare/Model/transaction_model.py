@@ -1,5 +1,27 @@
+from decimal import Decimal
+
 import pymysql
 from .database_model import DatabaseModel
+from .schema_cache import schema_capabilities
+from .service_catalog import service_catalog
+from . import daily_revenue, transaction_listing
+
+RECORDS_PAGE_SIZE = 50  # transactions per page on the records tab
+
+# getTransactionHeadersSince re-reads this many IDs below the high-water mark.
+# AUTO_INCREMENT ids are handed out at INSERT, not at COMMIT, so a checkout
+# that commits late can land below an id already shown; the caller merges by
+# TransactionID, so rows read twice are replaced rather than duplicated
+REFRESH_OVERLAP_IDS = 50
+
+
+class PriceChangedError(ValueError):
+    """Raised when a checkout's total no longer matches the current service prices"""
+
+    def __init__(self, expected_total, total_amount):
+        super().__init__(f"Service prices have changed: the total is now {expected_total:.2f}, "
+                         f"not {Decimal(str(total_amount)):.2f}")
+        self.expected_total = expected_total
 
 
 class TransactionModel:
@@ -12,112 +34,102 @@ class TransactionModel:
     def createTransaction(self, dentist_id, staff_id, patient_id, total_amount,
                           transaction_date, service_details, notes=None):
         """Create new transaction with VAT information"""
+        return self.createTransactions([{
+            'dentist_id': dentist_id,
+            'staff_id': staff_id,
+            'patient_id': patient_id,
+            'total_amount': total_amount,
+            'transaction_date': transaction_date,
+            'service_details': service_details,
+            'notes': notes,
+        }])[0]
+
+    def createTransactions(self, transactions):
+        """
+        Create several transactions in one database transaction (bulk mode).
+
+        Each item takes the same keys as createTransaction's arguments. Prices
+        for every service are read with one query and all detail rows are
+        written with one multi-row insert, so the transaction stays short.
+        Returns the new TransactionIDs in the same order.
+
+        Each total_amount must equal the sum of its lines at the prices written
+        to transactiondetails; otherwise nothing is saved and PriceChangedError
+        is raised, so a checkout priced from a stale catalog is never recorded.
+        """
         cursor = self.connection.cursor()
 
         try:
             # Start transaction
             self.connection.begin()
 
-            # Insert into transactions table
+            service_ids = {service['service_id']
+                           for transaction in transactions
+                           for service in transaction['service_details']}
+            # Prices come from the shared catalog, version-checked inside this transaction
+            prices = service_catalog.prices(service_ids, cursor)
+
             transaction_sql = """
                 INSERT INTO transactions
                     (DentistID, StaffID, PatientID, TotalAmount, TransactionDate, Notes)
                 VALUES (%s, %s, %s, %s, %s, %s)
             """
-            cursor.execute(transaction_sql,
-                           (dentist_id, staff_id, patient_id, total_amount,
-                            transaction_date, notes))
-
-            # Get the auto-generated TransactionID
-            transaction_id = cursor.lastrowid
-
-            # Insert transaction details
-            for service in service_details:
-                service_id = service['service_id']
-                quantity = service['quantity']
-
-                # Get service details including VAT information
-                price_sql = """
-                    SELECT 
-                        BasePrice,
-                        IsVATApplicable,
-                        VATRate,
-                        CASE 
-                            WHEN IsVATApplicable = TRUE THEN BasePrice * (1 + VATRate/100)
-                            ELSE BasePrice
-                        END AS FinalPrice,
-                        CASE 
-                            WHEN IsVATApplicable = TRUE THEN BasePrice * (VATRate/100)
-                            ELSE 0
-                        END AS VATAmount
-                    FROM services 
-                    WHERE ServiceID = %s
-                """
-                cursor.execute(price_sql, (service_id,))
-                price_result = cursor.fetchone()
-
-                if not price_result:
-                    raise ValueError(f"Service ID {service_id} not found")
-
-                base_price = price_result['BasePrice']
-                final_price = price_result['FinalPrice']
-                vat_amount = price_result['VATAmount']
-                is_vat_applicable = price_result['IsVATApplicable']
-                vat_rate = price_result['VATRate']
 
-                # Insert transaction detail with VAT information
+            transaction_ids = []
+            detail_rows = []
+            for transaction in transactions:
+                expected_total = sum(
+                    (Decimal(str(prices[service['service_id']]['FinalPrice'])) * service['quantity']
+                     for service in transaction['service_details']),
+                    Decimal('0.00')
+                ).quantize(Decimal('0.01'))
+                if Decimal(str(transaction['total_amount'])).quantize(Decimal('0.01')) != expected_total:
+                    raise PriceChangedError(expected_total, transaction['total_amount'])
+
+                cursor.execute(transaction_sql,
+                               (transaction['dentist_id'], transaction['staff_id'],
+                                transaction['patient_id'], transaction['total_amount'],
+                                transaction['transaction_date'], transaction.get('notes')))
+
+                # Get the auto-generated TransactionID
+                transaction_id = cursor.lastrowid
+                transaction_ids.append(transaction_id)
+
+                for service in transaction['service_details']:
+                    price = prices[service['service_id']]
+                    detail_rows.append((
+                        transaction_id, service['service_id'], price['FinalPrice'], service['quantity'],
+                        price['BasePrice'], price['VATAmount'], price['VATRate'], price['IsVATApplicable']
+                    ))
+
+            # Insert all transaction details at once with VAT information
+            if detail_rows:
                 detail_sql = """
                     INSERT INTO transactiondetails
-                        (TransactionID, ServiceID, PriceAtTransaction, Quantity, 
+                        (TransactionID, ServiceID, PriceAtTransaction, Quantity,
                          BasePrice, VATAmount, VATRate, IsVATApplicable)
                     VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
                 """
-                cursor.execute(detail_sql, (
-                    transaction_id, service_id, final_price, quantity,
-                    base_price, vat_amount, vat_rate, is_vat_applicable
-                ))
+                cursor.executemany(detail_sql, detail_rows)
+
+            # Keep the read table and revenue rollup in step, inside the same database transaction
+            transaction_listing.addTransactions(cursor, transaction_ids)
+            daily_revenue.addTransactions(cursor, transaction_ids)
 
             # Commit transaction
             self.connection.commit()
-            return transaction_id
+            return transaction_ids
 
-        except (pymysql.Error, ValueError) as e:
+        except Exception as e:
+            # Any failure must end the transaction, or the pooled connection stays pinned with its locks
             self.connection.rollback()
             raise e
         finally:
             cursor.close()
 
     def getAllServices(self):
-        """Get all available services with VAT calculations"""
-        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
-
-        try:
-            sql = """
-                SELECT 
-                    ServiceID, 
-                    ServiceName, 
-                    BasePrice,
-                    IsVATApplicable,
-                    VATRate,
-                    CASE 
-                        WHEN IsVATApplicable = TRUE THEN BasePrice * (1 + VATRate/100)
-                        ELSE BasePrice
-                    END AS Price,
-                    CASE 
-                        WHEN IsVATApplicable = TRUE THEN BasePrice * (VATRate/100)
-                        ELSE 0
-                    END AS VATAmount
-                FROM services 
-                ORDER BY ServiceName
-            """
-            cursor.execute(sql)
-            results = cursor.fetchall()
-            return results
-
-        except pymysql.Error as e:
-            raise e
-        finally:
-            cursor.close()
+        """Get all available services with VAT calculations (from the shared catalog cache)"""
+        return service_catalog.services()
 
     def getAllDentists(self):
         """Get all dentists"""
@@ -167,123 +179,247 @@ class TransactionModel:
         finally:
             cursor.close()
 
-    def getAllTransactionRecords(self):
-        """Get all transaction records with VAT breakdown - safe version"""
+    def getTransactionHeadersPage(self, after=None, page_size=RECORDS_PAGE_SIZE, direction='older'):
+        """
+        One page of transaction headers, newest first, using keyset pagination.
+
+        One row per transaction with its total, number of service lines
+        (LineCount) and items (ItemCount); the lines themselves come from
+        getTransactionLineItems when a row is expanded. after is the
+        (TransactionDate, TransactionID) of the last transaction already shown
+        (None for the first page). direction='older' returns the page_size
+        transactions before it, 'newer' the page_size closest ones after it.
+        Either way the page comes back newest first, so it can be appended or
+        prepended to the rows already shown as a block. The cost does not
+        grow with the number of pages already read.
+        """
+        if direction not in ('older', 'newer'):
+            raise ValueError(f"direction must be 'older' or 'newer', got {direction!r}")
+
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
 
         try:
-            # First, check if VAT columns exist
-            cursor.execute("SHOW COLUMNS FROM transactiondetails LIKE 'BasePrice'")
-            has_vat_columns = cursor.fetchone() is not None
-
-            if has_vat_columns:
-                # Query WITH VAT columns
-                sql = """
-                      SELECT t.TransactionID,
-                             CONCAT(s.StaffLname, ', ', s.StaffFname, ' ', IFNULL(s.StaffMname, '')) AS ProcessedBy,
-                             p.PatientID,
-                             CONCAT(p.PatientLname, ', ', p.PatientFname, ' ',
-                                    IFNULL(p.PatientMname, ''))                                      AS PatientName,
-                             CONCAT('Dr. ', d_staff.StaffLname, ', ', d_staff.StaffFname, ' ',
-                                    IFNULL(d_staff.StaffMname, ''))                                  AS DentistName,
-                             svc.ServiceName                                                         AS Service,
-                             td.BasePrice,
-                             td.VATAmount,
-                             td.PriceAtTransaction,
-                             td.Quantity,
-                             t.TotalAmount                                                           AS Total,
-                             t.TransactionDate
-                      FROM transactions t
-                               INNER JOIN staff s ON t.StaffID = s.StaffID
-                               INNER JOIN patient p ON t.PatientID = p.PatientID
-                               INNER JOIN dentist d ON t.DentistID = d.StaffID
-                               INNER JOIN staff d_staff ON d.StaffID = d_staff.StaffID
-                               INNER JOIN transactiondetails td ON t.TransactionID = td.TransactionID
-                               INNER JOIN services svc ON td.ServiceID = svc.ServiceID
-                      ORDER BY t.TransactionDate DESC, t.TransactionID DESC \
-                      """
+            if direction == 'older':
+                keyset = "TransactionDate < %s OR (TransactionDate = %s AND TransactionID < %s)"
+                order = "DESC"
             else:
-                # Query WITHOUT VAT columns (fallback for unmigrated databases)
-                print("WARNING: VAT columns not found in transactiondetails table")
-                sql = """
-                      SELECT t.TransactionID,
-                             CONCAT(s.StaffLname, ', ', s.StaffFname, ' ', IFNULL(s.StaffMname, '')) AS ProcessedBy,
-                             p.PatientID,
-                             CONCAT(p.PatientLname, ', ', p.PatientFname, ' ',
-                                    IFNULL(p.PatientMname, ''))                                      AS PatientName,
-                             CONCAT('Dr. ', d_staff.StaffLname, ', ', d_staff.StaffFname, ' ',
-                                    IFNULL(d_staff.StaffMname, ''))                                  AS DentistName,
-                             svc.ServiceName                                                         AS Service,
-                                                                                                    AS BasePrice,
-                             0                                                                       AS VATAmount,
-                             td.PriceAtTransaction,
-                             td.Quantity,
-                             t.TotalAmount                                                           AS Total,
-                             t.TransactionDate
-                      FROM transactions t
-                               INNER JOIN staff s ON t.StaffID = s.StaffID
-                               INNER JOIN patient p ON t.PatientID = p.PatientID
-                               INNER JOIN dentist d ON t.DentistID = d.StaffID
-                               INNER JOIN staff d_staff ON d.StaffID = d_staff.StaffID
-                               INNER JOIN transactiondetails td ON t.TransactionID = td.TransactionID
-                               INNER JOIN services svc ON td.ServiceID = svc.ServiceID
-                      ORDER BY t.TransactionDate DESC, t.TransactionID DESC \
-                      """
+                keyset = "TransactionDate > %s OR (TransactionDate = %s AND TransactionID > %s)"
+                order = "ASC"
 
-            cursor.execute(sql)
-            result = cursor.fetchall()
-            return result
+            if after is None:
+                where, params = "", ()
+            else:
+                after_date, after_id = after
+                where, params = f"WHERE {keyset}", (after_date, after_date, after_id)
+
+            # Pick the page from transactions alone (idx_transactions_date_id),
+            # then read the rest for just those transactions
+            id_sql = f"""
+                SELECT TransactionID
+                FROM transactions
+                {where}
+                ORDER BY TransactionDate {order}, TransactionID {order}
+                LIMIT %s
+            """
+            page = list(self._getHeadersForTransactions(cursor, id_sql, params + (page_size,)))
+            if direction == 'newer':
+                # Picked oldest first (closest to after), shown newest first like 'older' pages
+                page.sort(key=lambda row: (row['TransactionDate'], row['TransactionID']), reverse=True)
+            return page
 
         except pymysql.Error as e:
-            print(f"ERROR in getAllTransactionRecords: {e}")
             raise e
         finally:
             cursor.close()
 
-    def searchTransactionRecordsByPatientID(self, patient_id):
-        """Search records by Patient ID with VAT breakdown"""
+    def getTransactionHeadersSince(self, transaction_id):
+        """
+        Headers of transactions created after transaction_id (newest first),
+        for incremental refresh. Also returns the REFRESH_OVERLAP_IDS
+        transactions just below it, merge the result by TransactionID.
+        """
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
 
         try:
-            sql = """
+            # Transactions are never edited after checkout, so an ID range is
+            # enough (primary key range scan); the overlap picks up lower IDs
+            # that committed after the last refresh
+            id_sql = "SELECT TransactionID FROM transactions WHERE TransactionID > %s"
+            return self._getHeadersForTransactions(cursor, id_sql, (transaction_id - REFRESH_OVERLAP_IDS,))
+
+        except pymysql.Error as e:
+            raise e
+        finally:
+            cursor.close()
+
+    def searchTransactionHeadersByPatientID(self, patient_id):
+        """Headers of a patient's transactions, newest first"""
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+
+        try:
+            # idx_transactions_patient_date
+            id_sql = "SELECT TransactionID FROM transactions WHERE PatientID = %s"
+            return self._getHeadersForTransactions(cursor, id_sql, (patient_id,))
+
+        except pymysql.Error as e:
+            raise e
+        finally:
+            cursor.close()
+
+    def _getHeadersForTransactions(self, cursor, id_sql, params):
+        """One row per transaction selected by id_sql, newest first"""
+        if transaction_listing.isAvailable():
+            # Every listing row of a transaction carries the same names and total
+            sql = f"""
+                SELECT tl.TransactionID,
+                       MAX(tl.ProcessedBy) AS ProcessedBy,
+                       MAX(tl.PatientID) AS PatientID,
+                       MAX(tl.PatientName) AS PatientName,
+                       CONCAT('Dr. ', MAX(tl.DentistName)) AS DentistName,
+                       MAX(tl.TotalAmount) AS Total,
+                       MAX(tl.TransactionDate) AS TransactionDate,
+                       COUNT(*) AS LineCount,
+                       SUM(tl.Quantity) AS ItemCount
+                FROM ({id_sql}) page
+                         INNER JOIN transaction_listing tl ON tl.TransactionID = page.TransactionID
+                GROUP BY tl.TransactionID
+                ORDER BY MAX(tl.TransactionDate) DESC, tl.TransactionID DESC
+            """
+        else:
+            sql = f"""
                 SELECT t.TransactionID,
                        CONCAT(s.StaffLname, ', ', s.StaffFname, ' ', IFNULL(s.StaffMname, '')) AS ProcessedBy,
                        p.PatientID,
-                       CONCAT(p.PatientLname, ', ', p.PatientFname, ' ', 
+                       CONCAT(p.PatientLname, ', ', p.PatientFname, ' ',
                               IFNULL(p.PatientMname, '')) AS PatientName,
-                       CONCAT('Dr. ',d_staff.StaffLname, ', ', d_staff.StaffFname, ' ', 
+                       CONCAT('Dr. ', d_staff.StaffLname, ', ', d_staff.StaffFname, ' ',
                               IFNULL(d_staff.StaffMname, '')) AS DentistName,
-                       svc.ServiceName AS Service,
-                       td.BasePrice,
-                       td.VATAmount,
-                       td.PriceAtTransaction,
-                       td.Quantity,
                        t.TotalAmount AS Total,
-                       t.TransactionDate
-                FROM transactions t
+                       t.TransactionDate,
+                       (SELECT COUNT(*) FROM transactiondetails td
+                        WHERE td.TransactionID = t.TransactionID) AS LineCount,
+                       (SELECT SUM(td.Quantity) FROM transactiondetails td
+                        WHERE td.TransactionID = t.TransactionID) AS ItemCount
+                FROM ({id_sql}) page
+                         INNER JOIN transactions t ON t.TransactionID = page.TransactionID
                          INNER JOIN staff s ON t.StaffID = s.StaffID
                          INNER JOIN patient p ON t.PatientID = p.PatientID
-                         INNER JOIN dentist d ON t.DentistID = d.StaffID
-                         INNER JOIN staff d_staff ON d.StaffID = d_staff.StaffID
-                         INNER JOIN transactiondetails td ON t.TransactionID = td.TransactionID
-                         INNER JOIN services svc ON td.ServiceID = svc.ServiceID
-                WHERE p.PatientID = %s
+                         INNER JOIN staff d_staff ON t.DentistID = d_staff.StaffID
                 ORDER BY t.TransactionDate DESC, t.TransactionID DESC
             """
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+    def getTransactionLineItems(self, transaction_ids):
+        """Service lines of the given transactions, keyed by TransactionID"""
+        if not transaction_ids:
+            return {}
+
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+
+        try:
+            placeholders = ", ".join(["%s"] * len(transaction_ids))
+            if transaction_listing.isAvailable():
+                sql = f"""
+                    SELECT TransactionID, TransactionDetailsID, Service,
+                           BasePrice, VATAmount, PriceAtTransaction, Quantity
+                    FROM transaction_listing
+                    WHERE TransactionID IN ({placeholders})
+                    ORDER BY TransactionID, TransactionDetailsID
+                """
+            else:
+                if schema_capabilities.hasVATColumns():
+                    vat_columns = "td.BasePrice, td.VATAmount,"
+                else:
+                    vat_columns = "td.PriceAtTransaction AS BasePrice, 0 AS VATAmount,"
+                sql = f"""
+                    SELECT td.TransactionID, td.TransactionDetailsID, svc.ServiceName AS Service,
+                           {vat_columns} td.PriceAtTransaction, td.Quantity
+                    FROM transactiondetails td
+                             INNER JOIN services svc ON td.ServiceID = svc.ServiceID
+                    WHERE td.TransactionID IN ({placeholders})
+                    ORDER BY td.TransactionID, td.TransactionDetailsID
+                """
+            cursor.execute(sql, tuple(transaction_ids))
 
-            cursor.execute(sql, (patient_id,))
-            result = cursor.fetchall()
-            return result
+            line_items = {transaction_id: [] for transaction_id in transaction_ids}
+            for row in cursor.fetchall():
+                line_items.setdefault(row['TransactionID'], []).append(row)
+            return line_items
 
         except pymysql.Error as e:
             raise e
         finally:
             cursor.close()
 
+    def getReceiptData(self, transaction_id):
+        """Everything generateReceipt needs to redo a saved transaction's receipt, or None if it doesn't exist"""
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+
+        try:
+            sql = """
+                SELECT t.TransactionID, t.StaffID, t.TotalAmount, t.TransactionDate, t.Notes,
+                       p.PatientLname, p.PatientFname
+                FROM transactions t
+                         INNER JOIN patient p ON t.PatientID = p.PatientID
+                WHERE t.TransactionID = %s
+            """
+            cursor.execute(sql, (transaction_id,))
+            header = cursor.fetchone()
+
+        except pymysql.Error as e:
+            raise e
+        finally:
+            cursor.close()
+
+        if header is None:
+            return None
+
+        lines = self.getTransactionLineItems([header['TransactionID']])[header['TransactionID']]
+        return {
+            'transaction_id': header['TransactionID'],
+            'patient_name': f"{header['PatientLname']}, {header['PatientFname']}",
+            'total_amount': float(header['TotalAmount']),
+            'transaction_date': header['TransactionDate'],
+            'service_details': [{
+                'service_name': line['Service'],
+                'base_price': float(line['BasePrice']),
+                'vat_amount': float(line['VATAmount']),
+                'price': float(line['PriceAtTransaction']),
+                'quantity': line['Quantity'],
+            } for line in lines],
+            'notes': header['Notes'],
+            'staff_id': header['StaffID'],
+        }
+
     def getTransactionRecordsForExport(self, patient_id):
         """Get transaction records INCLUDING notes and VAT for PDF export"""
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
         try:
-            cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+            if transaction_listing.isAvailable():
+                query = """
+                    SELECT TransactionID,
+                           ProcessedBy,
+                           PatientID,
+                           PatientName,
+                           DentistName,
+                           Service,
+                           BasePrice,
+                           VATAmount,
+                           VATRate,
+                           IsVATApplicable,
+                           PriceAtTransaction,
+                           Quantity,
+                           (PriceAtTransaction * Quantity) AS Total,
+                           TransactionDate,
+                           Notes
+                    FROM transaction_listing
+                    WHERE PatientID = %s
+                    ORDER BY TransactionDate DESC, TransactionID DESC
+                """
+                cursor.execute(query, (patient_id,))
+                return cursor.fetchall()
+
             query = """
                 SELECT t.TransactionID,
                        CONCAT(s.StaffLname, ', ', s.StaffFname, ' ', IFNULL(s.StaffMname, '')) AS ProcessedBy,
@@ -313,6 +449,8 @@ class TransactionModel:
             return cursor.fetchall()
         except Exception as e:
             raise Exception(f"Failed to retrieve transaction records for export: {e}")
+        finally:
+            cursor.close()
 
     def __del__(self):
         """Close database connection when object is destroyed"""
@@ -12,6 +12,7 @@ from DentiCare.Controller.service_controller import ServiceTabController
 from DentiCare.Controller.dashboard_controller import DashboardTabController
 from DentiCare.Controller.transaction_controller import TransactionController
 from DentiCare.Controller.report_controller import ReportController
+from DentiCare.Controller.query_executor import QueryExecutor
 from pathlib import Path
 
 # def get_resource_path(filename):
@@ -42,6 +43,9 @@ class Admin(QMainWindow):
         self.stackedWidget.setCurrentIndex(0)
         self.dashboardBtn.setChecked(True)
 
+        # Runs model queries off the UI thread for every controller
+        self.query_executor = QueryExecutor(self)
+
         # Instantiate Controllers
         self.dashboard_controller = DashboardTabController(self)
         self.staff_controller = StaffTabController(self)
@@ -107,9 +111,12 @@ class Admin(QMainWindow):
 
     def _connectTransactionButtons(self):
         self.generateReportBtn.clicked.connect(self.report_controller.showGenerateReportForm)
+        self.recordsTable.verticalScrollBar().valueChanged.connect(self.transaction_controller.onRecordsScrolled)
 
     def switchToTab(self, index):
         """Switch to a specific tab"""
+        # Drop loads still running for the tab we are leaving
+        self.query_executor.cancelAll()
         self.stackedWidget.setCurrentIndex(index)
 
     def getStaffTable(self):
@@ -130,6 +137,7 @@ class Admin(QMainWindow):
 
     def logout(self):
         """Handle logout"""
+        self.query_executor.cancelAll()
         from DentiCare.View.login_view import Login
         self.login_window = Login()
         self.login_window.show()
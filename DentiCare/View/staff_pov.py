@@ -3,15 +3,76 @@ import warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 import sys
 from pathlib import Path
-from PyQt6.QtCore import Qt, pyqtSignal, QDate
+from PyQt6.QtCore import Qt, pyqtSignal, QDate, QTimer
 from PyQt6.QtWidgets import (QApplication, QDialog, QMainWindow, QWidget,
                              QVBoxLayout, QComboBox, QLineEdit, QSpinBox,
-                             QPushButton, QHBoxLayout)
+                             QPushButton, QHBoxLayout, QCompleter)
 from PyQt6.uic import loadUi
-from PyQt6.QtGui import QPixmap
+from PyQt6.QtGui import QPixmap, QStandardItem, QStandardItemModel
 from DentiCare.Controller.patient_controller import PatientTabController
 from DentiCare.Controller.transaction_controller import TransactionController
 from DentiCare.Controller.report_controller import ReportController
+from DentiCare.Controller.query_executor import QueryExecutor
+
+CATALOG_POLL_INTERVAL_MS = 30000  # how often open staff windows check the services version
+
+# Applied once to the service rows' container instead of to every widget in every row
+SERVICE_ROW_STYLE = """
+QComboBox {
+    border: 2px solid #1A1054;
+    border-radius: 5px;
+    padding: 3px;
+    background-color: rgb(255, 255, 255);
+    color: rgb(26, 16, 84);
+}
+QComboBox::drop-down {
+    border: none;
+}
+QComboBox QAbstractItemView {
+    border: 1px solid #1A1054;
+    selection-background-color: #1A1054;
+    color: black;
+}
+QLineEdit#servicePriceField {
+    border: 2px solid #1A1054;
+    border-radius: 5px;
+    padding: 3px;
+    background-color: rgb(240, 240, 240);
+    color: rgb(26, 16, 84);
+}
+QSpinBox {
+    border: 2px solid #1A1054;
+    border-radius: 5px;
+    padding: 2px 4px;
+    background-color: rgb(255, 255, 255);
+}
+QSpinBox::up-button, QSpinBox::down-button {
+    width: 20px;
+    height: 14px;
+}
+QSpinBox::up-arrow, QSpinBox::down-arrow {
+    width: 8px;
+    height: 8px;
+}
+QPushButton#serviceRemoveBtn {
+    background-color: red;
+    color: white;
+    border-radius: 5px;
+}
+"""
+
+
+def build_combo_items(placeholder, rows, text_key, id_key, parent=None):
+    """Item model for a combo box: disabled placeholder first, then one item per row with its ID as item data"""
+    items = QStandardItemModel(parent)
+    placeholder_item = QStandardItem(placeholder)  # no item data
+    placeholder_item.setEnabled(False)
+    items.appendRow(placeholder_item)
+    for row in rows:
+        item = QStandardItem(row[text_key])
+        item.setData(row[id_key], Qt.ItemDataRole.UserRole)
+        items.appendRow(item)
+    return items
 
 
 def get_resource_path(filename):
@@ -26,66 +87,21 @@ class ServiceRowWidget(QWidget):
 
     remove_requested = pyqtSignal(QWidget)
 
-    def __init__(self, services_list, dentists_list, parent=None):
+    def __init__(self, catalog, service_items, dentist_items, parent=None):
         super().__init__(parent)
 
-        # --- Service ComboBox ---
-        self.serviceField = QComboBox()
-        self.serviceField.addItem('Services')  # placeholder
-
-        # Add services from database
-        for service in services_list:
-            self.serviceField.addItem(service['ServiceName'])
-
-        self.serviceField.setCurrentIndex(0)
-        self.serviceField.model().item(0).setEnabled(False)
-
-        # --- Dentist ComboBox ---
-        self.dentistField = QComboBox()
-        self.dentistField.addItem('Dentists')  # placeholder
-
-        # Add dentists from database
-        for dentist in dentists_list:
-            self.dentistField.addItem(dentist['DentistName'])
-
-        self.dentistField.setCurrentIndex(0)
-        self.dentistField.model().item(0).setEnabled(False)
-
-        combo_style = """
-        QComboBox {
-            border: 2px solid #1A1054;
-            border-radius: 5px;
-            padding: 3px;
-            background-color: rgb(255, 255, 255);
-            color: rgb(26, 16, 84);
-        }
-        QComboBox::drop-down {
-            border: none;
-        }
-        QComboBox QAbstractItemView {
-            border: 1px solid #1A1054;
-            selection-background-color: #1A1054;
-            color: black;
-        }
-        """
-        self.serviceField.setStyleSheet(combo_style)
-        self.dentistField.setStyleSheet(combo_style)
+        # --- Service / Dentist ComboBoxes ---
+        # Item models are shared by every row, so adding a row costs the same
+        # whatever the catalog size; only the view onto them is per row
+        self.serviceField = self._createCombo(service_items)
+        self.dentistField = self._createCombo(dentist_items)
 
         # --- Price Display (Read-only) ---
         self.priceField = QLineEdit()
+        self.priceField.setObjectName('servicePriceField')
         self.priceField.setPlaceholderText("Price")
         self.priceField.setFixedWidth(80)
         self.priceField.setReadOnly(True)
-        lineedit_style = """
-        QLineEdit {
-            border: 2px solid #1A1054;
-            border-radius: 5px;
-            padding: 3px;
-            background-color: rgb(240, 240, 240);
-            color: rgb(26, 16, 84);
-        }
-        """
-        self.priceField.setStyleSheet(lineedit_style)
 
         # --- Quantity SpinBox ---
         self.quantityField = QSpinBox()
@@ -95,30 +111,10 @@ class ServiceRowWidget(QWidget):
         self.quantityField.setFixedWidth(70)
         self.quantityField.setFixedHeight(28)
 
-        spinbox_style = """
-        QSpinBox {
-            border: 2px solid #1A1054;
-            border-radius: 5px;
-            padding: 2px 4px;
-            background-color: rgb(255, 255, 255);
-        }
-        QSpinBox::up-button, QSpinBox::down-button {
-            width: 20px;
-            height: 14px;
-        }
-        QSpinBox::up-arrow, QSpinBox::down-arrow {
-            width: 8px;
-            height: 8px;
-        }
-        """
-        self.quantityField.setStyleSheet(spinbox_style)
-
         # --- Remove Button ---
         self.removeBtn = QPushButton("X")
+        self.removeBtn.setObjectName('serviceRemoveBtn')
         self.removeBtn.setFixedWidth(30)
-        self.removeBtn.setStyleSheet(
-            "QPushButton { background-color: red; color: white; border-radius: 5px; }"
-        )
         self.removeBtn.clicked.connect(self._request_remove)
 
         # --- Layout ---
@@ -135,23 +131,42 @@ class ServiceRowWidget(QWidget):
 
         self.setLayout(layout)
 
-        # Store services list for price lookup
-        self.services_list = services_list
+        # Catalog for price lookup by ServiceID
+        self.catalog = catalog
 
         # Connect service change to update price
-        self.serviceField.currentTextChanged.connect(self._update_price)
+        self.serviceField.currentIndexChanged.connect(self._update_price)
         self.quantityField.valueChanged.connect(self._update_price)
 
+    def _createCombo(self, items):
+        """Editable combo over a shared item model, with type-to-find"""
+        combo = QComboBox()
+        combo.setModel(items)
+        combo.setEditable(True)
+        combo.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
+
+        completer = QCompleter(items, combo)
+        completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        completer.setFilterMode(Qt.MatchFlag.MatchContains)
+        completer.setCompletionMode(QCompleter.CompletionMode.PopupCompletion)
+        combo.setCompleter(completer)
+
+        # Typed text that matched nothing falls back to the selected item
+        combo.lineEdit().editingFinished.connect(
+            lambda: combo.setEditText(combo.itemText(combo.currentIndex())))
+
+        combo.setCurrentIndex(0)
+        return combo
+
     def _update_price(self):
         """Update price field with VAT breakdown (includes tooltip)"""
-        service_name = self.serviceField.currentText()
-        if service_name == 'Services':
+        service_id = self.serviceField.currentData()
+        if service_id is None:
             self.priceField.clear()
             self.priceField.setToolTip("")
             return
 
-        # Find service in services list
-        service = next((s for s in self.services_list if s['ServiceName'] == service_name), None)
+        service = self.catalog.service(service_id)
         if service:
             # Get price components
             final_price = service['Price']  # This is the final price with VAT
@@ -202,6 +217,9 @@ class Staff(QMainWindow):
 
             self.patientsBtn.setChecked(True)
 
+            # Runs model queries off the UI thread for every controller
+            self.query_executor = QueryExecutor(self)
+
             # Initialize controllers
             self.patient_controller = PatientTabController(self)
             self.transaction_controller = TransactionController(self, self.current_staff_id)
@@ -215,6 +233,11 @@ class Staff(QMainWindow):
 
             # Set current date in date field
             self.dateField.setDate(QDate.currentDate())
+
+            # Keep the payment screen's services in step with edits made elsewhere
+            self.catalog_timer = QTimer(self)
+            self.catalog_timer.timeout.connect(self.transaction_controller.pollServiceCatalog)
+            self.catalog_timer.start(CATALOG_POLL_INTERVAL_MS)
         except Exception as e:
             print(f"ERROR in Staff.__init__: {e}")
             import traceback
@@ -241,10 +264,16 @@ class Staff(QMainWindow):
         self.servicesLayout = QVBoxLayout(self.scrollContent)
         self.servicesLayout.setAlignment(Qt.AlignmentFlag.AlignTop)
         self.servicescrollArea.setWidget(self.scrollContent)
+        self.scrollContent.setStyleSheet(SERVICE_ROW_STYLE)
 
         # List to hold rows
         self.service_rows = []
 
+        # Combo item models shared by every row, rebuilt when the catalog changes
+        self.row_items_catalog = None
+        self.service_items = None
+        self.dentist_items = None
+
     def _connect_signals(self):
         """Connect all UI signals to controller methods"""
         # Tab switching
@@ -267,6 +296,7 @@ class Staff(QMainWindow):
         # Records Tab Operations , Connect Search Patient Record Button
         self.patientrecordSearchBtn.clicked.connect(self.transaction_controller.searchRecordsByPatient)
         self.exportRecordBtn.clicked.connect(self.report_controller.exportRecordsTableToPDF)
+        self.recordsTable.verticalScrollBar().valueChanged.connect(self.transaction_controller.onRecordsScrolled)
 
         # Logout
         self.logoutBtn.clicked.connect(self.logout)
@@ -274,20 +304,28 @@ class Staff(QMainWindow):
     # Service row management (UI-only logic)
     def add_service_row(self):
         """Add a new service row to the scroll area"""
-        service_row = ServiceRowWidget(
-            self.transaction_controller.services,
-            self.transaction_controller.dentists,
-            self
-        )
+        catalog = self.transaction_controller.catalog
+        service_items, dentist_items = self._serviceRowItems(catalog)
+        service_row = ServiceRowWidget(catalog, service_items, dentist_items, self)
         service_row.removeBtn.clicked.connect(lambda: self.remove_service_row(service_row))
 
-        # Connect quantity and service changes to recalculate total
-        service_row.quantityField.valueChanged.connect(self.transaction_controller.calculateTotal)
-        service_row.serviceField.currentTextChanged.connect(self.transaction_controller.calculateTotal)
+        # Quantity and service changes adjust the total for this row only
+        service_row.quantityField.valueChanged.connect(
+            lambda: self.transaction_controller.onServiceRowChanged(service_row))
+        service_row.serviceField.currentIndexChanged.connect(
+            lambda: self.transaction_controller.onServiceRowChanged(service_row))
 
         self.servicesLayout.addWidget(service_row)
         self.service_rows.append(service_row)
 
+    def _serviceRowItems(self, catalog):
+        """Shared combo item models for catalog; rows built from an older catalog keep theirs"""
+        if catalog is not self.row_items_catalog:
+            self.service_items = build_combo_items('Services', catalog.services, 'ServiceName', 'ServiceID', self)
+            self.dentist_items = build_combo_items('Dentists', catalog.dentists, 'DentistName', 'StaffID', self)
+            self.row_items_catalog = catalog
+        return self.service_items, self.dentist_items
+
     def remove_service_row(self, service_row):
         """Remove a service row from the scroll area layout"""
         self.servicesLayout.removeWidget(service_row)
@@ -295,8 +333,8 @@ class Staff(QMainWindow):
             self.service_rows.remove(service_row)
         service_row.deleteLater()
 
-        # Recalculate total after removing
-        self.transaction_controller.calculateTotal()
+        # Take this row's subtotal off the total
+        self.transaction_controller.onServiceRowRemoved(service_row)
 
     def clear_all_services(self):
         # Make a copy of the list to safely iterate
@@ -309,22 +347,26 @@ class Staff(QMainWindow):
     # Navigation methods
     def switchToPatientTab(self):
         """Switch to patient tab and refresh data"""
+        self.query_executor.cancelAll()
         self.stackedWidget.setCurrentIndex(0)
-        self.patient_controller.loadPatientTable()
+        self.patient_controller.refreshPatientTable()
 
     def switchToRecordsTab(self):
         """Switch to records tab and refresh data"""
+        self.query_executor.cancelAll()
         self.stackedWidget.setCurrentIndex(1)
-        self.transaction_controller.loadRecordsTable()
+        self.transaction_controller.refreshRecordsTable()
 
     def switchToPaymentTab(self):
         """Switch to payment tab"""
+        self.query_executor.cancelAll()
         self.stackedWidget.setCurrentIndex(2)
         # Clear form when switching to payment tab
         self.transaction_controller.clearPaymentForm()
 
     def logout(self):
         """Logout and return to login screen"""
+        self.query_executor.cancelAll()
         from DentiCare.View.login_view import Login
         self.login_window = Login()
         self.login_window.show()
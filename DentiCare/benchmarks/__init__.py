@@ -0,0 +1 @@
+"""Timing harnesses for rendering code. Run with: python -m DentiCare.benchmarks.<name>"""
@@ -0,0 +1,102 @@
+"""
+Time receipt rendering with and without the shared style templates.
+
+    python -m DentiCare.benchmarks.receipt_timing [--runs 50] [--lines 3] [--notes]
+
+"before" clears the templates cache ahead of every render, which rebuilds
+the stylesheet, styles and fixed paragraphs the way each receipt used to.
+"after" reuses them. "canvas" is the direct-to-canvas fast path, which
+paginates like platypus. "escpos" builds the thermal printer ticket instead
+of a PDF. No database or Qt is needed.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date
+
+from DentiCare.Controller.pdf_templates import templates
+from DentiCare.Controller.receipt_escpos import buildEscPosReceipt
+from DentiCare.Controller.receipt_pdf import buildReceiptPDF, drawReceiptPDF, receiptFitsCanvas
+
+
+def sampleReceipt(lines, notes=False):
+    service_details = [{
+        'service_name': f"Service {i + 1}",
+        'base_price': 1000.0,
+        'vat_amount': 120.0,
+        'price': 1120.0,
+        'quantity': 1 + i % 3,
+    } for i in range(lines)]
+    return {
+        'transaction_id': 1,
+        'patient_name': "Dela Cruz, Juan",
+        'staff_name': "Santos, Maria",
+        'total_amount': sum(d['price'] * d['quantity'] for d in service_details),
+        'transaction_date': date.today(),
+        'service_details': service_details,
+        'notes': "Follow-up in two weeks.\nAvoid hard food." if notes else None,
+    }
+
+
+def timeRenders(directory, receipt, runs, cold, render=buildReceiptPDF):
+    timings = []
+    for run in range(runs):
+        if cold:
+            templates.cache_clear()
+        filename = os.path.join(directory, f"receipt_{render.__name__}_{'cold' if cold else 'warm'}_{run}.pdf")
+        start = time.perf_counter()
+        render(filename, **receipt)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def timeEscPos(receipt, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        buildEscPosReceipt(**receipt)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label, timings):
+    print(f"{label:<8} median {statistics.median(timings):7.2f} ms   "
+          f"mean {statistics.mean(timings):7.2f} ms   min {min(timings):7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time receipt PDF rendering before/after template caching")
+    parser.add_argument('--runs', type=int, default=50, help="renders per variant")
+    parser.add_argument('--lines', type=int, default=3, help="service lines per receipt")
+    parser.add_argument('--notes', action='store_true', help="include a two-line note")
+    args = parser.parse_args()
+
+    receipt = sampleReceipt(args.lines, args.notes)
+    with tempfile.TemporaryDirectory() as directory:
+        # One untimed render so imports and font loading don't count against either side
+        buildReceiptPDF(os.path.join(directory, "warmup.pdf"), **receipt)
+
+        before = timeRenders(directory, receipt, args.runs, cold=True)
+        after = timeRenders(directory, receipt, args.runs, cold=False)
+        fits = receiptFitsCanvas(receipt['service_details'], receipt['notes'])
+        if fits:
+            fast = timeRenders(directory, receipt, args.runs, cold=False, render=drawReceiptPDF)
+
+    report("before", before)
+    report("after", after)
+    print(f"speedup  {statistics.median(before) / statistics.median(after):.2f}x (median)")
+    if fits:
+        report("canvas", fast)
+        print(f"speedup  {statistics.median(before) / statistics.median(fast):.2f}x (median, canvas vs before)")
+    else:
+        print("canvas   skipped: the notes need Paragraph's own line breaking, platypus is used")
+    escpos = timeEscPos(receipt, args.runs)
+    report("escpos", escpos)
+    print(f"speedup  {statistics.median(before) / statistics.median(escpos):.0f}x (median, ESC/POS vs before)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+"""Versioned schema migrations. Run with: python -m DentiCare.migrations"""
+from .runner import MigrationRunner, discoverMigrations
+
+__all__ = ['MigrationRunner', 'discoverMigrations', 'runMigrations']
+
+
+def runMigrations(target=None):
+    return MigrationRunner().run(target)
@@ -0,0 +1,83 @@
+import argparse
+
+from DentiCare.Model import daily_revenue
+from DentiCare.Model.database_model import DatabaseModel
+from . import MigrationRunner
+
+
+def printMismatches(mismatches):
+    for row in mismatches:
+        if row.get('Orphaned'):
+            print(f"  {row['RevenueDate']}: rollup rows but no transactions")
+            continue
+        print(f"  {row['RevenueDate']}: "
+              f"total {row['TransactionTotal']} vs {row['RollupTransactionTotal']}, "
+              f"count {row['TransactionCount']} vs {row['RollupTransactionCount']}, "
+              f"qty {row['Quantity']} vs {row['RollupQuantity']}, "
+              f"service revenue {row['ServiceRevenue']} vs {row['RollupServiceRevenue']}")
+
+
+def checkDailyRevenue(rebuild):
+    """Verify the daily_revenue rollup, after recomputing it if rebuild; returns True if exact"""
+    connection = DatabaseModel().connect()
+    cursor = connection.cursor()
+    try:
+        if not daily_revenue.isAvailable():
+            print(f"Table {daily_revenue.ROLLUP_TABLE} does not exist yet, run the migrations first")
+            return False
+
+        connection.begin()
+        if rebuild:
+            daily_revenue.rebuild(cursor)
+            print(f"Rebuilt {daily_revenue.ROLLUP_TABLE}: {cursor.rowcount} rows")
+
+        # Checked inside the same transaction, so a bad rebuild is never committed
+        mismatches = daily_revenue.verify(cursor)
+        if mismatches:
+            connection.rollback()
+            print(f"{daily_revenue.ROLLUP_TABLE} disagrees with transactions on {len(mismatches)} day(s) "
+                  f"(raw vs rollup):")
+            printMismatches(mismatches)
+            if rebuild:
+                print("Rebuild rolled back")
+            return False
+
+        connection.commit()
+        print(f"{daily_revenue.ROLLUP_TABLE} matches the transactions table")
+        return True
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply DentiCare database migrations")
+    parser.add_argument('--target', type=int, default=None,
+                        help="apply migrations up to this version only")
+    parser.add_argument('--list', action='store_true',
+                        help="show pending migrations without applying them")
+    parser.add_argument('--rebuild-daily-revenue', action='store_true',
+                        help="recompute the daily_revenue rollup from scratch and verify it")
+    parser.add_argument('--verify-daily-revenue', action='store_true',
+                        help="compare the daily_revenue rollup with the transactions table")
+    args = parser.parse_args()
+
+    if args.rebuild_daily_revenue or args.verify_daily_revenue:
+        raise SystemExit(0 if checkDailyRevenue(rebuild=args.rebuild_daily_revenue) else 1)
+
+    runner = MigrationRunner()
+    if args.list:
+        pending = runner.pending()
+        if not pending:
+            print("No pending migrations")
+        for migration in pending:
+            print(f"{migration.VERSION:04d} {migration.NAME}")
+        return
+
+    runner.run(args.target)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Indexes for the hot lookups:
+- transactions by date range, newest first (reports, dashboard, records tab)
+- transactions by patient, newest first (records search / export)
+- staffcred by username (login, username checks)
+- patient by last/first name (name search; used by prefix matches - a leading
+  '%' wildcard still has to scan)
+"""
+from .schema_utils import addIndex
+
+VERSION = 1
+NAME = "search_indexes"
+
+# (label, query, sample args) - EXPLAINed before and after the upgrade
+EXPLAIN_QUERIES = [
+    (
+        "transactions in a date range",
+        """
+        SELECT t.TransactionID, t.TotalAmount, t.TransactionDate
+        FROM transactions t
+        WHERE t.TransactionDate >= %s AND t.TransactionDate < %s
+        ORDER BY t.TransactionDate DESC, t.TransactionID DESC
+        """,
+        ('2025-12-01', '2026-01-01'),
+    ),
+    (
+        "transactions for a patient",
+        """
+        SELECT t.TransactionID, t.TransactionDate
+        FROM transactions t
+        WHERE t.PatientID = %s
+        ORDER BY t.TransactionDate DESC, t.TransactionID DESC
+        """,
+        (1,),
+    ),
+    (
+        "login by username",
+        """
+        SELECT sc.StaffID, s.Role
+        FROM staffcred sc
+                 JOIN staff s ON sc.StaffID = s.StaffID
+        WHERE sc.Username = %s AND sc.Password = %s
+        """,
+        ('admin', 'admin'),
+    ),
+    (
+        "patient by last name prefix",
+        """
+        SELECT PatientID
+        FROM patient
+        WHERE PatientLname LIKE %s
+        ORDER BY PatientLname, PatientFname
+        """,
+        ('Dela%',),
+    ),
+]
+
+
+def upgrade(cursor):
+    addIndex(cursor, 'transactions', 'idx_transactions_date_id', ['TransactionDate', 'TransactionID'])
+    addIndex(cursor, 'transactions', 'idx_transactions_patient_date', ['PatientID', 'TransactionDate'])
+    addIndex(cursor, 'staffcred', 'idx_staffcred_username', ['Username'])
+    addIndex(cursor, 'patient', 'idx_patient_lname_fname', ['PatientLname', 'PatientFname'])
+    addIndex(cursor, 'patient', 'idx_patient_fname', ['PatientFname'])
@@ -0,0 +1,29 @@
+"""
+Indexes for incremental refresh of the list screens:
+- patient by updated_at (rows added or edited since the last refresh)
+
+New transactions are found with TransactionID > last seen, which already
+uses the primary key.
+"""
+from .schema_utils import addIndex
+
+VERSION = 2
+NAME = "change_tracking_indexes"
+
+# (label, query, sample args) - EXPLAINed before and after the upgrade
+EXPLAIN_QUERIES = [
+    (
+        "patients changed since last refresh",
+        """
+        SELECT *
+        FROM patient
+        WHERE updated_at >= %s
+        ORDER BY PatientID DESC
+        """,
+        ('2026-01-01 00:00:00',),
+    ),
+]
+
+
+def upgrade(cursor):
+    addIndex(cursor, 'patient', 'idx_patient_updated_at', ['updated_at'])
@@ -0,0 +1,80 @@
+"""
+transaction_listing: one row per transaction detail with the staff, patient,
+dentist and service names already resolved, so the records tab, record
+exports and reports read one table instead of joining six.
+
+Kept in sync by TransactionModel.createTransactions and by the staff,
+patient and service update methods (see Model/transaction_listing.py).
+"""
+from DentiCare.Model import transaction_listing
+from .schema_utils import columnExists, tableExists
+
+VERSION = 3
+NAME = "transaction_listing"
+
+# (label, query, sample args) - EXPLAINed before and after the upgrade
+EXPLAIN_QUERIES = [
+    (
+        "records for a patient",
+        """
+        SELECT *
+        FROM transaction_listing
+        WHERE PatientID = %s
+        ORDER BY TransactionDate DESC, TransactionID DESC
+        """,
+        (1,),
+    ),
+    (
+        "report rows for a month",
+        """
+        SELECT *
+        FROM transaction_listing
+        WHERE TransactionDate >= %s AND TransactionDate < %s
+        ORDER BY TransactionDate DESC, TransactionID DESC
+        """,
+        ('2025-12-01', '2026-01-01'),
+    ),
+]
+
+
+def upgrade(cursor):
+    if tableExists(cursor, transaction_listing.LISTING_TABLE):
+        print(f"  table {transaction_listing.LISTING_TABLE} already exists, rebuilding rows")
+    else:
+        cursor.execute(f"""
+            CREATE TABLE `{transaction_listing.LISTING_TABLE}` (
+                `TransactionDetailsID` int(11) NOT NULL,
+                `TransactionID` int(11) NOT NULL,
+                `TransactionDate` date NOT NULL,
+                `PatientID` int(11) NOT NULL,
+                `StaffID` int(11) NOT NULL,
+                `DentistID` int(11) NOT NULL,
+                `ServiceID` int(11) NOT NULL,
+                `ProcessedBy` varchar(70) NOT NULL,
+                `PatientName` varchar(70) NOT NULL,
+                `DentistName` varchar(70) NOT NULL,
+                `Service` varchar(20) NOT NULL,
+                `BasePrice` decimal(10,2) DEFAULT NULL,
+                `VATAmount` decimal(10,2) DEFAULT 0.00,
+                `VATRate` decimal(5,2) DEFAULT 12.00,
+                `IsVATApplicable` tinyint(1) DEFAULT 1,
+                `PriceAtTransaction` decimal(10,2) NOT NULL,
+                `Quantity` int(11) DEFAULT 1,
+                `TotalAmount` decimal(20,2) NOT NULL,
+                `Notes` text DEFAULT NULL,
+                PRIMARY KEY (`TransactionDetailsID`),
+                KEY `idx_listing_date_id` (`TransactionDate`, `TransactionID`),
+                KEY `idx_listing_patient_date` (`PatientID`, `TransactionDate`),
+                KEY `idx_listing_transaction` (`TransactionID`),
+                KEY `idx_listing_staff` (`StaffID`),
+                KEY `idx_listing_dentist` (`DentistID`),
+                KEY `idx_listing_service` (`ServiceID`),
+                CONSTRAINT `transaction_listing_ibfk_1` FOREIGN KEY (`TransactionID`)
+                    REFERENCES `transactions` (`TransactionID`) ON DELETE CASCADE ON UPDATE CASCADE
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+        """)
+        print(f"  created table {transaction_listing.LISTING_TABLE}")
+
+    # Backfill from the normalized tables
+    transaction_listing.rebuild(cursor, has_vat=columnExists(cursor, 'transactiondetails', 'BasePrice'))
+    print(f"  copied {cursor.rowcount} rows into {transaction_listing.LISTING_TABLE}")
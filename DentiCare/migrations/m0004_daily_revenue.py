@@ -0,0 +1,63 @@
+"""
+daily_revenue: revenue, quantity and transaction count per (day, service,
+dentist, staff), so the dashboard and report summaries add up days instead
+of re-aggregating every transaction.
+
+Kept in sync by TransactionModel.createTransactions (see Model/daily_revenue.py).
+"""
+from DentiCare.Model import daily_revenue
+from .schema_utils import tableExists
+
+VERSION = 4
+NAME = "daily_revenue"
+
+# (label, query, sample args) - EXPLAINed before and after the upgrade
+EXPLAIN_QUERIES = [
+    (
+        "monthly sales for a year",
+        """
+        SELECT MONTH(RevenueDate) AS Month, SUM(TransactionTotal) AS TotalSales
+        FROM daily_revenue
+        WHERE RevenueDate >= %s AND RevenueDate < %s
+        GROUP BY MONTH(RevenueDate)
+        """,
+        ('2025-01-01', '2026-01-01'),
+    ),
+    (
+        "revenue by service for a month",
+        """
+        SELECT ServiceID, SUM(Quantity), SUM(ServiceRevenue)
+        FROM daily_revenue
+        WHERE RevenueDate >= %s AND RevenueDate < %s
+        GROUP BY ServiceID
+        """,
+        ('2025-12-01', '2026-01-01'),
+    ),
+]
+
+
+def upgrade(cursor):
+    if tableExists(cursor, daily_revenue.ROLLUP_TABLE):
+        print(f"  table {daily_revenue.ROLLUP_TABLE} already exists, rebuilding rows")
+    else:
+        cursor.execute(f"""
+            CREATE TABLE `{daily_revenue.ROLLUP_TABLE}` (
+                `RevenueDate` date NOT NULL,
+                `ServiceID` int(11) NOT NULL,
+                `DentistID` int(11) NOT NULL,
+                `StaffID` int(11) NOT NULL,
+                `Quantity` int(11) NOT NULL DEFAULT 0,
+                `ServiceRevenue` decimal(20,2) NOT NULL DEFAULT 0.00,
+                `TransactionTotal` decimal(20,2) NOT NULL DEFAULT 0.00,
+                `TransactionCount` int(11) NOT NULL DEFAULT 0,
+                PRIMARY KEY (`RevenueDate`, `ServiceID`, `DentistID`, `StaffID`),
+                KEY `idx_daily_revenue_service` (`ServiceID`),
+                KEY `idx_daily_revenue_dentist` (`DentistID`),
+                KEY `idx_daily_revenue_staff` (`StaffID`)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+        """)
+        print(f"  created table {daily_revenue.ROLLUP_TABLE}")
+
+    # Backfill from the normalized tables
+    daily_revenue.rebuild(cursor)
+    print(f"  wrote {cursor.rowcount} rows into {daily_revenue.ROLLUP_TABLE}")
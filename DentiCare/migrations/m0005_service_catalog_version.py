@@ -0,0 +1,30 @@
+"""
+service_catalog_version: a single counter bumped in the same database
+transaction as every service insert, update and delete, so the service
+catalog cache can tell an edit apart from the previous version even when
+both land in the same second (services.updated_at only has one-second
+resolution).
+
+Kept in sync by ServiceModel (see Model/service_catalog.py).
+"""
+from DentiCare.Model import service_catalog
+from .schema_utils import tableExists
+
+VERSION = 5
+NAME = "service_catalog_version"
+
+
+def upgrade(cursor):
+    if tableExists(cursor, service_catalog.VERSION_TABLE):
+        print(f"  table {service_catalog.VERSION_TABLE} already exists")
+        return
+
+    cursor.execute(f"""
+        CREATE TABLE `{service_catalog.VERSION_TABLE}` (
+            `ID` tinyint(4) NOT NULL,
+            `Version` bigint(20) unsigned NOT NULL DEFAULT 0,
+            PRIMARY KEY (`ID`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+    """)
+    cursor.execute(f"INSERT INTO `{service_catalog.VERSION_TABLE}` (ID, Version) VALUES (1, 0)")
+    print(f"  created table {service_catalog.VERSION_TABLE}")
@@ -0,0 +1,19 @@
+"""
+daily_revenue: rebuild so transactions without detail rows are counted
+(booked on ServiceID 0, see Model/daily_revenue.py). Earlier versions of the
+rollup left them out of TransactionCount and TransactionTotal.
+"""
+from DentiCare.Model import daily_revenue
+from .schema_utils import tableExists
+
+VERSION = 6
+NAME = "daily_revenue_detailless"
+
+
+def upgrade(cursor):
+    if not tableExists(cursor, daily_revenue.ROLLUP_TABLE):
+        print(f"  table {daily_revenue.ROLLUP_TABLE} does not exist, nothing to rebuild")
+        return
+
+    daily_revenue.rebuild(cursor)
+    print(f"  wrote {cursor.rowcount} rows into {daily_revenue.ROLLUP_TABLE}")
@@ -0,0 +1,145 @@
+import importlib
+import json
+import pkgutil
+
+from DentiCare.Model.database_model import DatabaseModel
+from DentiCare.Model.schema_cache import schema_capabilities
+
+VERSION_TABLE = "schema_migrations"
+LOCK_NAME = "dentalclinic_migrations"
+LOCK_TIMEOUT = 30  # seconds to wait if another terminal is migrating
+
+
+def discoverMigrations():
+    """Import every mNNNN_*.py module in this package, ordered by VERSION"""
+    package = importlib.import_module(__package__)
+    migrations = []
+
+    for info in pkgutil.iter_modules(package.__path__):
+        name = info.name
+        if len(name) > 5 and name[0] == 'm' and name[1:5].isdigit():
+            migrations.append(importlib.import_module(f"{__package__}.{name}"))
+
+    migrations.sort(key=lambda m: m.VERSION)
+
+    versions = [m.VERSION for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions: {versions}")
+
+    return migrations
+
+
+class MigrationRunner:
+    """Applies numbered schema migrations once and records them in schema_migrations"""
+
+    def __init__(self):
+        db = DatabaseModel()
+        self.connection = db.connect()
+
+    def _ensureVersionTable(self, cursor):
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS `{VERSION_TABLE}` (
+                `Version` int(11) NOT NULL,
+                `Name` varchar(100) NOT NULL,
+                `ExplainBefore` mediumtext DEFAULT NULL,
+                `ExplainAfter` mediumtext DEFAULT NULL,
+                `applied_at` datetime DEFAULT current_timestamp(),
+                PRIMARY KEY (`Version`)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+        """)
+
+    def appliedVersions(self, cursor):
+        cursor.execute(f"SELECT Version FROM `{VERSION_TABLE}`")
+        return {row['Version'] for row in cursor.fetchall()}
+
+    def _explain(self, cursor, migration):
+        """Run EXPLAIN for the migration's sample queries"""
+        plans = []
+        for label, sql, args in getattr(migration, 'EXPLAIN_QUERIES', []):
+            try:
+                cursor.execute("EXPLAIN " + sql, args)
+                plan = cursor.fetchall()
+            except Exception as e:
+                plan = f"EXPLAIN failed: {e}"
+            plans.append({'label': label, 'plan': plan})
+        return plans
+
+    def _printPlans(self, title, plans):
+        print(f"  {title}:")
+        for entry in plans:
+            print(f"    - {entry['label']}")
+            if isinstance(entry['plan'], str):
+                print(f"        {entry['plan']}")
+                continue
+            for row in entry['plan']:
+                print(f"        table={row.get('table')} type={row.get('type')} "
+                      f"key={row.get('key')} rows={row.get('rows')} extra={row.get('Extra')}")
+
+    def pending(self):
+        cursor = self.connection.cursor()
+        try:
+            self._ensureVersionTable(cursor)
+            applied = self.appliedVersions(cursor)
+        finally:
+            cursor.close()
+        return [m for m in discoverMigrations() if m.VERSION not in applied]
+
+    def run(self, target=None):
+        """Apply pending migrations up to target (all if None). Returns applied versions."""
+        applied_now = []
+        cursor = self.connection.cursor()
+
+        try:
+            # Only one terminal migrates at a time
+            cursor.execute("SELECT GET_LOCK(%s, %s) AS Locked", (LOCK_NAME, LOCK_TIMEOUT))
+            if not cursor.fetchone()['Locked']:
+                raise RuntimeError("Another migration is running, try again later")
+
+            try:
+                self._ensureVersionTable(cursor)
+                applied = self.appliedVersions(cursor)
+
+                for migration in discoverMigrations():
+                    if target is not None and migration.VERSION > target:
+                        break
+                    if migration.VERSION in applied:
+                        continue
+
+                    print(f"Applying migration {migration.VERSION:04d} {migration.NAME}")
+                    before = self._explain(cursor, migration)
+                    self._printPlans("plan before", before)
+
+                    # DDL commits implicitly in MySQL, so each step must be safe to re-run
+                    migration.upgrade(cursor)
+
+                    after = self._explain(cursor, migration)
+                    self._printPlans("plan after", after)
+
+                    cursor.execute(
+                        f"""
+                        INSERT INTO `{VERSION_TABLE}` (Version, Name, ExplainBefore, ExplainAfter)
+                        VALUES (%s, %s, %s, %s)
+                        """,
+                        (migration.VERSION, migration.NAME,
+                         json.dumps(before, default=str), json.dumps(after, default=str))
+                    )
+                    applied_now.append(migration.VERSION)
+
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+                cursor.fetchone()
+
+            # Columns/tables may have changed, re-read them on this connection
+            schema_capabilities.load(cursor)
+        except Exception:
+            # Some steps may have run; make models re-check on next use
+            schema_capabilities.invalidate()
+            raise
+        finally:
+            cursor.close()
+
+        if applied_now:
+            print(f"Applied migrations: {', '.join(str(v) for v in applied_now)}")
+        else:
+            print("Database schema is up to date")
+        return applied_now
@@ -0,0 +1,51 @@
+"""Helpers that let migrations check the live schema before changing it"""
+
+
+def tableExists(cursor, table):
+    cursor.execute(
+        """
+        SELECT 1
+        FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """,
+        (table,)
+    )
+    return cursor.fetchone() is not None
+
+
+def columnExists(cursor, table, column):
+    cursor.execute(
+        """
+        SELECT 1
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """,
+        (table, column)
+    )
+    return cursor.fetchone() is not None
+
+
+def indexExists(cursor, table, index):
+    cursor.execute(
+        """
+        SELECT 1
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        LIMIT 1
+        """,
+        (table, index)
+    )
+    return cursor.fetchone() is not None
+
+
+def addIndex(cursor, table, index, columns, unique=False):
+    """Create an index unless one with that name already exists. Returns True if created."""
+    if indexExists(cursor, table, index):
+        print(f"  index {table}.{index} already exists, skipping")
+        return False
+
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    column_sql = ", ".join(f"`{c}`" for c in columns)
+    cursor.execute(f"CREATE {kind} `{index}` ON `{table}` ({column_sql})")
+    print(f"  created index {table}.{index} ({', '.join(columns)})")
+    return True
@@ -5,16 +5,37 @@ import warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
 import sys
+
+import pymysql
 from PyQt6.QtWidgets import QApplication
 
 # Import the Login view
 from DentiCare.View.login_view import Login
+from DentiCare.Model.database_model import DatabaseModel
+from DentiCare.Model.schema_cache import schema_capabilities
+from DentiCare.Controller.report_sections import shutdownSectionPool
 
 
 def main():
     # Create the QApplication instance
     app = QApplication(sys.argv)
 
+    # Close pooled database connections on exit
+    app.aboutToQuit.connect(DatabaseModel.closePool)
+
+    # Stop the report worker processes, if any were started
+    app.aboutToQuit.connect(shutdownSectionPool)
+
+    # Keep a record of query timings from this session in logs/slow_queries.log
+    app.aboutToQuit.connect(lambda: DatabaseModel.dumpQueryStats(to_log=True))
+
+    # Read which tables/columns exist before any background query runs, so a
+    # capability check never needs a second connection while one is held
+    try:
+        schema_capabilities.load()
+    except pymysql.Error as e:
+        print(f"WARNING: Could not read the database schema at startup: {e}")
+
     # Create and show the login window
     login_window = Login()
     login_window.show()
@@ -0,0 +1,124 @@
+"""
+daily_revenue against a real MySQL/MariaDB server.
+
+Needs an empty scratch database; the tables are created and dropped here:
+
+    DENTICARE_TEST_DATABASE=dentalclinic_test python -m pytest tests
+
+Host, user and password default to DB_CONFIG and can be overridden with
+DENTICARE_TEST_DB_HOST, DENTICARE_TEST_DB_USER and DENTICARE_TEST_DB_PASSWORD.
+"""
+import os
+import unittest
+from datetime import date
+from decimal import Decimal
+
+import pymysql
+
+from DentiCare.Model import daily_revenue
+from DentiCare.Model.database_model import DB_CONFIG, DatabaseModel
+from DentiCare.Model.schema_cache import schema_capabilities
+from DentiCare.migrations import m0004_daily_revenue
+
+TEST_DATABASE = os.environ.get('DENTICARE_TEST_DATABASE')
+
+
+def _testConfig():
+    return dict(DB_CONFIG,
+                host=os.environ.get('DENTICARE_TEST_DB_HOST', DB_CONFIG['host']),
+                user=os.environ.get('DENTICARE_TEST_DB_USER', DB_CONFIG['user']),
+                password=os.environ.get('DENTICARE_TEST_DB_PASSWORD', DB_CONFIG['password']),
+                database=TEST_DATABASE)
+
+
+@unittest.skipUnless(TEST_DATABASE, "set DENTICARE_TEST_DATABASE to a scratch database")
+class DailyRevenueTest(unittest.TestCase):
+
+    def setUp(self):
+        config = _testConfig()
+        DatabaseModel.configurePool(**config)
+        self.connection = pymysql.connect(cursorclass=pymysql.cursors.DictCursor, autocommit=False, **config)
+        self.cursor = self.connection.cursor()
+        self.cursor.execute("""
+            CREATE TABLE transactions (
+                TransactionID int(11) NOT NULL AUTO_INCREMENT PRIMARY KEY,
+                DentistID int(11) NOT NULL,
+                StaffID int(11) NOT NULL,
+                PatientID int(11) NOT NULL,
+                TotalAmount decimal(20,2) NOT NULL,
+                TransactionDate date NOT NULL,
+                Notes text DEFAULT NULL
+            ) ENGINE=InnoDB
+        """)
+        self.cursor.execute("""
+            CREATE TABLE transactiondetails (
+                TransactionDetailsID int(11) NOT NULL AUTO_INCREMENT PRIMARY KEY,
+                TransactionID int(11) NOT NULL,
+                ServiceID int(11) NOT NULL,
+                PriceAtTransaction decimal(10,2) NOT NULL,
+                Quantity int(11) DEFAULT 1
+            ) ENGINE=InnoDB
+        """)
+        m0004_daily_revenue.upgrade(self.cursor)
+        self.connection.commit()
+        schema_capabilities.load(self.cursor)
+
+    def tearDown(self):
+        self.connection.rollback()
+        self.cursor.execute(f"DROP TABLE IF EXISTS transactions, transactiondetails, {daily_revenue.ROLLUP_TABLE}")
+        self.cursor.close()
+        self.connection.close()
+        schema_capabilities.invalidate()
+        DatabaseModel.configurePool(**DB_CONFIG)
+
+    def _checkout(self, total, details, day=date(2026, 3, 2)):
+        """Insert a transaction and its details the way createTransactions does, then add it to the rollup"""
+        self.cursor.execute(
+            "INSERT INTO transactions (DentistID, StaffID, PatientID, TotalAmount, TransactionDate) "
+            "VALUES (1, 1, 1, %s, %s)",
+            (total, day)
+        )
+        transaction_id = self.cursor.lastrowid
+        for service_id, price, quantity in details:
+            self.cursor.execute(
+                "INSERT INTO transactiondetails (TransactionID, ServiceID, PriceAtTransaction, Quantity) "
+                "VALUES (%s, %s, %s, %s)",
+                (transaction_id, service_id, price, quantity)
+            )
+        daily_revenue.addTransactions(self.cursor, [transaction_id])
+        self.connection.commit()
+
+    def _rollupTotals(self):
+        self.cursor.execute(f"""
+            SELECT SUM(TransactionCount) AS TransactionCount, SUM(TransactionTotal) AS TransactionTotal,
+                   SUM(Quantity) AS Quantity
+            FROM {daily_revenue.ROLLUP_TABLE}
+        """)
+        return self.cursor.fetchone()
+
+    def testRepeatedCheckoutsAddToTheSameRow(self):
+        self._checkout('150.00', [(1, '50.00', 1), (2, '100.00', 1)])
+        # Same day, service, dentist and staff: goes through ON DUPLICATE KEY UPDATE
+        self._checkout('100.00', [(1, '50.00', 2)])
+
+        totals = self._rollupTotals()
+        self.assertEqual(totals['TransactionCount'], 2)
+        self.assertEqual(totals['TransactionTotal'], Decimal('250.00'))
+        self.assertEqual(totals['Quantity'], 4)
+        self.assertEqual(daily_revenue.verify(self.cursor), [])
+
+    def testTransactionWithoutDetailsIsCounted(self):
+        self._checkout('80.00', [])
+
+        totals = self._rollupTotals()
+        self.assertEqual(totals['TransactionCount'], 1)
+        self.assertEqual(totals['TransactionTotal'], Decimal('80.00'))
+        self.assertEqual(totals['Quantity'], 0)
+        self.assertEqual(daily_revenue.verify(self.cursor), [])
+
+        daily_revenue.rebuild(self.cursor)
+        self.assertEqual(self._rollupTotals(), totals)
+
+
+if __name__ == '__main__':
+    unittest.main()